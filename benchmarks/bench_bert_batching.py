@@ -0,0 +1,97 @@
+"""
+SocialPulse Monastir - Benchmark de l'inférence BERT par batchs
+===============================================================
+Compare le débit de BertSentimentModel:
+- AVANT: un texte par passe forward, paddé à max_length (128)
+- APRÈS: batchs triés par longueur avec padding dynamique
+
+Vérifie aussi que les labels prédits sont identiques.
+
+Usage:
+    python benchmarks/bench_bert_batching.py [dossier_modele] [batch_size]
+"""
+
+import os
+import sys
+import json
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from model_bert import BERT_AVAILABLE, ID_TO_LABEL
+
+DATA_FILE = os.path.join(PROJECT_ROOT, 'data', 'processed', 'result_after_validation.json')
+DEFAULT_MODEL_DIR = os.path.join(PROJECT_ROOT, 'models', 'bert_sentiment')
+
+
+def legacy_predict(model, texts):
+    """Version historique: un texte à la fois, padding='max_length'."""
+    import torch
+    
+    model.model.eval()
+    predictions = []
+    with torch.no_grad():
+        for text in texts:
+            encoding = model.tokenizer(
+                text,
+                truncation=True,
+                padding='max_length',
+                max_length=128,
+                return_tensors='pt'
+            )
+            outputs = model.model(
+                input_ids=encoding['input_ids'].to(model.device),
+                attention_mask=encoding['attention_mask'].to(model.device)
+            )
+            predictions.append(ID_TO_LABEL[torch.argmax(outputs.logits, dim=-1).item()])
+    return predictions
+
+
+def main():
+    if not BERT_AVAILABLE:
+        print("❌ Installez les dépendances: pip install transformers torch")
+        return 1
+    
+    from model_bert import BertSentimentModel
+    
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MODEL_DIR
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        texts = [post['clean_text'] for post in json.load(f) if post.get('clean_text')]
+    
+    model = BertSentimentModel.load(model_dir)
+    
+    print("=" * 60)
+    print("BENCHMARK - Inférence BERT")
+    print("=" * 60)
+    print(f"📂 {len(texts)} textes, batch_size={batch_size}, device={model.device}")
+    
+    # Échauffement
+    model.predict(texts[:batch_size], batch_size=batch_size)
+    
+    start = time.perf_counter()
+    before = legacy_predict(model, texts)
+    before_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    after = model.predict(texts, batch_size=batch_size)
+    after_time = time.perf_counter() - start
+    if isinstance(after, str):
+        after = [after]
+    
+    agreement = sum(1 for a, b in zip(before, after) if a == b) / len(texts)
+    
+    print(f"\n   Avant:  {len(texts) / before_time:8.1f} textes/s")
+    print(f"   Après:  {len(texts) / after_time:8.1f} textes/s")
+    print(f"   Gain:   x{before_time / after_time:.1f}")
+    print(f"   Labels identiques: {agreement:.1%}")
+    print("=" * 60)
+    
+    return 0 if agreement == 1.0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+SocialPulse Monastir - Parité BERT float32 / int8 dynamique
+===========================================================
+Compare BertSentimentModel chargé normalement et avec
+quantize='dynamic' (couches Linear en int8) sur
+data/processed/final_evaluation_set.json:
+- taux d'accord des labels entre les deux modèles
+- accuracy de chacun par rapport au sentiment annoté
+- latence: texte unique (p50/p95) et débit par batchs
+
+Les deux modèles tournent sur CPU pour une comparaison équitable.
+
+Usage:
+    python benchmarks/bench_bert_quantization.py [dossier_modele] [batch_size]
+"""
+
+import os
+import sys
+import json
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from model_bert import BERT_AVAILABLE
+
+DATA_FILE = os.path.join(PROJECT_ROOT, 'data', 'processed', 'final_evaluation_set.json')
+DEFAULT_MODEL_DIR = os.path.join(PROJECT_ROOT, 'models', 'bert_sentiment')
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def measure(model, texts, batch_size):
+    """Prédictions + latences unitaires (ms) + temps total par batchs (s)."""
+    model.predict(texts[:batch_size], batch_size=batch_size)  # échauffement
+
+    single = []
+    for text in texts:
+        start = time.perf_counter()
+        model.predict([text], batch_size=1)
+        single.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    predictions = model.predict(texts, batch_size=batch_size)
+    batch_time = time.perf_counter() - start
+
+    return predictions, single, batch_time
+
+
+def main():
+    if not BERT_AVAILABLE:
+        print("❌ Installez les dépendances: pip install transformers torch")
+        return 1
+
+    import torch
+    from model_bert import BertSentimentModel
+
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MODEL_DIR
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        posts = [post for post in json.load(f) if post.get('text')]
+    texts = [post['text'] for post in posts]
+    gold = [post.get('sentiment') for post in posts]
+
+    fp32 = BertSentimentModel.load(model_dir)
+    fp32.device = torch.device('cpu')
+    fp32.model.to(fp32.device)
+    int8 = BertSentimentModel.load(model_dir, quantize='dynamic')
+
+    print("=" * 60)
+    print("PARITÉ - BERT float32 vs int8 dynamique")
+    print("=" * 60)
+    print(f"📂 {len(texts)} textes, batch_size={batch_size}, threads={torch.get_num_threads()}")
+
+    results = {}
+    for name, model in (('float32', fp32), ('int8', int8)):
+        results[name] = measure(model, texts, batch_size)
+
+    pred_fp32, pred_int8 = results['float32'][0], results['int8'][0]
+    agreement = sum(a == b for a, b in zip(pred_fp32, pred_int8)) / len(texts)
+
+    print(f"\n{'':<22}{'float32':>12}{'int8':>12}")
+    for name, key in (('Accuracy (annoté)', 'acc'), ('Latence p50 (ms)', 'p50'),
+                      ('Latence p95 (ms)', 'p95'), ('Débit batch (txt/s)', 'tps')):
+        row = []
+        for model_name in ('float32', 'int8'):
+            predictions, single, batch_time = results[model_name]
+            if key == 'acc':
+                labeled = [(p, g) for p, g in zip(predictions, gold) if g]
+                value = sum(p == g for p, g in labeled) / len(labeled) * 100 if labeled else 0.0
+            elif key == 'p50':
+                value = percentile(single, 50)
+            elif key == 'p95':
+                value = percentile(single, 95)
+            else:
+                value = len(texts) / batch_time
+            row.append(value)
+        print(f"{name:<22}{row[0]:>12.1f}{row[1]:>12.1f}")
+
+    print(f"\n🤝 Accord des labels: {agreement:.1%}")
+    for text, a, b in zip(texts, pred_fp32, pred_int8):
+        if a != b:
+            print(f"   ≠ {a:>8} → {b:<8} {text[:60]}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
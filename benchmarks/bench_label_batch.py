@@ -0,0 +1,80 @@
+"""
+SocialPulse Monastir - Benchmark label_batch / label_post
+=========================================================
+Compare les temps de labeling d'une boucle label_post et de label_batch
+sur les données traitées existantes (répétées), avec des textes tous
+distincts puis avec les doublons tels quels.
+
+La parité exacte des deux chemins est vérifiée par tests/test_labeling.py.
+
+Usage:
+    python benchmarks/bench_label_batch.py [repetitions]
+"""
+
+import os
+import sys
+import json
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from labeling import label_post, label_batch
+
+PROCESSED_DIR = os.path.join(PROJECT_ROOT, 'data', 'processed')
+DATA_FILES = ['result_after_validation.json', 'result_augmented.json', 'normalized_data.json']
+
+
+def load_posts():
+    """Posts preprocessés (avec clean_text) des fichiers existants."""
+    posts = []
+    for filename in DATA_FILES:
+        path = os.path.join(PROCESSED_DIR, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        file_posts = [p for p in data if isinstance(p, dict) and 'clean_text' in p]
+        print(f"📂 {filename}: {len(file_posts)} posts")
+        posts.extend(file_posts)
+    return posts
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    posts = load_posts()
+    if not posts:
+        print("❌ Aucun post preprocessé trouvé")
+        return 1
+
+    # Textes rendus distincts: pas d'effet de la déduplication des textes
+    # identiques dans label_batch (seuls les calculs sur tableaux comptent)
+    distinct = [
+        dict(post, clean_text=f"{post.get('clean_text', '')} r{i}")
+        for i, post in enumerate(posts * repetitions)
+    ]
+    # Données répétées telles quelles (retweets, annonces copiées)
+    duplicated = posts * repetitions
+
+    for label, corpus in (("Textes distincts", distinct), ("Textes en double", duplicated)):
+        start = time.perf_counter()
+        for post in corpus:
+            label_post(post)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for labeled in label_batch(corpus):
+            pass
+        batch_time = time.perf_counter() - start
+
+        print(f"\n⏱️  {label}: {len(corpus)} posts")
+        print(f"   label_post (boucle): {loop_time:.2f}s")
+        print(f"   label_batch:         {batch_time:.2f}s  (x{loop_time / batch_time:.1f})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+SocialPulse Monastir - Benchmark de la protection des dates/nombres
+===================================================================
+Compare la latence par post de extract_protected_patterns:
+- AVANT: une regex compilée et balayée par mois (et par paire de mois)
+- APRÈS: motif combiné précompilé, un seul balayage
+
+Vérifie aussi que les placeholders produits sont identiques.
+
+Usage:
+    python benchmarks/bench_protected_patterns.py [nb_repetitions]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import preprocessing
+from preprocessing import MONTHS_ARABIC, MONTHS_FRENCH, clean_special_characters
+
+DATA_FILE = os.path.join(PROJECT_ROOT, 'data', 'processed', 'final_evaluation_set.json')
+
+
+# ============================================
+# ANCIENNE IMPLÉMENTATION (référence)
+# ============================================
+
+def legacy_extract_protected_patterns(text):
+    """Version historique: une passe re.finditer par mois et par paire de mois."""
+    protected_values = {}
+    counter = 0
+    result_text = text
+
+    def protect(match, result_text):
+        nonlocal counter
+        placeholder = f"PROT{counter}PROT"
+        protected_values[placeholder] = match.group()
+        protected_values[placeholder.lower()] = match.group()
+        counter += 1
+        return result_text[:match.start()] + placeholder + result_text[match.end():]
+
+    for month in MONTHS_ARABIC:
+        pattern = rf'\b(\d{{1,2}})\s*[وو\-]\s*(\d{{1,2}})\s+{month}(\s+\d{{4}})?\b'
+        for match in reversed(list(re.finditer(pattern, result_text))):
+            result_text = protect(match, result_text)
+
+    for month in MONTHS_ARABIC:
+        pattern = rf'\b(\d{{1,2}})\s+{month}(\s+\d{{4}})?\b'
+        for match in reversed(list(re.finditer(pattern, result_text))):
+            if 'PROT' in result_text[max(0, match.start()-10):match.end()+10]:
+                continue
+            result_text = protect(match, result_text)
+
+    for month in MONTHS_FRENCH:
+        pattern = rf'\b(\d{{1,2}})\s*[et\-وو]\s*(\d{{1,2}})\s+{month}(\s+\d{{4}})?\b'
+        for match in reversed(list(re.finditer(pattern, result_text, re.IGNORECASE))):
+            result_text = protect(match, result_text)
+
+    for month in MONTHS_FRENCH:
+        pattern = rf'\b(\d{{1,2}})\s+{month}(\s+\d{{4}})?\b'
+        for match in reversed(list(re.finditer(pattern, result_text, re.IGNORECASE))):
+            if 'PROT' in result_text[max(0, match.start()-10):match.end()+10]:
+                continue
+            result_text = protect(match, result_text)
+
+    for month1 in MONTHS_ARABIC:
+        for month2 in MONTHS_ARABIC:
+            pattern = rf'\b(\d{{1,2}})\s+{month1}\s+[لِـل]+\s*(\d{{1,2}})\s+{month2}\b'
+            for match in reversed(list(re.finditer(pattern, result_text))):
+                if 'PROT' in result_text[max(0, match.start()-10):match.end()+10]:
+                    continue
+                result_text = protect(match, result_text)
+
+    patterns = [
+        r'\b\d{1,2}:\d{2}\b',
+        r'\b\d{1,2}h\d{2}\b',
+        r'\b\d{1,2}[/\-\. ]\d{1,2}[/\-\. ]\d{2,4}\b',
+        r'\b\d{1,2}[/\-\.]\d{1,2}\b',
+        r'\b(19|20)\d{2}\b',
+        r'\b\d+%',
+        r'\b\d+(\.\d+)?\s*(dt|tnd|دينار)\b',
+        r'\b\d+\s*(dt|tnd|دينار)\b',
+    ]
+    for pattern in patterns:
+        for match in reversed(list(re.finditer(pattern, result_text, re.IGNORECASE))):
+            if 'PROT' in match.group():
+                continue
+            result_text = protect(match, result_text)
+
+    return result_text, protected_values
+
+
+def current_extract_protected_patterns(text):
+    """Version actuelle du module preprocessing."""
+    context = preprocessing.ProtectionContext()
+    result = preprocessing.extract_protected_patterns(text, context)
+    return result, context.values
+
+
+# ============================================
+# MESURE
+# ============================================
+
+def time_per_post(func, texts, repeats):
+    """Retourne la latence moyenne par post en millisecondes."""
+    # Échauffement (cache des regex, imports)
+    for text in texts:
+        func(text)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            func(text)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeats * len(texts)) * 1000
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    # Même entrée que dans normalize_text (après nettoyage des caractères)
+    texts = [clean_special_characters(post.get('text', '')) for post in data]
+
+    print("=" * 60)
+    print("BENCHMARK - extract_protected_patterns")
+    print("=" * 60)
+    print(f"📂 {len(texts)} posts ({os.path.basename(DATA_FILE)}), {repeats} répétitions")
+
+    # Parité des placeholders
+    mismatches = [
+        text for text in texts
+        if legacy_extract_protected_patterns(text) != current_extract_protected_patterns(text)
+    ]
+    if mismatches:
+        print(f"❌ {len(mismatches)} posts avec placeholders différents:")
+        for text in mismatches[:5]:
+            print(f"   {text[:80]}")
+    else:
+        print("✅ Placeholders identiques sur tous les posts")
+
+    before = time_per_post(legacy_extract_protected_patterns, texts, repeats)
+    after = time_per_post(current_extract_protected_patterns, texts, repeats)
+
+    print(f"\n   Avant:  {before:8.3f} ms/post")
+    print(f"   Après:  {after:8.3f} ms/post")
+    print(f"   Gain:   x{before / after:.1f}")
+    print("=" * 60)
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+SocialPulse Monastir - Test de charge de l'API
+==============================================
+Envoie des requêtes /predict concurrentes et rapporte le débit (RPS)
+et les percentiles de latence.
+
+Usage:
+    python benchmarks/load_test.py [url] [concurrence] [nb_requetes] [modele]
+
+Exemple:
+    gunicorn -c gunicorn.conf.py &
+    python benchmarks/load_test.py http://localhost:5000 16 2000 bert
+"""
+
+import os
+import sys
+import json
+import time
+import urllib.request
+import urllib.error
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_FILE = os.path.join(PROJECT_ROOT, 'data', 'processed', 'final_evaluation_set.json')
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def send(url, text, model):
+    """Une requête /predict; retourne (status, latence en ms)."""
+    body = json.dumps({'text': text, 'model': model}).encode('utf-8')
+    req = urllib.request.Request(url + '/predict', data=body, headers={'Content-Type': 'application/json'})
+
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 'erreur'
+    return status, (time.perf_counter() - start) * 1000
+
+
+def wait_ready(url, timeout=300):
+    """Attend que /ready réponde 200 (modèles chargés et échauffés)."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url + '/ready', timeout=5) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(1)
+    return False
+
+
+def main():
+    url = sys.argv[1].rstrip('/') if len(sys.argv) > 1 else 'http://localhost:5000'
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    total = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    model = sys.argv[4] if len(sys.argv) > 4 else 'bert'
+
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        texts = [post['text'] for post in json.load(f) if post.get('text')]
+
+    print("=" * 60)
+    print("TEST DE CHARGE - SocialPulse API")
+    print("=" * 60)
+    print(f"🎯 {url}/predict  modèle={model}  concurrence={concurrency}  requêtes={total}")
+
+    if not wait_ready(url):
+        print("❌ L'API n'est pas prête (/ready)")
+        return 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda i: send(url, texts[i % len(texts)], model), range(total)))
+    elapsed = time.perf_counter() - start
+
+    statuses = Counter(status for status, _ in results)
+    latencies = sorted(latency for status, latency in results if status == 200)
+
+    print(f"\n⏱️  Durée: {elapsed:.1f}s")
+    print(f"🚀 Débit: {len(latencies) / elapsed:.1f} req/s (réussies)")
+    print(f"📊 Statuts: {dict(statuses)}")
+    print("\n   Latence (ms):")
+    for pct in (50, 90, 95, 99):
+        print(f"      p{pct}: {percentile(latencies, pct):.1f}")
+    if latencies:
+        print(f"      max: {latencies[-1]:.1f}")
+
+    return 0 if statuses.get(200) == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+SocialPulse Monastir - Profil des passages par post (process_post)
+==================================================================
+Compte les parcours complets du texte effectués par process_post:
+- AVANT: chaque étape reparcourt le texte (clean_special_characters x2,
+  boucle emoji, replace_emoji, re.findall de detect_language et
+  is_arabic_text, normalize_arabic_chars)
+- APRÈS: une TextAnalysis par post (un parcours) réutilisée par les étapes
+
+Vérifie aussi que les posts produits sont identiques.
+
+Usage:
+    python benchmarks/profile_process_post.py [nb_repetitions]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+from collections import Counter
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import preprocessing
+from preprocessing import (
+    ProtectionContext, clean_special_characters, extract_protected_patterns,
+    expand_french_contractions, transliterate_arabic_to_latin, normalize_to_darija,
+    restore_protected_patterns, clean_punctuation,
+)
+
+DATA_FILE = os.path.join(PROJECT_ROOT, 'data', 'processed', 'final_evaluation_set.json')
+
+
+# ============================================
+# ANCIEN PIPELINE (référence)
+# ============================================
+
+def legacy_normalize_text(text):
+    """normalize_text historique: chaque étape reparcourt le texte."""
+    if not text:
+        return text
+    text = preprocessing.remove_emojis(text)
+    text = preprocessing.clean_special_characters(text)
+    protection = ProtectionContext()
+    text = extract_protected_patterns(text, protection)
+    text = expand_french_contractions(text)
+    if preprocessing.is_arabic_text(text):
+        text = transliterate_arabic_to_latin(text)
+    text = preprocessing.normalize_arabic_chars(text)
+    text = normalize_to_darija(text)
+    text = restore_protected_patterns(text, protection)
+    text = clean_punctuation(text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def legacy_process_post(post):
+    """process_post historique (sans analyse partagée)."""
+    text = preprocessing.clean_special_characters(post.get('text', ''))
+    emoji_data = preprocessing.extract_emoji_sentiment(text)
+    original_lang = preprocessing.detect_language(text)
+    clean_text = legacy_normalize_text(text)
+
+    processed_post = post.copy()
+    processed_post.update({
+        'original_text': post.get('text', ''),
+        'clean_text': clean_text,
+        'original_lang': original_lang,
+        'normalized_lang': 'darija',
+        'emoji_sentiment': emoji_data,
+    })
+    return processed_post
+
+
+# ============================================
+# COMPTAGE DES PASSAGES
+# ============================================
+
+passes = Counter()
+
+
+def count_pass(name, func, when=None):
+    """Enveloppe func: un passage compté par appel (si when(args) est vrai)."""
+    def wrapper(*args, **kwargs):
+        if when is None or when(*args, **kwargs):
+            passes[name] += 1
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def without_analysis(text, analysis=None):
+    return analysis is None
+
+
+def instrument():
+    """Installe les compteurs sur les étapes qui parcourent tout le texte."""
+    # Fonctions à passage unique
+    for name in ('clean_special_characters', 'normalize_arabic_chars', 'analyze_text'):
+        setattr(preprocessing, name, count_pass(name, getattr(preprocessing, name)))
+
+    # Boucle emoji / tests de langue: un parcours seulement sans analyse
+    preprocessing.extract_emoji_sentiment = count_pass(
+        'extract_emoji_sentiment (boucle)', preprocessing.extract_emoji_sentiment, without_analysis)
+    preprocessing.detect_language = count_pass(
+        'detect_language (3 parcours)', preprocessing.detect_language, without_analysis)
+    preprocessing.is_arabic_text = count_pass(
+        'is_arabic_text (2 parcours)', preprocessing.is_arabic_text,
+        lambda text, analysis=None: analysis is None or analysis.arabic_count > 0)
+
+    # Tokenizer de la librairie emoji (Python pur, le plus coûteux)
+    preprocessing.emoji.replace_emoji = count_pass('emoji.replace_emoji', preprocessing.emoji.replace_emoji)
+
+
+def total_passes(counter):
+    """Parcours du texte: detect_language en fait 3, is_arabic_text 2."""
+    weights = {'detect_language (3 parcours)': 3, 'is_arabic_text (2 parcours)': 2}
+    return sum(count * weights.get(name, 1) for name, count in counter.items())
+
+
+def profile(label, func, posts):
+    passes.clear()
+    start = time.perf_counter()
+    results = [func(post) for post in posts]
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{label}")
+    for name, count in sorted(passes.items()):
+        print(f"   {name:35} {count / len(posts):5.2f} / post")
+    print(f"   {'TOTAL parcours du texte':35} {total_passes(passes) / len(posts):5.2f} / post")
+    print(f"   ⏱️  {elapsed / len(posts) * 1e6:.0f} µs / post")
+    return results, dict(passes)
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        posts = [{'text': post['text']} for post in json.load(f) if post.get('text')]
+    posts = posts * repetitions
+
+    with_emojis = sum(1 for post in posts if preprocessing.analyze_text(post['text']).emoji_chars)
+    print("=" * 60)
+    print("PROFIL process_post - parcours du texte par post")
+    print("=" * 60)
+    print(f"📂 {len(posts)} posts ({with_emojis} avec emojis)")
+
+    instrument()
+
+    legacy, _ = profile("🐢 AVANT (étapes indépendantes)", legacy_process_post, posts)
+    current, _ = profile("🚀 APRÈS (TextAnalysis partagée)",
+                         lambda post: preprocessing.process_post(post)[0], posts)
+
+    mismatches = sum(1 for a, b in zip(legacy, current) if a != b)
+    print(f"\n🔍 Parité: {len(posts) - mismatches}/{len(posts)} posts identiques")
+
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+SocialPulse Monastir - Configuration gunicorn (production)
+==========================================================
+    pip install gunicorn
+    gunicorn -c gunicorn.conf.py
+
+Variables d'environnement:
+    SOCIALPULSE_WORKERS      nombre de processus (défaut: 2)
+    SOCIALPULSE_THREADS      threads par worker (défaut: 4); les requêtes
+                             concurrentes d'un worker sont regroupées par
+                             le micro-batcher en un seul batch BERT
+    SOCIALPULSE_NUM_THREADS  threads torch / ONNX par worker
+                             (défaut: cœurs // workers)
+    SOCIALPULSE_BIND         adresse d'écoute (défaut: 0.0.0.0:5000)
+"""
+
+import os
+
+workers = int(os.environ.get('SOCIALPULSE_WORKERS', 2))
+threads = int(os.environ.get('SOCIALPULSE_THREADS', 4))
+worker_class = 'gthread'
+bind = os.environ.get('SOCIALPULSE_BIND', '0.0.0.0:5000')
+timeout = int(os.environ.get('SOCIALPULSE_TIMEOUT', 60))
+
+# Partage des cœurs entre workers (lu par api.py au chargement de l'app)
+os.environ.setdefault('SOCIALPULSE_NUM_THREADS', str(max(1, (os.cpu_count() or 1) // workers)))
+
+# Modèles chargés une fois dans le maître puis partagés (copy-on-write)
+preload_app = True
+pythonpath = 'src'
+wsgi_app = 'wsgi:create_app()'
+
+
+def post_fork(server, worker):
+    """Réglages propres à chaque worker (threads, sessions non fork-safe)."""
+    import wsgi
+    wsgi.post_fork_worker()
@@ -9,11 +9,19 @@ Date: 2025
 
 import os
 import sys
+import json
+import time
+import queue
 import pickle
-import torch
-from flask import Flask, request, jsonify, send_from_directory
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+# torch / transformers / onnxruntime sont importés à la demande (chargement
+# des modèles) pour que le serveur démarre et réponde à /health sans attendre
+from micro_batcher import MicroBatcher
+from prediction_cache import PredictionCache, cached_predict
 
 # ============================================================
 # CONFIGURATION
@@ -31,10 +39,67 @@ CORS(app)
 LABEL_EMOJI = {'positive': '✅', 'negative': '❌', 'neutral': '⚪'}
 ID_TO_LABEL = {0: 'negative', 1: 'neutral', 2: 'positive'}
 
+# Batchs: nombre max de textes par requête /predict/batch et taille
+# des passes forward BERT (le coût par texte est amorti sur le batch)
+MAX_BATCH_TEXTS = int(os.environ.get('SOCIALPULSE_MAX_BATCH_TEXTS', 500))
+BERT_BATCH_SIZE = int(os.environ.get('SOCIALPULSE_BERT_BATCH_SIZE', 32))
+
+# Backend d'inférence BERT: 'torch' (défaut), 'onnx' ou 'onnx-int8'
+# (exporter d'abord avec: python src/onnx_backend.py [--quantize])
+BERT_BACKEND = os.environ.get('SOCIALPULSE_BERT_BACKEND', 'torch').lower()
+
+# Quantification du backend torch: '' (float32) ou 'dynamic' (Linear en int8, CPU)
+BERT_QUANTIZE = os.environ.get('SOCIALPULSE_BERT_QUANTIZE', '').lower() or None
+
+# Threads d'inférence par processus (torch / ONNX Runtime), 0 = défaut de
+# la bibliothèque. En production: cœurs / workers (voir gunicorn.conf.py)
+NUM_THREADS = int(os.environ.get('SOCIALPULSE_NUM_THREADS', 0))
+
+# /predict/stream: posts lus et prédits par paquets de cette taille
+# (mémoire bornée quel que soit le volume envoyé)
+STREAM_CHUNK_SIZE = int(os.environ.get('SOCIALPULSE_STREAM_CHUNK_SIZE', 128))
+
+# Micro-batching de /predict: les requêtes BERT arrivées dans la même
+# fenêtre sont regroupées en un seul batch (latence ajoutée <= fenêtre)
+MICROBATCH_ENABLED = os.environ.get('SOCIALPULSE_MICROBATCH', '1') == '1'
+MICROBATCH_WAIT_MS = float(os.environ.get('SOCIALPULSE_MICROBATCH_WAIT_MS', 5))
+MICROBATCH_MAX_SIZE = int(os.environ.get('SOCIALPULSE_MICROBATCH_MAX_SIZE', 32))
+MICROBATCH_MAX_QUEUE = int(os.environ.get('SOCIALPULSE_MICROBATCH_MAX_QUEUE', 1024))
+PREDICT_TIMEOUT_S = float(os.environ.get('SOCIALPULSE_PREDICT_TIMEOUT_S', 2.0))
+
+# Cache des prédictions (0 = désactivé)
+CACHE_SIZE = int(os.environ.get('SOCIALPULSE_CACHE_SIZE', 10000))
+CACHE_TTL_S = float(os.environ.get('SOCIALPULSE_CACHE_TTL_S', 3600))
+
+# Échauffement avant /ready: nombre de textes (0 = désactivé) et fichier
+# optionnel de textes (un par ligne, ou liste JSON)
+WARMUP_SIZE = int(os.environ.get('SOCIALPULSE_WARMUP_SIZE', 8))
+WARMUP_FILE = os.environ.get('SOCIALPULSE_WARMUP_FILE')
+DEFAULT_WARMUP_TEXTS = [
+    "jaw behi",
+    "mochkla kbira zahma fi tri9 el monastir",
+    "ghodwa fama match fil stade mustapha ben jannet",
+    "el festival ta3 monastir rawaa barcha w el nes el kol ferhanin",
+]
+
 # Variables globales pour les modèles
 BERT_MODEL = None
 SKLEARN_MODEL = None
 
+# Version des modèles chargés (fait partie de la clé du cache)
+MODEL_VERSIONS = {'bert': None, 'sklearn': None}
+PREDICTION_CACHE = PredictionCache(max_size=CACHE_SIZE, ttl_seconds=CACHE_TTL_S)
+
+# État du chargement en arrière-plan (exposé par /ready et /health)
+MODELS_READY = threading.Event()
+LOADING_STATE = {
+    'status': 'not_started',   # not_started | loading | warming_up | ready | failed
+    'started_at': None,
+    'load_seconds': None,
+    'warmup_seconds': None,
+    'error': None,
+}
+
 
 # ============================================================
 # CHARGEMENT DES MODÈLES
@@ -46,10 +111,20 @@ def get_project_root():
     return os.path. dirname(script_dir)
 
 
-def load_bert_model():
-    """Charge le modèle BERT."""
+def load_bert_model(backend=None, quantize=None):
+    """
+    Charge le modèle BERT.
+    
+    Args:
+        backend: 'torch', 'onnx' ou 'onnx-int8' (défaut: SOCIALPULSE_BERT_BACKEND)
+        quantize: None ou 'dynamic', backend torch (défaut: SOCIALPULSE_BERT_QUANTIZE)
+    """
     global BERT_MODEL
     
+    backend = (backend or BERT_BACKEND).lower()
+    quantize = quantize or BERT_QUANTIZE
+    if quantize not in (None, 'dynamic'):
+        raise ValueError(f"quantize doit être None ou 'dynamic', reçu: {quantize!r}")
     project_root = get_project_root()
     checkpoints_dir = os. path. join(project_root, 'models', 'bert_checkpoints')
     
@@ -59,19 +134,38 @@ def load_bert_model():
             checkpoints.sort(key=lambda x: int(x. split('-')[1]))
             checkpoint_path = os.path.join(checkpoints_dir, checkpoints[-1])
             
-            print("📥 Chargement BERT:  " + checkpoints[-1])
-            
-            tokenizer = AutoTokenizer.from_pretrained('CAMeL-Lab/bert-base-arabic-camelbert-mix')
-            model = AutoModelForSequenceClassification.from_pretrained(checkpoint_path)
-            device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-            model.to(device)
-            model.eval()
+            print(f"📥 Chargement BERT:  {checkpoints[-1]} ({backend})")
             
-            BERT_MODEL = {
-                'model': model,
-                'tokenizer': tokenizer,
-                'device': device
-            }
+            if backend in ('onnx', 'onnx-int8'):
+                from onnx_backend import load_onnx_model
+                BERT_MODEL = load_onnx_model(
+                    checkpoint_path, quantized=(backend == 'onnx-int8'), num_threads=NUM_THREADS or None
+                )
+            else:
+                import torch
+                from transformers import AutoModelForSequenceClassification
+                from model_bert import load_checkpoint_tokenizer, quantize_dynamic_model
+                
+                tokenizer = load_checkpoint_tokenizer(checkpoint_path)
+                model = AutoModelForSequenceClassification.from_pretrained(checkpoint_path)
+                
+                if quantize == 'dynamic':
+                    # Kernels int8 CPU: plus de workers par machine, sans réentraînement
+                    model = quantize_dynamic_model(model)
+                    device = torch.device('cpu')
+                else:
+                    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+                    model.to(device)
+                    model.eval()
+                
+                BERT_MODEL = {
+                    'model': model,
+                    'tokenizer': tokenizer,
+                    'device': device,
+                    'backend': 'torch-int8' if quantize else 'torch'
+                }
+            MODEL_VERSIONS['bert'] = f"{checkpoints[-1]}@{os.path.getmtime(checkpoint_path)}:{BERT_MODEL['backend']}"
+            PREDICTION_CACHE.invalidate('bert')
             print("✅ BERT chargé!")
             return True
     
@@ -90,6 +184,8 @@ def load_sklearn_model():
         print("📥 Chargement Naive Bayes...")
         with open(model_path, 'rb') as f:
             SKLEARN_MODEL = pickle. load(f)
+        MODEL_VERSIONS['sklearn'] = str(os.path.getmtime(model_path))
+        PREDICTION_CACHE.invalidate('sklearn')
         print("✅ Naive Bayes chargé!")
         return True
     
@@ -97,6 +193,89 @@ def load_sklearn_model():
     return False
 
 
+def get_warmup_texts():
+    """Textes d'échauffement: SOCIALPULSE_WARMUP_FILE ou exemples par défaut."""
+    texts = DEFAULT_WARMUP_TEXTS
+    
+    if WARMUP_FILE and os.path.exists(WARMUP_FILE):
+        with open(WARMUP_FILE, 'r', encoding='utf-8') as f:
+            if WARMUP_FILE.endswith('.json'):
+                texts = [t if isinstance(t, str) else t.get('text', '') for t in json.load(f)]
+            else:
+                texts = [line.strip() for line in f]
+        texts = [t for t in texts if t] or DEFAULT_WARMUP_TEXTS
+    
+    return [texts[i % len(texts)] for i in range(WARMUP_SIZE)]
+
+
+def warmup_models():
+    """
+    Passe un batch dans chaque modèle chargé (hors cache): allocations,
+    kernels et threads sont initialisés avant la première vraie requête.
+    """
+    texts = get_warmup_texts()
+    if not texts:
+        return
+    
+    if BERT_MODEL is not None:
+        predict_bert_batch(texts)
+        # Le texte seul: forme (1, n) utilisée par /predict
+        predict_bert_batch(texts[:1])
+    if SKLEARN_MODEL is not None:
+        predict_sklearn_batch(texts)
+    
+    print(f"🔥 Échauffement: {len(texts)} textes")
+
+
+def load_models(warmup=True):
+    """
+    Charge les modèles puis les échauffe; MODELS_READY n'est levé
+    qu'ensuite. Appelé directement ou dans un thread (start_model_loading).
+    """
+    MODELS_READY.clear()
+    LOADING_STATE.update(status='loading', started_at=time.time(), error=None)
+    start = time.perf_counter()
+    
+    try:
+        load_bert_model()
+        load_sklearn_model()
+        LOADING_STATE['load_seconds'] = round(time.perf_counter() - start, 2)
+        
+        if warmup:
+            LOADING_STATE['status'] = 'warming_up'
+            warmup_start = time.perf_counter()
+            warmup_models()
+            LOADING_STATE['warmup_seconds'] = round(time.perf_counter() - warmup_start, 2)
+    except Exception as e:
+        LOADING_STATE.update(status='failed', error=str(e))
+        print(f"❌ Chargement des modèles échoué: {e}")
+        return False
+    
+    LOADING_STATE['status'] = 'ready'
+    MODELS_READY.set()
+    print(f"✅ Prêt en {time.perf_counter() - start:.1f}s")
+    return True
+
+
+def start_model_loading(warmup=True):
+    """Lance load_models en arrière-plan; le serveur répond pendant ce temps."""
+    thread = threading.Thread(target=load_models, kwargs={'warmup': warmup},
+                              name='model-loader', daemon=True)
+    thread.start()
+    return thread
+
+
+def models_loading_response():
+    """Réponse 503 si aucun modèle n'est encore disponible, sinon None."""
+    if BERT_MODEL is None and SKLEARN_MODEL is None and not MODELS_READY.is_set():
+        return jsonify({
+            'success': False,
+            'error': 'Modèles en cours de chargement, réessayez plus tard',
+            'status': LOADING_STATE['status']
+        }), 503
+    return None
+
+
 # ============================================================
 # FONCTIONS DE PRÉDICTION
 # ============================================================
@@ -106,36 +285,42 @@ def predict_bert(text):
     if BERT_MODEL is None:
         return None
     
-    model = BERT_MODEL['model']
-    tokenizer = BERT_MODEL['tokenizer']
-    device = BERT_MODEL['device']
-    
-    encoding = tokenizer(
-        text,
-        truncation=True,
-        padding='max_length',
-        max_length=128,
-        return_tensors='pt'
-    )
-    
-    input_ids = encoding['input_ids'].to(device)
-    attention_mask = encoding['attention_mask'].to(device)
-    
-    with torch.no_grad():
-        outputs = model(input_ids=input_ids, attention_mask=attention_mask)
-        probs = torch.nn.functional.softmax(outputs. logits, dim=-1)[0]
-        pred_id = torch.argmax(probs).item()
-        confidence = probs[pred_id].item()
-    
-    return {
-        'label': ID_TO_LABEL[pred_id],
-        'confidence': round(confidence * 100, 1),
-        'probabilities': {
-            'positive':  round(probs[2].item() * 100, 1),
-            'neutral': round(probs[1].item() * 100, 1),
-            'negative': round(probs[0].item() * 100, 1)
-        }
-    }
+    return predict_bert_cached([text])[0]
+
+
+def predict_bert_cached(texts):
+    """Prédiction BERT d'une liste de textes, via le cache."""
+    return cached_predict(PREDICTION_CACHE, 'bert', MODEL_VERSIONS['bert'], texts, predict_bert_batch)
+
+
+def predict_bert_batch(texts):
+    """Prédiction BERT par batchs (padding dynamique), dans l'ordre des textes."""
+    if BERT_MODEL is None:
+        return None
+    
+    if BERT_MODEL['backend'].startswith('onnx'):
+        from onnx_backend import onnx_predict_proba
+        probs = onnx_predict_proba(BERT_MODEL, texts, batch_size=BERT_BATCH_SIZE)
+    else:
+        from model_bert import batch_predict_proba
+        probs = batch_predict_proba(
+            BERT_MODEL['model'], BERT_MODEL['tokenizer'], texts, BERT_MODEL['device'],
+            batch_size=BERT_BATCH_SIZE
+        )
+    
+    results = []
+    for pred_id, row in zip(probs.argmax(axis=1).tolist(), probs.tolist()):
+        results.append({
+            'label': ID_TO_LABEL[pred_id],
+            'confidence': round(row[pred_id] * 100, 1),
+            'probabilities': {
+                'positive':  round(row[2] * 100, 1),
+                'neutral': round(row[1] * 100, 1),
+                'negative': round(row[0] * 100, 1)
+            }
+        })
+    
+    return results
 
 
 def predict_sklearn(text):
@@ -143,26 +328,76 @@ def predict_sklearn(text):
     if SKLEARN_MODEL is None: 
         return None
     
+    return predict_sklearn_cached([text])[0]
+
+
+def predict_sklearn_cached(texts):
+    """Prédiction Naive Bayes d'une liste de textes, via le cache."""
+    return cached_predict(PREDICTION_CACHE, 'sklearn', MODEL_VERSIONS['sklearn'], texts, predict_sklearn_batch)
+
+
+def predict_sklearn_batch(texts):
+    """Prédiction Naive Bayes: une seule vectorisation pour tous les textes."""
+    if SKLEARN_MODEL is None: 
+        return None
+    
     model = SKLEARN_MODEL['model']
     vectorizer = SKLEARN_MODEL['vectorizer']
     
-    X = vectorizer.transform([text])
-    prediction = model.predict(X)[0]
+    X = vectorizer.transform(texts)
+    predictions = model.predict(X)
     
     try:
-        proba = model.predict_proba(X)[0]
+        probas = model.predict_proba(X)
         classes = model.classes_
-        probabilities = {cls: round(float(p) * 100, 1) for cls, p in zip(classes, proba)}
-        confidence = round(max(proba) * 100, 1)
     except:
-        probabilities = {}
-        confidence = 50.0
+        probas = None
+    
+    results = []
+    for i, prediction in enumerate(predictions):
+        if probas is not None:
+            proba = probas[i]
+            probabilities = {cls: round(float(p) * 100, 1) for cls, p in zip(classes, proba)}
+            confidence = round(max(proba) * 100, 1)
+        else:
+            probabilities = {}
+            confidence = 50.0
+        
+        results.append({
+            'label': prediction,
+            'confidence': confidence,
+            'probabilities': probabilities
+        })
+    
+    return results
+
+
+def predict_bert_many(texts):
+    """predict_bert_batch pour le micro-batcher (erreur si BERT déchargé)."""
+    results = predict_bert_batch(texts)
+    if results is None:
+        raise RuntimeError("BERT non chargé")
+    return results
+
+
+BERT_BATCHER = MicroBatcher(
+    predict_bert_many,
+    max_batch_size=MICROBATCH_MAX_SIZE,
+    max_wait_ms=MICROBATCH_WAIT_MS,
+    max_queue_size=MICROBATCH_MAX_QUEUE
+)
+
+
+def predict_bert_coalesced(text):
+    """Prédiction BERT d'un texte, regroupée avec les requêtes concurrentes."""
+    if not MICROBATCH_ENABLED:
+        return predict_bert(text)
     
-    return {
-        'label': prediction,
-        'confidence': confidence,
-        'probabilities': probabilities
-    }
+    # Le cache est consulté avant la file: un hit n'attend pas la fenêtre
+    def predict_many(texts):
+        return [BERT_BATCHER.predict(t, timeout=PREDICT_TIMEOUT_S) for t in texts]
+    
+    return cached_predict(PREDICTION_CACHE, 'bert', MODEL_VERSIONS['bert'], [text], predict_many)[0]
 
 
 # ============================================================
@@ -184,9 +419,11 @@ def home():
         'endpoints': {
             'GET /': 'Cette page',
             'GET /health': 'Status de l\'API',
+            'GET /ready': 'Modèles chargés et échauffés (200) ou non (503)',
             'GET /dashboard': 'Dashboard Web',
             'POST /predict':  'Prédire le sentiment d\'un texte',
             'POST /predict/batch': 'Prédire plusieurs textes',
+            'POST /predict/stream': 'Prédire un flux NDJSON de posts (réponse NDJSON)',
             'GET /models':  'Liste des modèles disponibles'
         }
     })
@@ -194,16 +431,37 @@ def home():
 
 @app.route('/health')
 def health():
-    """Vérifie le status de l'API."""
+    """Vérifie le status de l'API (vivant, même pendant le chargement)."""
     return jsonify({
         'status':  'ok',
+        'loading': LOADING_STATE,
         'models': {
             'bert_loaded': BERT_MODEL is not None,
+            'bert_backend': BERT_MODEL['backend'] if BERT_MODEL else None,
             'sklearn_loaded':  SKLEARN_MODEL is not None
-        }
+        },
+        'micro_batching': {
+            'enabled': MICROBATCH_ENABLED,
+            **BERT_BATCHER.get_metrics()
+        },
+        'cache': PREDICTION_CACHE.get_stats()
     })
 
 
+@app.route('/ready')
+def ready():
+    """Prêt à servir: modèles chargés et échauffés (503 sinon)."""
+    is_ready = MODELS_READY.is_set()
+    return jsonify({
+        'ready': is_ready,
+        'status': LOADING_STATE['status'],
+        'models': {
+            'bert_loaded': BERT_MODEL is not None,
+            'sklearn_loaded':  SKLEARN_MODEL is not None
+        }
+    }), 200 if is_ready else 503
+
+
 @app.route('/models')
 def models():
     """Liste les modèles disponibles."""
@@ -223,6 +481,25 @@ def models():
     })
 
 
+def choose_model(model_choice):
+    """
+    Modèle utilisé par /predict, /predict/batch et /predict/stream: le
+    modèle demandé s'il est chargé, sinon BERT, sinon sklearn.
+    
+    Returns:
+        'bert', 'sklearn' ou None (aucun modèle chargé)
+    """
+    if model_choice == 'bert' and BERT_MODEL:
+        return 'bert'
+    if model_choice == 'sklearn' and SKLEARN_MODEL:
+        return 'sklearn'
+    if BERT_MODEL:
+        return 'bert'
+    if SKLEARN_MODEL:
+        return 'sklearn'
+    return None
+
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """Prédit le sentiment d'un texte."""
@@ -248,23 +525,29 @@ def predict():
             'error': 'Le texte ne peut pas être vide'
         }), 400
     
-    model_choice = data.get('model', 'bert').lower()
+    not_ready = models_loading_response()
+    if not_ready:
+        return not_ready
+    
+    model_used = choose_model(data.get('model', 'bert').lower())
     
     result = None
-    model_used = None
     
-    if model_choice == 'bert' and BERT_MODEL:
-        result = predict_bert(text)
-        model_used = 'bert'
-    elif model_choice == 'sklearn' and SKLEARN_MODEL:
-        result = predict_sklearn(text)
-        model_used = 'sklearn'
-    elif BERT_MODEL:
-        result = predict_bert(text)
-        model_used = 'bert'
-    elif SKLEARN_MODEL:
-        result = predict_sklearn(text)
-        model_used = 'sklearn'
+    try:
+        if model_used == 'bert':
+            result = predict_bert_coalesced(text)
+        elif model_used == 'sklearn':
+            result = predict_sklearn(text)
+    except queue.Full:
+        return jsonify({
+            'success': False,
+            'error': 'Serveur surchargé, réessayez plus tard'
+        }), 503
+    except FutureTimeoutError:
+        return jsonify({
+            'success': False,
+            'error': 'Délai de prédiction dépassé'
+        }), 503
     
     if result is None:
         return jsonify({
@@ -314,44 +597,55 @@ def predict_batch():
             'error':  'La liste ne peut pas être vide'
         }), 400
     
-    if len(texts) > 100:
+    if len(texts) > MAX_BATCH_TEXTS:
         return jsonify({
             'success': False,
-            'error':  'Maximum 100 textes par requête'
+            'error':  f'Maximum {MAX_BATCH_TEXTS} textes par requête'
         }), 400
     
-    model_choice = data.get('model', 'bert').lower()
+    for i, text in enumerate(texts):
+        if not isinstance(text, str):
+            return jsonify({
+                'success': False,
+                'error': f'"texts[{i}]" doit être une chaîne de caractères'
+            }), 400
+    
+    not_ready = models_loading_response()
+    if not_ready:
+        return not_ready
+    
+    # Les textes vides sont ignorés (et non comptés dans le résumé)
+    texts = [text.strip() for text in texts if text.strip()]
     
     results = []
     summary = {'total': len(texts), 'positive': 0, 'negative': 0, 'neutral': 0}
     model_used = None
-    
-    for text in texts:
-        if not text or not text.strip():
-            continue
-        
-        text = text.strip()
-        
-        if model_choice == 'bert' and BERT_MODEL: 
-            result = predict_bert(text)
-            model_used = 'bert'
-        elif SKLEARN_MODEL:
-            result = predict_sklearn(text)
-            model_used = 'sklearn'
+    batch_results = []
+    
+    # Un seul appel par modèle pour tout le batch
+    if texts:
+        model_used = choose_model(data.get('model', 'bert').lower())
+        if model_used == 'bert':
+            batch_results = predict_bert_cached(texts)
+        elif model_used == 'sklearn':
+            batch_results = predict_sklearn_cached(texts)
         else:
-            continue
+            return jsonify({
+                'success': False,
+                'error':  'Aucun modèle disponible'
+            }), 500
+    
+    for text, result in zip(texts, batch_results):
+        results.append({
+            'text': text,
+            'sentiment':  result['label'],
+            'confidence': result['confidence'],
+            'emoji': LABEL_EMOJI. get(result['label'], '•'),
+            'probabilities': result['probabilities']
+        })
         
-        if result:
-            results.append({
-                'text': text,
-                'sentiment':  result['label'],
-                'confidence': result['confidence'],
-                'emoji': LABEL_EMOJI. get(result['label'], '•'),
-                'probabilities': result['probabilities']
-            })
-            
-            if result['label'] in summary:
-                summary[result['label']] += 1
+        if result['label'] in summary:
+            summary[result['label']] += 1
     
     return jsonify({
         'success': True,
@@ -361,6 +655,110 @@ def predict_batch():
     })
 
 
+def iter_stream_chunks(stream, chunk_size):
+    """
+    Lit un flux NDJSON ligne par ligne et le découpe en paquets de posts.
+    
+    Chaque ligne est un objet {"id": ..., "text": ...} (ou une chaîne JSON).
+    Les lignes invalides sont rendues avec leur erreur au lieu du texte.
+    
+    Yields:
+        Liste de (numéro de ligne, id, texte ou None, erreur ou None)
+    """
+    chunk = []
+    line_no = 0
+    
+    for raw_line in stream:
+        line_no += 1
+        line = raw_line.decode('utf-8-sig' if line_no == 1 else 'utf-8', errors='replace').strip()
+        if not line:
+            continue
+        
+        post_id, text, error = line_no, None, None
+        try:
+            item = json.loads(line)
+            if isinstance(item, str):
+                text = item
+            elif isinstance(item, dict):
+                post_id = item.get('id', line_no)
+                text = item.get('text')
+            if not isinstance(text, str) or not text.strip():
+                text, error = None, 'Le champ "text" est requis'
+        except json.JSONDecodeError:
+            error = 'Ligne JSON invalide'
+        
+        chunk.append((line_no, post_id, text.strip() if text else None, error))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    
+    if chunk:
+        yield chunk
+
+
+@app.route('/predict/stream', methods=['POST'])
+def predict_stream():
+    """
+    Prédit un flux NDJSON de posts et renvoie les résultats en NDJSON au
+    fur et à mesure (un paquet interne à la fois).
+    
+    Le corps n'est lu que lorsque le client consomme la réponse: la
+    mémoire reste bornée à un paquet (STREAM_CHUNK_SIZE posts).
+    
+    Paramètre: ?model=bert|sklearn
+    Dernière ligne: {"done": true, "summary": {...}, "model_used": ...}
+    """
+    not_ready = models_loading_response()
+    if not_ready:
+        return not_ready
+    
+    # Choix du modèle AVANT d'envoyer les en-têtes: une erreur pendant le
+    # flux ne pourrait plus être signalée au client
+    model_used = choose_model(request.args.get('model', 'bert').lower())
+    if model_used == 'bert':
+        predict_many = predict_bert_cached
+    elif model_used == 'sklearn':
+        predict_many = predict_sklearn_cached
+    else:
+        return jsonify({
+            'success': False,
+            'error':  'Aucun modèle disponible'
+        }), 500
+    
+    stream = request.stream
+    
+    def generate():
+        summary = {'total': 0, 'errors': 0, 'positive': 0, 'negative': 0, 'neutral': 0}
+        
+        for chunk in iter_stream_chunks(stream, STREAM_CHUNK_SIZE):
+            valid = [item for item in chunk if item[3] is None]
+            predictions = iter(predict_many([text for _, _, text, _ in valid]) if valid else [])
+            
+            lines = []
+            for line_no, post_id, text, error in chunk:
+                summary['total'] += 1
+                if error is not None:
+                    summary['errors'] += 1
+                    record = {'id': post_id, 'line': line_no, 'error': error}
+                else:
+                    result = next(predictions)
+                    if result['label'] in summary:
+                        summary[result['label']] += 1
+                    record = {
+                        'id': post_id,
+                        'sentiment': result['label'],
+                        'confidence': result['confidence'],
+                        'probabilities': result['probabilities']
+                    }
+                lines.append(json.dumps(record, ensure_ascii=False))
+            
+            yield '\n'.join(lines) + '\n'
+        
+        yield json.dumps({'done': True, 'summary': summary, 'model_used': model_used}, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 # ============================================================
 # ROUTES STATIC (Dashboard)
 # ============================================================
@@ -392,15 +790,19 @@ if __name__ == '__main__':
     print("🚀 SOCIALPULSE MONASTIR - API")
     print("=" * 60)
     
-    # Charger les modèles
-    load_bert_model()
-    load_sklearn_model()
+    # Charger les modèles en arrière-plan (/ready passe à 200 une fois
+    # l'échauffement terminé). Avec le reloader de debug, seul le processus
+    # enfant (WERKZEUG_RUN_MAIN) sert les requêtes et charge les modèles.
+    debug = True
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_model_loading()
     
     print("\n" + "-" * 60)
     print("📡 Démarrage du serveur...")
     print("   URL: http://localhost:5000")
     print("   Dashboard: http://localhost:5000/dashboard")
+    print("   Production: gunicorn -c gunicorn.conf.py")
     print("-" * 60 + "\n")
     
     # Démarrer le serveur
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, debug=debug)
\ No newline at end of file
@@ -10,11 +10,12 @@ Techniques utilisées:
 
 """
 
-import json
 import os
 import random
 from collections import Counter
 
+from ingestion.jsonl import iter_posts, write_posts, buffered_shuffle
+
 # ============================================
 # DICTIONNAIRE DE SYNONYMES DARIJA
 # ============================================
@@ -289,52 +290,50 @@ def generate_synthetic_dataset(n_per_class=20):
 # PIPELINE D'AUGMENTATION
 # ============================================
 
-def augment_dataset(input_path, output_path, target_per_class=50):
-    """
-    Augmente le dataset pour équilibrer les classes.
+def augment_posts(items, target_per_class=50):
     """
-    print("=" * 70)
-    print("SOCIALPULSE MONASTIR - Data Augmentation")
-    print("=" * 70)
+    Augmente un flux d'exemples pour équilibrer les classes (générateur).
     
-    # Charger les données originales
-    print("\n[1] Chargement:  " + input_path)
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    Les originaux sont produits au fil de l'eau; seuls les exemples des
+    classes encore sous target_per_class sont gardés (au plus
+    target_per_class par classe) pour générer les variations à la fin.
     
-    print("    " + str(len(data)) + " echantillons charges")
+    Args:
+        items: Itérable d'exemples {'text', 'label'} (générateur accepté)
+        target_per_class: Nombre d'exemples visé par classe
     
-    # Compter les classes
-    counter = Counter(item['label'] for item in data)
-    print("\n[2] Distribution originale:")
-    for label, count in counter.items():
-        print("    - " + label + ":  " + str(count))
-    
-    # Séparer par classe
+    Yields:
+        dict: {'text', 'label', 'source'} (original, augmented, synthetic)
+    """
+    counter = {'positive': 0, 'negative': 0, 'neutral': 0}
     by_class = {'positive': [], 'negative': [], 'neutral': []}
-    for item in data:
-        by_class[item['label']]. append(item)
     
-    # Augmenter chaque classe
-    augmented_data = []
+    # Ajouter les originaux
+    for item in items:
+        label = item['label']
+        counter[label] += 1
+        if len(by_class[label]) < target_per_class:
+            by_class[label].append(item)
+        yield {
+            'text': item['text'],
+            'label': label,
+            'source': 'original'
+        }
+    
+    print("\n[2] Distribution originale:")
+    for label, count in counter.items():
+        if count > 0:
+            print("    - " + label + ":  " + str(count))
     
     print("\n[3] Augmentation en cours...")
     
     for label in ['positive', 'negative', 'neutral']:
         original = by_class[label]
-        current_count = len(original)
+        current_count = counter[label]
         
         print("\n    Classe '" + label + "':  " + str(current_count) + " -> " + str(target_per_class))
         
-        # Ajouter les originaux
-        for item in original: 
-            augmented_data.append({
-                'text': item['text'],
-                'label': label,
-                'source': 'original'
-            })
-        
-        # Augmenter si nécessaire
+        # Augmenter si nécessaire (la classe est alors entièrement dans by_class)
         needed = target_per_class - current_count
         
         if needed > 0:
@@ -351,11 +350,11 @@ def augment_dataset(input_path, output_path, target_per_class=50):
                     for aug_text in aug_texts: 
                         if augmented_count >= needed:
                             break
-                        augmented_data.append({
+                        yield {
                             'text': aug_text,
                             'label': label,
                             'source': 'augmented'
-                        })
+                        }
                         augmented_count += 1
             
             # Si pas assez, générer des données synthétiques
@@ -363,28 +362,55 @@ def augment_dataset(input_path, output_path, target_per_class=50):
             if remaining > 0:
                 print("      + Generation de " + str(remaining) + " posts synthetiques")
                 for _ in range(remaining):
-                    text = generate_synthetic_post(label)
-                    augmented_data.append({
-                        'text': text,
+                    yield {
+                        'text': generate_synthetic_post(label),
                         'label': label,
                         'source': 'synthetic'
-                    })
+                    }
             
             print("      + " + str(needed) + " echantillons ajoutes")
         else:
             print("      (pas besoin d'augmentation)")
+
+
+def augment_dataset(input_path, output_path, target_per_class=50, keep_results=False,
+                    shuffle_buffer=10000):
+    """
+    Augmente le dataset pour équilibrer les classes.
+    
+    Lecture et écriture en flux (tableau JSON ou JSONL selon l'extension).
+    Par défaut (keep_results=False), la mémoire reste bornée: le mélange se
+    fait dans un buffer de shuffle_buffer exemples et la fonction retourne
+    None. keep_results=True mélange et retourne le dataset complet.
+    """
+    print("=" * 70)
+    print("SOCIALPULSE MONASTIR - Data Augmentation")
+    print("=" * 70)
+    
+    print("\n[1] Lecture en flux:  " + input_path)
+    augmented = augment_posts(iter_posts(input_path), target_per_class=target_per_class)
     
     # Mélanger
-    random.shuffle(augmented_data)
+    if keep_results:
+        augmented_data = list(augmented)
+        random.shuffle(augmented_data)
+        augmented = augmented_data
+    else:
+        augmented_data = None
+        augmented = buffered_shuffle(augmented, shuffle_buffer)
+    
+    final_counter = Counter()
+    source_counter = Counter()
+    
+    def track(items):
+        for item in items:
+            final_counter[item['label']] += 1
+            source_counter[item['source']] += 1
+            yield item
     
     # Sauvegarder
     print("\n[4] Sauvegarde: " + output_path)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(augmented_data, f, ensure_ascii=False, indent=2)
-    
-    # Statistiques finales
-    final_counter = Counter(item['label'] for item in augmented_data)
-    source_counter = Counter(item['source'] for item in augmented_data)
+    total = write_posts(output_path, track(augmented))
     
     print("\n" + "=" * 70)
     print("RESULTATS")
@@ -400,7 +426,7 @@ def augment_dataset(input_path, output_path, target_per_class=50):
     for source, count in source_counter.items():
         print("    - " + source + ": " + str(count))
     
-    print("\n[+] Total: " + str(len(augmented_data)) + " echantillons")
+    print("\n[+] Total: " + str(total) + " echantillons")
     
     print("\n" + "=" * 70)
     print("TERMINE!")
@@ -0,0 +1,203 @@
+"""
+SocialPulse Monastir - Lecture/écriture en flux des posts
+=========================================================
+Lit et écrit les posts un par un pour garder une mémoire constante,
+quelle que soit la taille du fichier.
+
+Formats supportés:
+- JSONL / NDJSON: un objet JSON par ligne
+- Tableau JSON (format historique des fichiers data/processed/*.json)
+"""
+
+import os
+import json
+import uuid
+import random
+from itertools import islice
+
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+
+_WHITESPACE = ' \t\r\n'
+_VALUE_END = _WHITESPACE + ',]'
+
+
+def is_jsonl_path(path):
+    """Vérifie si le chemin désigne un fichier JSONL (d'après l'extension)."""
+    return path.lower().endswith(JSONL_EXTENSIONS)
+
+
+def _iter_json_array(f, chunk_size=1 << 16):
+    """
+    Décode un tableau JSON élément par élément, sans le charger en entier.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    state = 'open'  # open -> value_or_end -> comma_or_end -> value -> ...
+
+    while True:
+        # Libérer la partie déjà décodée du buffer
+        if pos > chunk_size:
+            buffer = buffer[pos:]
+            pos = 0
+
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("Tableau JSON incomplet (']' manquant)")
+            data = f.read(chunk_size)
+            eof = not data
+            buffer += data
+            continue
+
+        char = buffer[pos]
+
+        if state == 'open':
+            if char != '[':
+                raise ValueError("Le fichier JSON doit contenir un tableau de posts")
+            pos += 1
+            state = 'value_or_end'
+            continue
+
+        if state in ('value_or_end', 'comma_or_end') and char == ']':
+            return
+
+        if state == 'comma_or_end':
+            if char != ',':
+                raise ValueError(f"Séparateur ',' attendu, trouvé {char!r}")
+            pos += 1
+            state = 'value'
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            value, end = None, None
+
+        # Valeur incomplète, ou nombre peut-être tronqué ("1" de "1.5"): lire la suite
+        truncated = end is not None and (end == len(buffer) or buffer[end] not in _VALUE_END)
+        if end is None or (truncated and not eof):
+            data = f.read(chunk_size)
+            eof = not data
+            buffer += data
+            continue
+
+        yield value
+        pos = end
+        state = 'comma_or_end'
+
+
+def iter_posts(path):
+    """
+    Itère sur les posts d'un fichier JSONL ou d'un tableau JSON.
+
+    Le format est détecté sur le premier caractère ('[' = tableau JSON).
+
+    Args:
+        path: Chemin du fichier d'entrée
+
+    Yields:
+        dict: Un post à la fois
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        first_char = ''
+        while True:
+            first_char = f.read(1)
+            if not first_char or first_char not in _WHITESPACE:
+                break
+        f.seek(0)
+
+        if first_char == '[':
+            yield from _iter_json_array(f)
+            return
+
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: ligne JSONL invalide ({e})") from e
+
+
+def write_posts(path, posts, jsonl=None):
+    """
+    Écrit les posts au fil de l'eau.
+
+    L'écriture se fait dans un fichier temporaire du même dossier, qui
+    remplace path à la fin (os.replace): path peut donc être aussi le
+    fichier lu en flux par posts, et un échec en cours d'écriture laisse
+    l'ancien fichier intact.
+
+    Args:
+        path: Chemin du fichier de sortie
+        posts: Itérable de posts (générateur accepté)
+        jsonl: Forcer le format (par défaut: d'après l'extension). En mode
+               tableau JSON, la sortie est identique à json.dump(..., indent=2)
+
+    Returns:
+        int: Nombre de posts écrits
+    """
+    if jsonl is None:
+        jsonl = is_jsonl_path(path)
+
+    output_dir = os.path.dirname(path)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    temp_path = os.path.join(output_dir, f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+    count = 0
+    try:
+        with open(temp_path, 'x', encoding='utf-8') as f:
+            if jsonl:
+                for post in posts:
+                    f.write(json.dumps(post, ensure_ascii=False))
+                    f.write('\n')
+                    count += 1
+            else:
+                for post in posts:
+                    f.write('[\n  ' if count == 0 else ',\n  ')
+                    f.write(json.dumps(post, ensure_ascii=False, indent=2).replace('\n', '\n  '))
+                    count += 1
+                f.write('\n]' if count else '[]')
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return count
+
+
+def iter_chunks(items, chunk_size):
+    """Découpe un itérable en listes de chunk_size éléments."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def buffered_shuffle(items, buffer_size=10000, rng=random):
+    """
+    Mélange approximatif en flux: seul un buffer de buffer_size éléments
+    est gardé en mémoire (mélange complet si le flux est plus petit).
+    """
+    buffer = []
+    for item in items:
+        if len(buffer) < buffer_size:
+            buffer.append(item)
+            continue
+        idx = rng.randrange(buffer_size)
+        yield buffer[idx]
+        buffer[idx] = item
+
+    rng.shuffle(buffer)
+    yield from buffer
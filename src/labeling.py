@@ -11,8 +11,15 @@ Ce module pré-labelle les posts en utilisant :
 import json
 import os
 import re
+import heapq
+import hashlib
 from collections import Counter
 
+import numpy as np
+
+from ingestion.jsonl import iter_posts, write_posts, iter_chunks
+from lexicon_matcher import LexiconMatcher
+
 # ============================================
 # 1. DICTIONNAIRES DE MOTS-CLÉS DARIJA
 # ============================================
@@ -100,16 +107,199 @@ NEGATORS = {
 }
 
 
+# Portée d'un négateur: il ne s'applique qu'aux mots de sentiment qui
+# commencent au plus NEGATION_SCOPE tokens après lui ("mouch 3ajbetni
+# el jaw" mais pas un "la" isolé en début de post)
+NEGATION_SCOPE = 3
+
+# Taille des lots de label_batch (label_posts / label_dataset)
+LABEL_BATCH_SIZE = 1000
+
+# Règles de scoring (partagées par label_post et label_batch)
+TEXT_WEIGHT = 0.6          # poids du score texte dans le score combiné
+EMOJI_WEIGHT = 0.4         # poids du score emoji
+NEGATION_FACTOR = 0.8      # inversion partielle du score en cas de négation
+LABEL_THRESHOLDS = {
+    'positive': 0.2,   # score >= 0.2 → positif
+    'negative': -0.2,  # score <= -0.2 → négatif
+}
+REVIEW_CONFIDENCE = 0.6    # confiance < 0.6 → révision manuelle
+HIGH_CONFIDENCE = 0.7      # confiance >= 0.7 → haute confiance (statistiques)
+
+# Confiance: base + bonus par palier (seuil, bonus), du plus haut au plus bas
+CONFIDENCE_BASE = 0.5
+CONFIDENCE_WORD_TIERS = ((3, 0.2), (1, 0.1))        # mots de sentiment trouvés
+CONFIDENCE_EMOJI_TIERS = ((2, 0.15), (1, 0.1))      # nombre d'emojis
+CONFIDENCE_SCORE_TIERS = ((0.5, 0.15), (0.3, 0.1))  # |score final|
+CONFIDENCE_AGREEMENT = 0.1  # accord (+) ou désaccord (-) texte/emoji
+
+
 # ============================================
 # 2. FONCTION DE SCORING AUTOMATIQUE
 # ============================================
 
-def calculate_text_sentiment_score(clean_text):
+_LEXICON_MATCHER = None
+
+
+def get_lexicon_matcher():
+    """
+    Automate unique construit à partir de tous les lexiques (une seule fois).
+    Appeler reset_lexicon_matcher() après une modification des lexiques.
+    """
+    global _LEXICON_MATCHER
+    if _LEXICON_MATCHER is None:
+        matcher = LexiconMatcher()
+        matcher.add_many(POSITIVE_WORDS, 'positive')
+        matcher.add_many(NEGATIVE_WORDS, 'negative')
+        matcher.add_many(NEGATORS, 'negator')
+        matcher.add_many(INTENSIFIERS, 'intensifier')
+        _LEXICON_MATCHER = matcher.build()
+    return _LEXICON_MATCHER
+
+
+def reset_lexicon_matcher():
+    """Force la reconstruction de l'automate et de la version (lexiques modifiés)."""
+    global _LEXICON_MATCHER, _LEXICON_VERSION, _FINGERPRINT_KEYS
+    _LEXICON_MATCHER = None
+    _LEXICON_VERSION = None
+    _FINGERPRINT_KEYS = None
+
+
+# ============================================
+# VERSION DES LEXIQUES
+# ============================================
+
+_LEXICON_VERSION = None
+_FINGERPRINT_KEYS = None
+
+
+def lexicon_snapshot():
+    """
+    État complet des lexiques utilisés pour labelliser: entrées texte
+    (avec leurs types/poids), emojis de preprocessing.py et paramètres.
+    """
+    from preprocessing import EMOJI_SENTIMENT_MAP, CONTEXT_DEPENDENT_EMOJIS
+    
+    return {
+        'entries': {phrase: dict(kinds) for phrase, kinds in get_lexicon_matcher().entries.items()},
+        'emojis': {char: dict(info) for char, info in EMOJI_SENTIMENT_MAP.items()},
+        'context_emojis': {char: dict(info) for char, info in CONTEXT_DEPENDENT_EMOJIS.items()},
+        'negation_scope': NEGATION_SCOPE,
+        'scoring': scoring_snapshot(),
+    }
+
+
+def scoring_snapshot():
+    """Règles de scoring globales (un changement touche tous les posts)."""
+    return {
+        'text_weight': TEXT_WEIGHT,
+        'emoji_weight': EMOJI_WEIGHT,
+        'negation_factor': NEGATION_FACTOR,
+        'label_thresholds': dict(LABEL_THRESHOLDS),
+        'review_confidence': REVIEW_CONFIDENCE,
+        'high_confidence': HIGH_CONFIDENCE,
+        'confidence_base': CONFIDENCE_BASE,
+        'confidence_word_tiers': [list(tier) for tier in CONFIDENCE_WORD_TIERS],
+        'confidence_emoji_tiers': [list(tier) for tier in CONFIDENCE_EMOJI_TIERS],
+        'confidence_score_tiers': [list(tier) for tier in CONFIDENCE_SCORE_TIERS],
+        'confidence_agreement': CONFIDENCE_AGREEMENT,
+    }
+
+
+def snapshot_version(snapshot):
+    """Hash court et stable d'un état des lexiques."""
+    payload = json.dumps(snapshot, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def get_lexicon_version():
+    """Version des lexiques courants (calculée une fois)."""
+    global _LEXICON_VERSION
+    if _LEXICON_VERSION is None:
+        _LEXICON_VERSION = snapshot_version(lexicon_snapshot())
+    return _LEXICON_VERSION
+
+
+def get_fingerprint_keys():
+    """Clé d'empreinte de chaque entrée ("expression=[(type, poids)]"), calculée une fois."""
+    global _FINGERPRINT_KEYS
+    if _FINGERPRINT_KEYS is None:
+        _FINGERPRINT_KEYS = {
+            phrase: f"{phrase}={sorted(kinds.items())}"
+            for phrase, kinds in get_lexicon_matcher().entries.items()
+        }
+    return _FINGERPRINT_KEYS
+
+
+def lexicon_fingerprint(matched, emoji_sentiment):
+    """
+    Empreinte des entrées de lexique qui ont servi à labelliser un post
+    (expressions trouvées avec leurs types/poids, emojis avec leur score).
+    """
+    keys = get_fingerprint_keys()
+    parts = sorted(keys[phrase] for phrase in set(matched))
+    if emoji_sentiment:
+        parts.extend(sorted(f"{e['emoji']}={e['score']}" for e in emoji_sentiment.get('emojis', [])))
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()[:12]
+
+
+def match_lexicons(clean_text, negation_scope=NEGATION_SCOPE):
+    """
+    Recherche les lexiques dans un texte (un passage sur les tokens).
+    
+    Returns:
+        tuple: (mots positifs, mots négatifs, négateur dans la portée,
+                intensificateur, toutes les entrées trouvées)
+    """
+    words = clean_text.lower().split()
+    
+    matched = []
+    found_positive = []
+    found_negative = []
+    has_negator = False
+    intensifier = 1.0
+    last_negator_end = None
+    
+    # Un passage sur les occurrences, dans l'ordre du texte
+    for start, end, phrase, kinds in get_lexicon_matcher().match(words):
+        matched.append(phrase)
+        is_sentiment = False
+        if 'positive' in kinds:
+            found_positive.append(phrase)
+            is_sentiment = True
+        if 'negative' in kinds:
+            found_negative.append(phrase)
+            is_sentiment = True
+        
+        # Négateur: dans la portée d'un négateur précédent?
+        if is_sentiment and last_negator_end is not None:
+            if negation_scope is None or start - last_negator_end < negation_scope:
+                has_negator = True
+        
+        if 'negator' in kinds:
+            last_negator_end = end
+            if negation_scope is None:
+                has_negator = True
+        
+        # Calculer l'intensificateur
+        if 'intensifier' in kinds:
+            intensifier *= kinds['intensifier']
+    
+    return found_positive, found_negative, has_negator, intensifier, matched
+
+
+def calculate_text_sentiment_score(clean_text, negation_scope=NEGATION_SCOPE):
     """
     Calcule un score de sentiment basé sur les mots-clés. 
     
+    Les lexiques sont recherchés en un seul passage (automate
+    Aho-Corasick): les expressions de plusieurs mots ("mouch behi",
+    "barcha behi") l'emportent sur les mots qui les composent.
+    
     Args:
         clean_text: Texte nettoyé en Darija latin
+        negation_scope: Distance max (en tokens) entre un négateur et le mot
+                        de sentiment qu'il inverse (None = tout le texte)
     
     Returns:
         dict: {
@@ -129,20 +319,17 @@ def calculate_text_sentiment_score(clean_text):
             'intensifier': 1.0
         }
     
-    words = clean_text.lower().split()
-    
-    # Trouver les mots positifs et négatifs
-    found_positive = [w for w in words if w in POSITIVE_WORDS]
-    found_negative = [w for w in words if w in NEGATIVE_WORDS]
-    
-    # Vérifier les négateurs
-    has_negator = any(w in NEGATORS for w in words)
+    return text_analysis_from_match(match_lexicons(clean_text, negation_scope))
+
+
+def text_analysis_from_match(match):
+    """
+    Score texte à partir du résultat de match_lexicons.
     
-    # Calculer l'intensificateur moyen
-    intensifier = 1.0
-    for word in words:
-        if word in INTENSIFIERS:
-            intensifier *= INTENSIFIERS[word]
+    Returns:
+        dict: voir calculate_text_sentiment_score
+    """
+    found_positive, found_negative, has_negator, intensifier, _ = match
     
     # Calculer le score
     positive_count = len(found_positive)
@@ -159,15 +346,15 @@ def calculate_text_sentiment_score(clean_text):
     
     # Inverser si négateur présent
     if has_negator and abs(score) > 0:
-        score = -score * 0.8  # Inversion partielle
+        score = -score * NEGATION_FACTOR  # Inversion partielle
     
     # Normaliser entre -1 et 1
     score = max(-1, min(1, score))
     
     return {
         'score': round(score, 3),
-        'positive_words':  found_positive,
-        'negative_words': found_negative,
+        'positive_words':  list(found_positive),
+        'negative_words': list(found_negative),
         'has_negator': has_negator,
         'intensifier': round(intensifier, 2)
     }
@@ -189,15 +376,15 @@ def calculate_emoji_sentiment_score(emoji_sentiment):
     return emoji_sentiment. get('avg_score', 0)
 
 
-def combine_sentiment_scores(text_score, emoji_score, text_weight=0.6, emoji_weight=0.4):
+def combine_sentiment_scores(text_score, emoji_score, text_weight=TEXT_WEIGHT, emoji_weight=EMOJI_WEIGHT):
     """
     Combine les scores de sentiment du texte et des emojis.
     
     Args:
         text_score: Score basé sur les mots-clés
         emoji_score: Score basé sur les emojis
-        text_weight: Poids du score texte (défaut: 0.6)
-        emoji_weight: Poids du score emoji (défaut: 0.4)
+        text_weight: Poids du score texte (défaut: TEXT_WEIGHT)
+        emoji_weight: Poids du score emoji (défaut: EMOJI_WEIGHT)
     
     Returns:
         float: Score combiné entre -1 et 1
@@ -228,10 +415,7 @@ def score_to_label(score, thresholds=None):
         str: 'positive', 'negative', ou 'neutral'
     """
     if thresholds is None: 
-        thresholds = {
-            'positive': 0.2,   # score >= 0.2 → positif
-            'negative': -0.2,  # score <= -0.2 → négatif
-        }
+        thresholds = LABEL_THRESHOLDS
     
     if score >= thresholds['positive']:
         return 'positive'
@@ -241,6 +425,14 @@ def score_to_label(score, thresholds=None):
         return 'neutral'
 
 
+def tier_bonus(value, tiers):
+    """Bonus du premier palier (seuil, bonus) atteint par value (0 sinon)."""
+    for threshold, bonus in tiers:
+        if value >= threshold:
+            return bonus
+    return 0
+
+
 def calculate_confidence(text_analysis, emoji_sentiment, final_score):
     """
     Calcule un niveau de confiance pour le label attribué.
@@ -248,36 +440,27 @@ def calculate_confidence(text_analysis, emoji_sentiment, final_score):
     Returns:
         float: Confiance entre 0 et 1
     """
-    confidence = 0.5  # Base
+    confidence = CONFIDENCE_BASE
     
     # Plus de mots-clés trouvés = plus de confiance
     sentiment_words = len(text_analysis['positive_words']) + len(text_analysis['negative_words'])
-    if sentiment_words >= 3:
-        confidence += 0.2
-    elif sentiment_words >= 1:
-        confidence += 0.1
+    confidence += tier_bonus(sentiment_words, CONFIDENCE_WORD_TIERS)
     
     # Emojis présents = plus de confiance
     emoji_count = emoji_sentiment.get('emoji_count', 0) if emoji_sentiment else 0
-    if emoji_count >= 2:
-        confidence += 0.15
-    elif emoji_count >= 1:
-        confidence += 0.1
+    confidence += tier_bonus(emoji_count, CONFIDENCE_EMOJI_TIERS)
     
     # Score fort = plus de confiance
-    if abs(final_score) >= 0.5:
-        confidence += 0.15
-    elif abs(final_score) >= 0.3:
-        confidence += 0.1
+    confidence += tier_bonus(abs(final_score), CONFIDENCE_SCORE_TIERS)
     
     # Accord texte/emoji = plus de confiance
     text_score = text_analysis['score']
     emoji_score = calculate_emoji_sentiment_score(emoji_sentiment)
     if text_score != 0 and emoji_score != 0:
         if (text_score > 0 and emoji_score > 0) or (text_score < 0 and emoji_score < 0):
-            confidence += 0.1  # Accord
+            confidence += CONFIDENCE_AGREEMENT  # Accord
         else:
-            confidence -= 0.1  # Désaccord
+            confidence -= CONFIDENCE_AGREEMENT  # Désaccord
     
     return round(min(1.0, max(0.0, confidence)), 2)
 
@@ -286,50 +469,78 @@ def calculate_confidence(text_analysis, emoji_sentiment, final_score):
 # 3. FONCTION PRINCIPALE DE LABELING
 # ============================================
 
-def label_post(post):
+def build_sentiment_analysis(text_analysis, matched, emoji_sentiment):
     """
-    Labelle automatiquement un post avec son sentiment. 
+    Bloc 'sentiment_analysis' d'un post à partir de son analyse texte.
     
-    Args:
-        post: Dict contenant 'clean_text' et 'emoji_sentiment'
+    Version scalaire des règles (score combiné, label, confiance);
+    label_batch applique les mêmes règles et constantes sur des tableaux.
     
-    Returns:
-        dict: Post enrichi avec le label de sentiment
+    Args:
+        text_analysis: Résultat de text_analysis_from_match
+        matched: Entrées de lexique trouvées (5e élément de match_lexicons)
+        emoji_sentiment: Données emoji du preprocessing
     """
-    clean_text = post. get('clean_text', '')
-    emoji_sentiment = post.get('emoji_sentiment', {})
-    
-    # 1. Analyser le texte
-    text_analysis = calculate_text_sentiment_score(clean_text)
-    
-    # 2. Obtenir le score emoji
+    # 1. Obtenir le score emoji
     emoji_score = calculate_emoji_sentiment_score(emoji_sentiment)
     
-    # 3. Combiner les scores
+    # 2. Combiner les scores
     final_score = combine_sentiment_scores(text_analysis['score'], emoji_score)
     
-    # 4. Convertir en label
+    # 3. Convertir en label
     label = score_to_label(final_score)
     
-    # 5. Calculer la confiance
+    # 4. Calculer la confiance
     confidence = calculate_confidence(text_analysis, emoji_sentiment, final_score)
     
-    # 6. Enrichir le post
-    labeled_post = post.copy()
-    labeled_post['sentiment_analysis'] = {
+    return format_sentiment_analysis(label, final_score, confidence, text_analysis,
+                                     emoji_score, matched, emoji_sentiment)
+
+
+def format_sentiment_analysis(label, final_score, confidence, text_analysis,
+                              emoji_score, matched, emoji_sentiment):
+    """Bloc 'sentiment_analysis' (même format pour label_post et label_batch)."""
+    return {
         'label': label,
         'score': final_score,
         'confidence': confidence,
         'text_analysis': {
             'score': text_analysis['score'],
-            'positive_words': text_analysis['positive_words'],
-            'negative_words': text_analysis['negative_words'],
+            'positive_words': list(text_analysis['positive_words']),
+            'negative_words': list(text_analysis['negative_words']),
             'has_negator': text_analysis['has_negator'],
             'intensifier':  text_analysis['intensifier'],
         },
         'emoji_score': emoji_score,
-        'needs_review': confidence < 0.6,  # Flag pour révision manuelle
+        'needs_review': confidence < REVIEW_CONFIDENCE,  # Flag pour révision manuelle
+        'lexicon_version': get_lexicon_version(),
+        'lexicon_fingerprint': lexicon_fingerprint(matched, emoji_sentiment),
     }
+
+
+def label_post(post):
+    """
+    Labelle automatiquement un post avec son sentiment. 
+    
+    Args:
+        post: Dict contenant 'clean_text' et 'emoji_sentiment'
+    
+    Returns:
+        dict: Post enrichi avec le label de sentiment
+    """
+    clean_text = post. get('clean_text', '')
+    emoji_sentiment = post.get('emoji_sentiment', {})
+    
+    # Analyser le texte (une seule recherche dans les lexiques)
+    if clean_text:
+        match = match_lexicons(clean_text)
+        text_analysis, matched = text_analysis_from_match(match), match[4]
+    else:
+        text_analysis, matched = calculate_text_sentiment_score(clean_text), ()
+    
+    # Enrichir le post
+    labeled_post = post.copy()
+    labeled_post['sentiment_analysis'] = build_sentiment_analysis(text_analysis, matched, emoji_sentiment)
     
     return labeled_post
 
@@ -338,69 +549,243 @@ def label_post(post):
 # 4. TRAITEMENT DU DATASET COMPLET
 # ============================================
 
-def label_dataset(input_path, output_path):
+def new_labeling_stats():
+    """Statistiques vides du labeling."""
+    return {
+        'total': 0,
+        'positive': 0,
+        'negative': 0,
+        'neutral': 0,
+        'high_confidence': 0,
+        'needs_review': 0,
+    }
+
+
+def update_labeling_stats(stats, sentiment_analysis):
+    """Ajoute un post labellisé aux statistiques (voir new_labeling_stats)."""
+    stats['total'] += 1
+    stats[sentiment_analysis['label']] += 1
+    stats['high_confidence'] += sentiment_analysis['confidence'] >= HIGH_CONFIDENCE
+    stats['needs_review'] += sentiment_analysis['needs_review']
+
+
+_NO_MATCH = ((), (), False, 1.0, ())
+
+
+def round_half_even(values, decimals):
+    """
+    np.round avec exactement le résultat de round() de Python: les rares
+    valeurs proches d'une moitié (où les deux peuvent différer) sont
+    arrondies une par une.
+    """
+    rounded = np.round(values, decimals)
+    scaled = values * 10 ** decimals
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(ties).tolist():
+        rounded[i] = round(float(values[i]), decimals)
+    return rounded
+
+
+def tier_bonus_array(values, tiers):
+    """tier_bonus sur un tableau."""
+    return np.select([values >= threshold for threshold, _ in tiers],
+                     [bonus for _, bonus in tiers], 0.0)
+
+
+def label_batch(posts, stats=None, negation_scope=NEGATION_SCOPE):
+    """
+    Labelle un lot de posts, avec le même résultat que label_post.
+    
+    Chaque texte distinct (retweets, annonces copiées) n'est recherché
+    qu'une fois; scores texte, scores emoji, scores combinés, labels et
+    confiances sont calculés sur des tableaux NumPy pour tout le lot, avec
+    les constantes de label_post. Les blocs 'sentiment_analysis' (et les
+    copies des posts) ne sont construits qu'à l'itération.
+    
+    Args:
+        posts: Liste (ou itérable) de posts preprocessés
+        stats: Statistiques à mettre à jour (voir new_labeling_stats)
+        negation_scope: Voir calculate_text_sentiment_score
+    
+    Returns:
+        Générateur de posts labellisés, dans l'ordre des posts
+    """
+    posts = posts if isinstance(posts, list) else list(posts)
+    n = len(posts)
+    if n == 0:
+        return iter(())
+    
+    # 1. Lexiques (un passage par texte distinct) et emojis
+    seen = {}
+    matches = []
+    emoji_scores = []
+    emoji_counts = []
+    for post in posts:
+        clean_text = post.get('clean_text', '')
+        if clean_text:
+            match = seen.get(clean_text)
+            if match is None:
+                match = seen[clean_text] = match_lexicons(clean_text, negation_scope)
+        else:
+            match = _NO_MATCH
+        matches.append(match)
+        
+        emoji_sentiment = post.get('emoji_sentiment', {})
+        emoji_scores.append(calculate_emoji_sentiment_score(emoji_sentiment))
+        emoji_counts.append(emoji_sentiment.get('emoji_count', 0) if emoji_sentiment else 0)
+    
+    has_text = np.array([bool(post.get('clean_text', '')) for post in posts])
+    positive_count = np.array([len(m[0]) for m in matches], dtype=float)
+    negative_count = np.array([len(m[1]) for m in matches], dtype=float)
+    negated = np.array([m[2] for m in matches], dtype=bool)
+    intensifiers = np.array([m[3] for m in matches], dtype=float)
+    emoji_array = np.array(emoji_scores, dtype=float)
+    emoji_count = np.array(emoji_counts, dtype=float)
+    
+    # 2. Score texte (voir text_analysis_from_match)
+    sentiment_words = positive_count + negative_count
+    with np.errstate(invalid='ignore', divide='ignore'):
+        raw_scores = np.where(sentiment_words > 0, (positive_count - negative_count) / sentiment_words, 0.0)
+    raw_scores = raw_scores * intensifiers
+    raw_scores = np.where(negated & (np.abs(raw_scores) > 0), -raw_scores * NEGATION_FACTOR, raw_scores)
+    text_array = np.where(has_text, round_half_even(np.clip(raw_scores, -1, 1), 3), 0.0)
+    
+    # Valeurs entières de la version scalaire (0 sans texte, ±1 après
+    # écrêtage): mêmes types, donc même JSON
+    text_scores = text_array.tolist()
+    int_text = ~has_text | (np.abs(raw_scores) >= 1)
+    for i in np.flatnonzero(int_text).tolist():
+        text_scores[i] = int(text_scores[i])
+    
+    # 3. Score combiné (voir combine_sentiment_scores)
+    no_emoji = emoji_array == 0
+    emoji_only = ~no_emoji & (text_array == 0)
+    combined = round_half_even(text_array * TEXT_WEIGHT + emoji_array * EMOJI_WEIGHT, 3)
+    final_array = np.where(no_emoji, text_array, np.where(emoji_only, emoji_array, combined))
+    
+    final_scores = final_array.tolist()
+    for i in np.flatnonzero(no_emoji).tolist():
+        final_scores[i] = text_scores[i]
+    for i in np.flatnonzero(emoji_only).tolist():
+        final_scores[i] = emoji_scores[i]
+    
+    # 4. Labels (voir score_to_label)
+    labels = np.full(n, 'neutral', dtype=object)
+    labels[final_array >= LABEL_THRESHOLDS['positive']] = 'positive'
+    labels[final_array <= LABEL_THRESHOLDS['negative']] = 'negative'
+    
+    # 5. Confiance (voir calculate_confidence, même ordre des additions)
+    confidence = np.full(n, CONFIDENCE_BASE)
+    confidence += tier_bonus_array(sentiment_words, CONFIDENCE_WORD_TIERS)
+    confidence += tier_bonus_array(emoji_count, CONFIDENCE_EMOJI_TIERS)
+    confidence += tier_bonus_array(np.abs(final_array), CONFIDENCE_SCORE_TIERS)
+    both = (text_array != 0) & ~no_emoji
+    agree = both & (((text_array > 0) & (emoji_array > 0)) | ((text_array < 0) & (emoji_array < 0)))
+    confidence += np.where(agree, CONFIDENCE_AGREEMENT, np.where(both, -CONFIDENCE_AGREEMENT, 0.0))
+    confidence = round_half_even(np.minimum(1.0, np.maximum(0.0, confidence)), 2)
+    
+    if stats is not None:
+        stats['total'] += n
+        for label in ('positive', 'negative', 'neutral'):
+            stats[label] += int(np.count_nonzero(labels == label))
+        stats['high_confidence'] += int(np.count_nonzero(confidence >= HIGH_CONFIDENCE))
+        stats['needs_review'] += int(np.count_nonzero(confidence < REVIEW_CONFIDENCE))
+    
+    labels = labels.tolist()
+    confidences = confidence.tolist()
+    intensifiers = round_half_even(intensifiers, 2).tolist()
+    
+    def build():
+        for i, post in enumerate(posts):
+            found_positive, found_negative, has_negator, _, matched = matches[i]
+            text_analysis = {
+                'score': text_scores[i],
+                'positive_words': found_positive,
+                'negative_words': found_negative,
+                'has_negator': has_negator,
+                'intensifier': intensifiers[i],
+            }
+            labeled_post = post.copy()
+            labeled_post['sentiment_analysis'] = format_sentiment_analysis(
+                labels[i], final_scores[i], confidences[i], text_analysis,
+                emoji_scores[i], matched, post.get('emoji_sentiment', {}),
+            )
+            yield labeled_post
+    
+    return build()
+
+
+def label_posts(posts, stats=None, batch_size=LABEL_BATCH_SIZE):
+    """
+    Labelle un flux de posts (générateur, mémoire bornée à un lot).
+    
+    Args:
+        posts: Itérable de posts preprocessés (générateur accepté)
+        stats: Statistiques à mettre à jour (voir new_labeling_stats)
+        batch_size: Nombre de posts par appel à label_batch
+    
+    Yields:
+        dict: Posts enrichis avec le label de sentiment
+    """
+    for chunk in iter_chunks(posts, batch_size):
+        yield from label_batch(chunk, stats)
+
+
+def label_dataset(input_path, output_path, keep_results=False):
     """
     Labelle tout le dataset et sauvegarde les résultats.
     
+    Lecture et écriture en flux (tableau JSON ou JSONL selon l'extension).
+    
     Args:
-        input_path:  Chemin vers le fichier JSON preprocessé
-        output_path:  Chemin vers le fichier de sortie labellisé
+        input_path:  Chemin vers le fichier preprocessé (JSON ou JSONL)
+        output_path:  Chemin vers le fichier de sortie labellisé (JSON ou JSONL)
+        keep_results: Garder les posts labellisés en mémoire pour les retourner
+                      (défaut False: mémoire constante, retourne None à la place)
+    
+    output_path peut être input_path (remplacé seulement à la fin).
     """
     print("=" * 70)
     print("🏷️  SOCIALPULSE MONASTIR - Labeling Semi-Automatique")
     print("=" * 70)
     
     # Charger les données
-    print(f"\n📂 Chargement des données depuis:  {input_path}")
+    print(f"\n📂 Lecture en flux depuis:  {input_path}")
     if not os.path.exists(input_path):
         print(f"❌ Erreur: Fichier non trouvé:  {input_path}")
         return None
     
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    print(f"✅ {len(data)} posts chargés")
+    print(f"💾 Écriture en flux vers: {output_path}")
     
     # Labeller chaque post
     print(f"\n🔄 Labeling en cours...")
-    labeled_data = []
+    labeled_data = [] if keep_results else None
+    stats = new_labeling_stats()
     
-    stats = {
-        'total':  len(data),
-        'positive': 0,
-        'negative': 0,
-        'neutral': 0,
-        'high_confidence': 0,
-        'needs_review': 0,
-    }
-    
-    for i, post in enumerate(data):
-        labeled_post = label_post(post)
-        labeled_data.append(labeled_post)
-        
-        # Mise à jour des stats
-        label = labeled_post['sentiment_analysis']['label']
-        stats[label] += 1
-        
-        confidence = labeled_post['sentiment_analysis']['confidence']
-        if confidence >= 0.7:
-            stats['high_confidence'] += 1
-        if labeled_post['sentiment_analysis']['needs_review']: 
-            stats['needs_review'] += 1
-        
-        # Progression
-        if (i + 1) % 20 == 0:
-            print(f"   Traité:  {i + 1}/{len(data)} posts")
-    
-    # Sauvegarder
-    print(f"\n💾 Sauvegarde vers: {output_path}")
-    
-    output_dir = os.path.dirname(output_path)
-    if output_dir and not os.path. exists(output_dir):
-        os.makedirs(output_dir)
+    # Un exemple de chaque catégorie
+    examples = {'positive': None, 'negative': None, 'neutral': None}
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(labeled_data, f, ensure_ascii=False, indent=2)
+    def track(posts):
+        reported = 0
+        for labeled_post in label_posts(posts, stats):
+            # Progression (une ligne par lot: stats est mis à jour par lot)
+            if stats['total'] != reported:
+                reported = stats['total']
+                print(f"   Traité:  {reported} posts")
+            
+            if keep_results:
+                labeled_data.append(labeled_post)
+            
+            label = labeled_post['sentiment_analysis']['label']
+            if examples[label] is None:
+                examples[label] = labeled_post
+            
+            yield labeled_post
+    
+    write_posts(output_path, track(iter_posts(input_path)))
+    
+    # État des lexiques utilisés (pour le relabeling incrémental)
+    save_lexicon_snapshot(output_path)
     
     # Afficher les statistiques
     print("\n" + "=" * 70)
@@ -426,15 +811,6 @@ def label_dataset(input_path, output_path):
     print("📝 EXEMPLES DE LABELING")
     print("=" * 70)
     
-    # Un exemple de chaque catégorie
-    examples = {'positive': None, 'negative': None, 'neutral': None}
-    for post in labeled_data:
-        label = post['sentiment_analysis']['label']
-        if examples[label] is None: 
-            examples[label] = post
-        if all(v is not None for v in examples. values()):
-            break
-    
     for sentiment, post in examples.items():
         if post: 
             print(f"\n{'─' * 70}")
@@ -456,6 +832,212 @@ def label_dataset(input_path, output_path):
     return labeled_data, stats
 
 
+# ============================================
+# RELABELING INCRÉMENTAL
+# ============================================
+
+def lexicon_snapshot_path(labeled_path):
+    """Fichier d'état des lexiques associé à un dataset labellisé."""
+    return os.path.splitext(labeled_path)[0] + '.lexicon.json'
+
+
+def save_lexicon_snapshot(labeled_path):
+    """Sauvegarde l'état des lexiques à côté du dataset labellisé."""
+    snapshot = lexicon_snapshot()
+    with open(lexicon_snapshot_path(labeled_path), 'w', encoding='utf-8') as f:
+        json.dump({'version': snapshot_version(snapshot), 'snapshot': snapshot},
+                  f, ensure_ascii=False, indent=2, sort_keys=True)
+    return snapshot
+
+
+def load_lexicon_snapshot(labeled_path):
+    """État des lexiques du dernier labeling (None si absent)."""
+    path = lexicon_snapshot_path(labeled_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['snapshot']
+
+
+def diff_lexicons(old, new):
+    """
+    Entrées ajoutées, supprimées ou repondérées entre deux états.
+    
+    Returns:
+        tuple: (expressions texte modifiées, emojis modifiés)
+    """
+    def changed(a, b):
+        return {key for key in a.keys() | b.keys() if a.get(key) != b.get(key)}
+    
+    phrases = changed(old['entries'], new['entries'])
+    emojis = changed(old['emojis'], new['emojis']) | changed(old['context_emojis'], new['context_emojis'])
+    return phrases, emojis
+
+
+def build_inverted_index(posts, vocabulary=None):
+    """
+    Index inversé mot -> positions des posts qui le contiennent.
+    
+    Args:
+        posts: Liste de posts preprocessés (clean_text)
+        vocabulary: Mots à indexer (None = tous)
+    """
+    index = {}
+    for i, post in enumerate(posts):
+        for word in set(post.get('clean_text', '').lower().split()):
+            if vocabulary is None or word in vocabulary:
+                index.setdefault(word, set()).add(i)
+    return index
+
+
+def find_affected_posts(posts, changed_phrases, changed_emojis, version):
+    """
+    Posts à recalculer: ceux qui contiennent une expression ou un emoji
+    modifié, et ceux labellisés avec une autre version que l'état connu.
+    
+    Returns:
+        tuple: (positions à relabelliser, positions dont les emojis changent)
+    """
+    phrase_tokens = [phrase.split() for phrase in changed_phrases]
+    index = build_inverted_index(posts, {token for tokens in phrase_tokens for token in tokens})
+    
+    affected = set()
+    for tokens in phrase_tokens:
+        # Candidats: posts contenant tous les mots de l'expression
+        candidates = set.intersection(*(index.get(token, set()) for token in tokens))
+        affected |= candidates
+    
+    emoji_affected = set()
+    if changed_emojis:
+        for i, post in enumerate(posts):
+            text = post.get('text', '')
+            if any(char in text for char in changed_emojis):
+                emoji_affected.add(i)
+    affected |= emoji_affected
+    
+    for i, post in enumerate(posts):
+        if post.get('sentiment_analysis', {}).get('lexicon_version') != version:
+            affected.add(i)
+    
+    return affected, emoji_affected
+
+
+def is_stale(post, version):
+    """
+    Vérifie si le label d'un post candidat est périmé: labellisé sous une
+    autre version que l'état connu, sans empreinte, ou dont l'empreinte
+    (entrées trouvées, scores emoji) a changé avec les lexiques courants.
+    """
+    sentiment_analysis = post.get('sentiment_analysis', {})
+    fingerprint = sentiment_analysis.get('lexicon_fingerprint')
+    if sentiment_analysis.get('lexicon_version') != version or fingerprint is None:
+        return True
+    
+    clean_text = post.get('clean_text', '')
+    matched = match_lexicons(clean_text)[4] if clean_text else ()
+    return lexicon_fingerprint(matched, post.get('emoji_sentiment', {})) != fingerprint
+
+
+def relabel_dataset(labeled_path, output_path=None):
+    """
+    Relabellise seulement les posts touchés par une modification des
+    lexiques (POSITIVE_WORDS, NEGATIVE_WORDS, emojis...) depuis le dernier
+    labeling. Les corrections manuelles (merge_manual_labels) sont gardées.
+    
+    Args:
+        labeled_path: Dataset labellisé (JSON ou JSONL)
+        output_path: Fichier de sortie (défaut: labeled_path)
+    
+    Returns:
+        tuple: (posts labellisés, statistiques du relabeling)
+    """
+    output_path = output_path or labeled_path
+    
+    print("=" * 70)
+    print("🔁 SOCIALPULSE MONASTIR - Relabeling Incrémental")
+    print("=" * 70)
+    
+    if not os.path.exists(labeled_path):
+        print(f"❌ Erreur: Fichier non trouvé:  {labeled_path}")
+        return None
+    
+    posts = list(iter_posts(labeled_path))
+    print(f"\n📂 {len(posts)} posts chargés depuis: {labeled_path}")
+    
+    old_snapshot = load_lexicon_snapshot(labeled_path)
+    new_snapshot = lexicon_snapshot()
+    previous_version = snapshot_version(old_snapshot) if old_snapshot else None
+    version = get_lexicon_version()
+    
+    stats = {'total': len(posts), 'relabeled': 0, 'label_changed': 0, 'manual_kept': 0}
+    
+    full = (
+        old_snapshot is None
+        or old_snapshot.get('negation_scope') != new_snapshot['negation_scope']
+        or old_snapshot.get('scoring') != new_snapshot['scoring']
+    )
+    if full:
+        # Pas d'état connu (ou règle globale de scoring modifiée): tout recalculer
+        print("⚠️  Aucun état des lexiques comparable (ou règles de scoring modifiées): relabeling complet")
+        affected = set(range(len(posts)))
+        emoji_affected = set(affected)
+    else:
+        changed_phrases, changed_emojis = diff_lexicons(old_snapshot, new_snapshot)
+        print(f"🔍 Version des lexiques: {previous_version} → {version}")
+        print(f"   • Expressions modifiées: {len(changed_phrases)}")
+        print(f"   • Emojis modifiés:       {len(changed_emojis)}")
+        affected, emoji_affected = find_affected_posts(posts, changed_phrases, changed_emojis, previous_version)
+    
+    # Les scores emoji sont calculés au preprocessing: à refaire si un
+    # emoji du post a changé (sur le texte nettoyé, comme process_post)
+    if emoji_affected:
+        from preprocessing import extract_emoji_sentiment, clean_special_characters
+        for i in emoji_affected:
+            text = posts[i].get('text', '')
+            if text:
+                posts[i]['emoji_sentiment'] = extract_emoji_sentiment(clean_special_characters(text))
+    
+    # Les candidats de l'index contiennent tous les mots d'une expression
+    # modifiée, pas forcément l'expression: seuls ceux dont l'empreinte a
+    # changé sont relabellisés
+    if not full:
+        candidates = len(affected)
+        affected = {i for i in affected if is_stale(posts[i], previous_version)}
+        print(f"   • Posts candidats:       {candidates} ({len(affected)} avec une empreinte modifiée)")
+    
+    positions = sorted(affected)
+    for i, labeled in zip(positions, label_batch([posts[i] for i in positions])):
+        old_sa = posts[i].get('sentiment_analysis', {})
+        new_sa = labeled['sentiment_analysis']
+        
+        if old_sa.get('manually_corrected'):
+            # La correction manuelle prime sur le nouveau label automatique
+            new_sa['original_auto_label'] = new_sa['label']
+            new_sa['label'] = old_sa['label']
+            new_sa['manually_corrected'] = True
+            stats['manual_kept'] += 1
+        elif old_sa.get('label') != new_sa['label']:
+            stats['label_changed'] += 1
+        
+        posts[i] = labeled
+        stats['relabeled'] += 1
+    
+    # Posts non touchés: labels inchangés sous la nouvelle version
+    for i, post in enumerate(posts):
+        if i not in affected and 'sentiment_analysis' in post:
+            post['sentiment_analysis']['lexicon_version'] = version
+    
+    write_posts(output_path, posts)
+    save_lexicon_snapshot(output_path)
+    
+    print(f"\n📊 Posts recalculés: {stats['relabeled']}/{stats['total']}")
+    print(f"   • Labels modifiés:              {stats['label_changed']}")
+    print(f"   • Corrections manuelles gardées: {stats['manual_kept']}")
+    print(f"💾 Sauvegardé: {output_path}")
+    
+    return posts, stats
+
+
 # ============================================
 # 5. OUTILS DE RÉVISION MANUELLE
 # ============================================
@@ -465,21 +1047,20 @@ def get_posts_for_review(labeled_data, max_posts=50):
     Récupère les posts qui nécessitent une révision manuelle.
     
     Args:
-        labeled_data: Liste des posts labellisés
+        labeled_data: Posts labellisés (liste ou générateur, ex: iter_posts)
         max_posts: Nombre maximum de posts à réviser
     
     Returns: 
         list: Posts à réviser, triés par confiance croissante
     """
-    needs_review = [
+    needs_review = (
         post for post in labeled_data 
         if post['sentiment_analysis']['needs_review']
-    ]
+    )
     
-    # Trier par confiance croissante (les moins sûrs en premier)
-    needs_review.sort(key=lambda x: x['sentiment_analysis']['confidence'])
-    
-    return needs_review[:max_posts]
+    # Les max_posts moins sûrs, par confiance croissante (seuls max_posts
+    # posts gardés en mémoire; même ordre qu'un tri stable)
+    return heapq.nsmallest(max_posts, needs_review, key=lambda x: x['sentiment_analysis']['confidence'])
 
 
 def export_for_manual_review(labeled_data, output_path, max_posts=100):
@@ -487,7 +1068,7 @@ def export_for_manual_review(labeled_data, output_path, max_posts=100):
     Exporte les posts à réviser dans un format simple pour annotation manuelle.
     
     Args:
-        labeled_data: Liste des posts labellisés
+        labeled_data: Posts labellisés (liste ou générateur, ex: iter_posts)
         output_path: Chemin du fichier de sortie
         max_posts: Nombre maximum de posts à exporter
     """
@@ -567,52 +1148,74 @@ def merge_manual_labels(labeled_data, review_path):
 # 6. GÉNÉRATION DU DATASET FINAL
 # ============================================
 
-def generate_training_dataset(labeled_data, output_path, min_confidence=0.5):
+def iter_training_items(labeled_posts, min_confidence=0.5):
     """
-    Génère le dataset final pour l'entraînement du modèle.
+    Filtre un flux de posts labellisés et produit les exemples d'entraînement.
     
     Args:
-        labeled_data:  Liste des posts labellisés
-        output_path: Chemin de sortie
-        min_confidence:  Confiance minimale pour inclure un post
+        labeled_posts: Itérable de posts labellisés (générateur accepté)
+        min_confidence: Confiance minimale pour inclure un post
     
-    Returns:
-        dict:  Statistiques du dataset généré
+    Yields:
+        dict: Exemple d'entraînement (id, text, label, confidence, source)
     """
-    print("\n" + "=" * 70)
-    print("📦 GÉNÉRATION DU DATASET D'ENTRAÎNEMENT")
-    print("=" * 70)
-    
-    # Filtrer par confiance
-    training_data = []
-    for post in labeled_data:
+    for post in labeled_posts:
         confidence = post['sentiment_analysis']['confidence']
         manually_corrected = post['sentiment_analysis']. get('manually_corrected', False)
         
         # Inclure si confiance suffisante OU corrigé manuellement
         if confidence >= min_confidence or manually_corrected:
-            training_item = {
+            yield {
                 'id': post.get('id'),
                 'text': post.get('clean_text', ''),
                 'label': post['sentiment_analysis']['label'],
                 'confidence': confidence,
                 'source': 'manual' if manually_corrected else 'auto',
             }
-            training_data.append(training_item)
+
+
+def generate_training_dataset(labeled_data, output_path, min_confidence=0.5, keep_results=False):
+    """
+    Génère le dataset final pour l'entraînement du modèle.
+    
+    Args:
+        labeled_data:  Posts labellisés (liste ou générateur, ex: iter_posts)
+        output_path: Chemin de sortie (JSON ou JSONL selon l'extension)
+        min_confidence:  Confiance minimale pour inclure un post
+        keep_results: Garder les exemples en mémoire pour les retourner
+                      (défaut False: mémoire constante, retourne None à la place)
+    
+    Returns:
+        tuple: (exemples d'entraînement, statistiques du dataset généré)
+    """
+    print("\n" + "=" * 70)
+    print("📦 GÉNÉRATION DU DATASET D'ENTRAÎNEMENT")
+    print("=" * 70)
+    
+    training_data = [] if keep_results else None
     
     # Statistiques
     stats = {
-        'total': len(training_data),
-        'positive': sum(1 for x in training_data if x['label'] == 'positive'),
-        'negative': sum(1 for x in training_data if x['label'] == 'negative'),
-        'neutral': sum(1 for x in training_data if x['label'] == 'neutral'),
-        'from_manual': sum(1 for x in training_data if x['source'] == 'manual'),
-        'from_auto': sum(1 for x in training_data if x['source'] == 'auto'),
+        'total': 0,
+        'positive': 0,
+        'negative': 0,
+        'neutral': 0,
+        'from_manual': 0,
+        'from_auto': 0,
     }
     
-    # Sauvegarder
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(training_data, f, ensure_ascii=False, indent=2)
+    def track(items):
+        for item in items:
+            stats['total'] += 1
+            if item['label'] in ('positive', 'negative', 'neutral'):
+                stats[item['label']] += 1
+            stats['from_' + item['source']] += 1
+            if keep_results:
+                training_data.append(item)
+            yield item
+    
+    # Filtrer par confiance et sauvegarder en flux
+    write_posts(output_path, track(iter_training_items(labeled_data, min_confidence)))
     
     print(f"\n✅ Dataset d'entraînement généré: {output_path}")
     print(f"\n📊 Statistiques:")
@@ -658,9 +1261,12 @@ Choisissez une option:
       
   3️⃣  Générer le dataset d'entraînement
       → Crée le fichier final pour l'entraînement
+      
+  4️⃣  Relabeling incrémental (après modification des lexiques)
+      → Recalcule seulement les posts touchés, garde les corrections manuelles
     """)
     
-    choice = input("Votre choix (1, 2, ou 3): ").strip()
+    choice = input("Votre choix (1, 2, 3 ou 4): ").strip()
     
     # ══════════════════════════════════════════════════════════════
     # OPTION 1: Labeling automatique (première fois)
@@ -670,9 +1276,10 @@ Choisissez une option:
         confirm = input("Continuer? (oui/non): ").strip().lower()
         
         if confirm in ['oui', 'o', 'yes', 'y']:
-            labeled_data, stats = label_dataset(input_file, labeled_file)
-            if labeled_data: 
-                export_for_manual_review(labeled_data, review_file, max_posts=50)
+            result = label_dataset(input_file, labeled_file)
+            if result: 
+                # Relecture en flux du fichier labellisé (mémoire constante)
+                export_for_manual_review(iter_posts(labeled_file), review_file, max_posts=50)
                 print("\n✅ Labeling terminé!")
                 print(f"📝 Maintenant, ouvrez et remplissez:  {review_file}")
                 print("   Puis relancez avec l'option 2")
@@ -804,5 +1411,17 @@ Choisissez une option:
         print(f"\n📁 Fichier généré: {training_file}")
         print("\n🚀 Prochaine étape: python src/train.py")
     
+    # ══════════════════════════════════════════════════════════════
+    # OPTION 4: Relabeling incrémental
+    # ══════════════════════════════════════════════════════════════
+    elif choice == "4":
+        if not os.path.exists(labeled_file):
+            print(f"❌ Erreur: Fichier non trouvé: {labeled_file}")
+            print("   → Exécutez d'abord l'option 1")
+            sys.exit(1)
+        
+        relabel_dataset(labeled_file)
+        print("   → Relancez avec l'option 3 pour régénérer le dataset d'entraînement")
+    
     else:
-        print("❌ Option invalide.  Choisissez 1, 2, ou 3.")
\ No newline at end of file
+        print("❌ Option invalide.  Choisissez 1, 2, 3 ou 4.")
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+SocialPulse Monastir - Recherche multi-lexiques (Aho-Corasick)
+==============================================================
+Un automate unique construit une fois à partir de tous les lexiques
+(mots positifs, négatifs, négateurs, intensificateurs). Il trouve en un
+seul passage toutes les entrées présentes dans un texte, y compris les
+expressions de plusieurs mots ("mouch behi", "bel kol").
+
+L'automate travaille sur les tokens (et non les caractères): une entrée
+ne correspond qu'à des mots entiers, et le coût reste linéaire en nombre
+de tokens quelle que soit la taille des lexiques.
+"""
+
+from collections import deque
+
+
+class LexiconMatcher:
+    """
+    Automate d'Aho-Corasick sur des séquences de tokens.
+
+    Chaque entrée (expression) porte un ou plusieurs types avec leur
+    valeur, ex: {'positive': True, 'intensifier': 1.3} pour 'jaw'.
+    """
+
+    def __init__(self):
+        self._goto = [{}]       # état -> {token: état suivant}
+        self._fail = [0]        # état -> état de repli
+        self._terminal = [None]  # état -> (longueur, expression) si fin d'entrée
+        self._output = [()]     # état -> ((longueur, expression), ...)
+        self.entries = {}       # expression -> {type: valeur}
+        self._built = False
+
+    def add(self, phrase, kind, value=True):
+        """Ajoute une expression (tokens séparés par des espaces) avec un type."""
+        tokens = phrase.lower().split()
+        if not tokens:
+            return
+        phrase = ' '.join(tokens)
+
+        kinds = self.entries.get(phrase)
+        if kinds is None:
+            kinds = self.entries[phrase] = {}
+
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][token] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._terminal.append(None)
+                    self._output.append(())
+                state = next_state
+            self._terminal[state] = (len(tokens), phrase)
+            self._built = False
+
+        kinds[kind] = value
+
+    def add_many(self, phrases, kind):
+        """Ajoute un lexique: ensemble (valeur True) ou dict expression -> valeur."""
+        if isinstance(phrases, dict):
+            for phrase, value in phrases.items():
+                self.add(phrase, kind, value)
+        else:
+            for phrase in phrases:
+                self.add(phrase, kind)
+
+    def build(self):
+        """Calcule les liens de repli et les sorties (parcours en largeur)."""
+        self._output = [(terminal,) if terminal else () for terminal in self._terminal]
+
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(token, 0)
+
+                self._fail[next_state] = fail
+                # Sorties héritées: suffixes qui sont aussi des entrées
+                self._output[next_state] = self._output[next_state] + self._output[fail]
+
+        self._built = True
+        return self
+
+    def find_all(self, tokens):
+        """
+        Toutes les occurrences (chevauchantes) en un passage.
+
+        Args:
+            tokens: Liste de tokens en minuscules
+
+        Returns:
+            Liste de (début, fin, expression, types), fin exclue, triée par début
+        """
+        if not self._built:
+            self.build()
+
+        goto, fail, output, entries = self._goto, self._fail, self._output, self.entries
+        root = goto[0]
+        hits = []
+        state = 0
+
+        for i, token in enumerate(tokens):
+            if state:
+                while state and token not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(token, 0)
+            else:
+                # Cas le plus fréquent: mot hors lexique à la racine
+                state = root.get(token, 0)
+                if not state:
+                    continue
+
+            for length, phrase in output[state]:
+                hits.append((i + 1 - length, i + 1, phrase, entries[phrase]))
+
+        if len(hits) > 1:
+            hits.sort(key=lambda hit: (hit[0], hit[0] - hit[1]))
+        return hits
+
+    def match(self, tokens):
+        """
+        Occurrences sans chevauchement, la plus longue d'abord à partir de
+        la gauche: "mouch behi" l'emporte sur "mouch" et "behi".
+
+        Returns:
+            Liste de (début, fin, expression, types) dans l'ordre du texte
+        """
+        selected = []
+        position = 0
+        for hit in self.find_all(tokens):
+            if hit[0] >= position:
+                selected.append(hit)
+                position = hit[1]
+        return selected
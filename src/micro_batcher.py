@@ -0,0 +1,209 @@
+"""
+SocialPulse Monastir - Micro-batching des prédictions
+=====================================================
+Regroupe les requêtes unitaires qui arrivent en même temps (fenêtre de
+quelques millisecondes ou N textes) en un seul batch pour le modèle,
+puis rend à chaque requête son propre résultat via un Future.
+
+La latence ajoutée est bornée:
+- max_wait_ms: attente maximale d'un texte avant le départ de son batch
+- max_queue_size: au-delà, les nouvelles requêtes sont refusées (queue.Full)
+- timeout côté appelant (predict(..., timeout=...))
+"""
+
+import os
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Coalesce les appels unitaires vers une fonction de prédiction par batch.
+
+    predict_batch_fn(texts) doit retourner une liste de résultats dans
+    l'ordre des textes.
+    """
+
+    def __init__(self, predict_batch_fn, max_batch_size=32, max_wait_ms=5,
+                 max_queue_size=1024, metrics_window=1000):
+        """
+        Args:
+            predict_batch_fn: Fonction liste de textes -> liste de résultats
+            max_batch_size: Nombre maximal de textes par batch
+            max_wait_ms: Fenêtre de regroupement (ms) après le premier texte
+            max_queue_size: Taille maximale de la file d'attente
+            metrics_window: Nombre de mesures récentes gardées pour les percentiles
+        """
+        self.predict_batch_fn = predict_batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        # Métriques
+        self._metrics_lock = threading.Lock()
+        self._recent_waits = deque(maxlen=metrics_window)
+        self._recent_sizes = deque(maxlen=metrics_window)
+        self.stats = {
+            'requests': 0,
+            'batches': 0,
+            'rejected': 0,
+            'errors': 0,
+            'max_batch_size_seen': 0,
+            'max_queue_wait_ms': 0.0,
+        }
+
+    # ----------------------------------------
+    # Thread de traitement
+    # ----------------------------------------
+
+    def _ensure_worker(self):
+        """Démarre le thread au premier appel (et après un fork)."""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                # Processus forké: la file héritée n'a pas de consommateur
+                self._queue = queue.Queue(maxsize=self.max_queue_size)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+            self._thread.start()
+
+    def _collect_batch(self):
+        """Attend un premier texte puis regroupe jusqu'à la taille ou la fenêtre."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        """Boucle du thread: un appel au modèle par batch."""
+        while True:
+            batch = self._collect_batch()
+            started = time.perf_counter()
+
+            # Ignorer les requêtes abandonnées (timeout côté appelant)
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            self._record_batch([started - enqueued for _, _, enqueued in batch])
+
+            try:
+                results = self.predict_batch_fn([text for text, _, _ in batch])
+                if results is None or len(results) != len(batch):
+                    raise RuntimeError("La prédiction par batch n'a pas retourné un résultat par texte")
+            except Exception as e:
+                with self._metrics_lock:
+                    self.stats['errors'] += 1
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    # ----------------------------------------
+    # API
+    # ----------------------------------------
+
+    def submit(self, text):
+        """
+        Ajoute un texte à la file.
+
+        Returns:
+            Future du résultat
+
+        Raises:
+            queue.Full: si la file est pleine (surcharge)
+        """
+        self._ensure_worker()
+        future = Future()
+
+        try:
+            self._queue.put_nowait((text, future, time.perf_counter()))
+        except queue.Full:
+            with self._metrics_lock:
+                self.stats['rejected'] += 1
+            raise
+
+        with self._metrics_lock:
+            self.stats['requests'] += 1
+        return future
+
+    def predict(self, text, timeout=None):
+        """
+        Prédit un texte via le batch courant.
+
+        Raises:
+            queue.Full: file pleine
+            concurrent.futures.TimeoutError: résultat non disponible à temps
+        """
+        future = self.submit(text)
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            future.cancel()
+            raise
+
+    # ----------------------------------------
+    # Métriques
+    # ----------------------------------------
+
+    def _record_batch(self, waits):
+        """Enregistre la taille d'un batch et l'attente de ses textes."""
+        with self._metrics_lock:
+            self.stats['batches'] += 1
+            self.stats['max_batch_size_seen'] = max(self.stats['max_batch_size_seen'], len(waits))
+            self._recent_sizes.append(len(waits))
+            for wait in waits:
+                wait_ms = wait * 1000
+                self._recent_waits.append(wait_ms)
+                if wait_ms > self.stats['max_queue_wait_ms']:
+                    self.stats['max_queue_wait_ms'] = wait_ms
+
+    def get_metrics(self):
+        """Statistiques de regroupement (taille des batchs, attente en file)."""
+        with self._metrics_lock:
+            waits = sorted(self._recent_waits)
+            sizes = list(self._recent_sizes)
+            stats = dict(self.stats)
+
+        def percentile(values, pct):
+            if not values:
+                return 0.0
+            return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+        stats['max_queue_wait_ms'] = round(stats['max_queue_wait_ms'], 2)
+        stats['queue_size'] = self._queue.qsize()
+        stats['config'] = {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'max_queue_size': self.max_queue_size,
+        }
+        stats['avg_batch_size'] = round(sum(sizes) / len(sizes), 2) if sizes else 0.0
+        stats['queue_wait_ms'] = {
+            'p50': round(percentile(waits, 50), 2),
+            'p95': round(percentile(waits, 95), 2),
+            'p99': round(percentile(waits, 99), 2),
+        }
+        return stats
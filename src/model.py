@@ -19,6 +19,15 @@ import pickle
 import numpy as np
 from collections import Counter
 
+try:
+    from scipy.sparse import csr_matrix, issparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+    def issparse(X):
+        return False
+
 # ============================================
 # 1. VECTORISATION DU TEXTE
 # ============================================
@@ -97,48 +106,90 @@ class DarijaVectorizer:
             ngram: np.log((num_docs + 1) / (doc_counts[ngram] + 1)) + 1
             for ngram in self.vocabulary
         }
+        self.idf_array = None
+        self._idf_array()
         
         self.is_fitted = True
         return self
     
-    def transform(self, texts):
+    def _idf_array(self):
+        """IDF sous forme de tableau, dans l'ordre des indices du vocabulaire."""
+        idf_array = getattr(self, 'idf_array', None)
+        if idf_array is None or len(idf_array) != len(self.vocabulary):
+            idf_array = np.zeros(len(self.vocabulary))
+            for ngram, idx in self.vocabulary.items():
+                idf_array[idx] = self.idf[ngram]
+            self.idf_array = idf_array
+        return idf_array
+    
+    def _transform_csr_arrays(self, texts):
+        """
+        Calcule les tableaux CSR (indptr, indices, data) en une passe:
+        seuls les n-grammes présents dans chaque texte sont recherchés.
+        """
+        idf_array = self._idf_array()
+        vocabulary = self.vocabulary
+        
+        indptr = [0]
+        indices = []
+        tfs = []
+        
+        for text in texts:
+            tokens = self._tokenize(text)
+            ngrams = self._get_ngrams(tokens)
+            n_ngrams = len(ngrams)
+            
+            for ngram, count in Counter(ngrams).items():
+                idx = vocabulary.get(ngram)
+                if idx is not None:
+                    indices.append(idx)
+                    # TF (Term Frequency)
+                    tfs.append(count / n_ngrams)
+            
+            indptr.append(len(indices))
+        
+        indptr = np.array(indptr, dtype=np.int64)
+        indices = np.array(indices, dtype=np.int64)
+        # TF-IDF
+        data = np.array(tfs, dtype=np.float64) * idf_array[indices]
+        
+        return indptr, indices, data
+    
+    def transform(self, texts, sparse=False):
         """
         Transforme les textes en vecteurs TF-IDF.
         
         Args:
             texts: Liste de textes
+            sparse: Retourner une matrice scipy CSR au lieu d'un tableau dense
+                    (indispensable avec un grand max_features)
         
         Returns:
-            numpy array de shape (n_texts, n_features)
+            numpy array ou csr_matrix de shape (n_texts, n_features)
         """
         if not self.is_fitted:
             raise ValueError("Le vectoriseur n'est pas encore entraîné.  Appelez fit() d'abord.")
         
-        vectors = []
+        if sparse and not SCIPY_AVAILABLE:
+            raise ImportError("scipy est requis pour la sortie creuse: pip install scipy")
         
-        for text in texts:
-            tokens = self._tokenize(text)
-            ngrams = self._get_ngrams(tokens)
-            ngram_counts = Counter(ngrams)
-            
-            # Créer le vecteur TF-IDF
-            vector = np.zeros(len(self.vocabulary))
-            
-            for ngram, idx in self.vocabulary.items():
-                if ngram in ngram_counts: 
-                    # TF (Term Frequency)
-                    tf = ngram_counts[ngram] / len(ngrams) if ngrams else 0
-                    # TF-IDF
-                    vector[idx] = tf * self. idf[ngram]
-            
-            vectors.append(vector)
+        indptr, indices, data = self._transform_csr_arrays(texts)
+        shape = (len(indptr) - 1, len(self.vocabulary))
         
-        return np.array(vectors)
+        if sparse:
+            X = csr_matrix((data, indices, indptr), shape=shape)
+            X.sort_indices()
+            return X
+        
+        vectors = np.zeros(shape)
+        rows = np.repeat(np.arange(shape[0]), np.diff(indptr))
+        vectors[rows, indices] = data
+        return vectors
     
-    def fit_transform(self, texts):
+    def fit_transform(self, texts, sparse=False):
         """Fit et transform en une seule étape."""
         self.fit(texts)
-        return self.transform(texts)
+        return self.transform(texts, sparse=sparse)
     
     def get_feature_names(self):
         """Retourne la liste des features (n-grammes)."""
@@ -165,62 +216,81 @@ class NaiveBayesClassifier:
         self.feature_probs = {}
         self.classes = []
     
-    def fit(self, X, y):
+    def fit(self, X, y, sample_weight=None):
         """
         Entraîne le modèle. 
         
         Args:
-            X: Matrice de features (n_samples, n_features)
+            X: Matrice de features (n_samples, n_features), dense ou CSR
             y: Labels (n_samples,)
+            sample_weight: Poids par échantillon (None = poids 1), utilisé
+                           à la place de lignes dupliquées pour le rééquilibrage
         """
         self.classes = list(set(y))
         n_samples, n_features = X.shape
         
+        y_array = np.asarray(y)
+        if sample_weight is None:
+            sample_weight = np.ones(n_samples)
+        sample_weight = np.asarray(sample_weight, dtype=np.float64)
+        total_weight = sample_weight.sum()
+        
         for cls in self.classes:
-            # Indices des échantillons de cette classe
-            cls_indices = [i for i, label in enumerate(y) if label == cls]
-            cls_samples = X[cls_indices]
+            # Poids des échantillons de cette classe (0 ailleurs): pas de copie de X
+            cls_weight = np.where(y_array == cls, sample_weight, 0.0)
             
             # Prior:  P(classe)
-            self.class_priors[cls] = len(cls_indices) / n_samples
+            self.class_priors[cls] = cls_weight.sum() / total_weight
             
             # Likelihood: P(feature | classe)
             # Avec lissage de Laplace
-            feature_counts = cls_samples.sum(axis=0) + self.alpha
+            feature_counts = np.asarray(X.T @ cls_weight).ravel() + self.alpha
             total_count = feature_counts.sum()
             self.feature_probs[cls] = feature_counts / total_count
         
+        # Log-probabilités précalculées une fois pour toutes (n_classes, n_features)
+        self._compute_log_params()
+        
         return self
     
-    def predict_proba(self, X):
+    def _compute_log_params(self):
+        """Précalcule log P(feature | classe) et log P(classe) sous forme matricielle."""
+        self.log_feature_probs = np.vstack([
+            np.log(self.feature_probs[cls] + 1e-10) for cls in self.classes
+        ])
+        self.log_priors = np.array([np.log(self.class_priors[cls]) for cls in self.classes])
+    
+    def predict_proba(self, X, as_array=False):
         """
         Prédit les probabilités pour chaque classe. 
         
+        Scoring matriciel: X @ logP.T + log_prior, normalisé par logsumexp.
+        
         Args:
-            X: Matrice de features
+            X: Matrice de features (dense ou CSR)
+            as_array: Retourner un ndarray (n_samples, n_classes), colonnes
+                      dans l'ordre de self.classes
         
         Returns:
-            Dict {classe: probabilités}
+            Dict {classe: probabilités} ou ndarray si as_array
         """
-        probas = {cls: [] for cls in self.classes}
+        # Modèles sauvegardés avant le précalcul
+        if getattr(self, 'log_feature_probs', None) is None:
+            self._compute_log_params()
         
-        for sample in X:
-            sample_probas = {}
-            for cls in self.classes:
-                # Log probability pour éviter underflow
-                log_prob = np.log(self.class_priors[cls])
-                log_prob += np.sum(sample * np.log(self.feature_probs[cls] + 1e-10))
-                sample_probas[cls] = log_prob
-            
-            # Normaliser (softmax)
-            max_log = max(sample_probas.values())
-            exp_probs = {cls: np.exp(p - max_log) for cls, p in sample_probas.items()}
-            total = sum(exp_probs.values())
-            
-            for cls in self.classes:
-                probas[cls].append(exp_probs[cls] / total)
+        # Log probability pour éviter underflow
+        log_probs = np.asarray(X @ self.log_feature_probs.T) + self.log_priors
         
-        return probas
+        # Normaliser (logsumexp par ligne)
+        max_log = log_probs.max(axis=1, keepdims=True)
+        log_norm = max_log + np.log(np.exp(log_probs - max_log).sum(axis=1, keepdims=True))
+        probas_matrix = np.exp(log_probs - log_norm)
+        
+        if as_array:
+            return probas_matrix
+        
+        return {cls: probas_matrix[:, idx].tolist()
+                for idx, cls in enumerate(self.classes)}
     
     def predict(self, X):
         """
@@ -232,14 +302,8 @@ class NaiveBayesClassifier:
         Returns:
             Liste de prédictions
         """
-        probas = self.predict_proba(X)
-        predictions = []
-        
-        for i in range(len(X)):
-            best_cls = max(self.classes, key=lambda cls: probas[cls][i])
-            predictions.append(best_cls)
-        
-        return predictions
+        probas = self.predict_proba(X, as_array=True)
+        return [self.classes[idx] for idx in probas.argmax(axis=1)]
 
 
 class LogisticRegressionClassifier:
@@ -248,19 +312,35 @@ class LogisticRegressionClassifier:
     Plus puissant que Naive Bayes, gère mieux les features corrélées.
     """
     
-    def __init__(self, learning_rate=0.1, n_iterations=1000, lambda_reg=0.01):
+    def __init__(self, learning_rate=0.1, n_iterations=1000, lambda_reg=0.01,
+                 batch_size=None, tol=None, early_stopping=False,
+                 validation_fraction=0.1, n_iter_no_change=5, random_state=None):
         """
         Args: 
             learning_rate: Taux d'apprentissage
-            n_iterations: Nombre d'itérations
+            n_iterations: Nombre d'itérations (époques en mode mini-batch)
             lambda_reg: Paramètre de régularisation L2
+            batch_size: Taille des mini-batchs (None = gradient sur tout le dataset)
+            tol: Amélioration minimale de la loss par époque (None = pas de critère)
+            early_stopping: Arrêt anticipé sur un split de validation
+            validation_fraction: Part des données réservée à la validation
+            n_iter_no_change: Époques sans amélioration avant l'arrêt
+            random_state: Graine (mélange, split, initialisation)
         """
         self.learning_rate = learning_rate
         self.n_iterations = n_iterations
         self.lambda_reg = lambda_reg
+        self.batch_size = batch_size
+        self.tol = tol
+        self.early_stopping = early_stopping
+        self.validation_fraction = validation_fraction
+        self.n_iter_no_change = n_iter_no_change
+        self.random_state = random_state
         self. weights = {}
         self.biases = {}
         self.classes = []
+        self.loss_history = []
+        self.n_iter_ = 0
     
     def _sigmoid(self, z):
         """Fonction sigmoïde."""
@@ -271,13 +351,14 @@ class LogisticRegressionClassifier:
         exp_z = np.exp(z - np.max(z, axis=1, keepdims=True))
         return exp_z / np. sum(exp_z, axis=1, keepdims=True)
     
-    def fit(self, X, y):
+    def fit(self, X, y, sample_weight=None):
         """
-        Entraîne le modèle avec descente de gradient.
+        Entraîne le modèle avec descente de gradient (full-batch ou mini-batch SGD).
         
         Args:
-            X: Matrice de features (n_samples, n_features)
+            X: Matrice de features (n_samples, n_features), dense ou CSR
             y: Labels (n_samples,)
+            sample_weight: Poids par échantillon (None = moyenne simple)
         """
         self.classes = list(set(y))
         n_samples, n_features = X.shape
@@ -289,34 +370,121 @@ class LogisticRegressionClassifier:
         for i, label in enumerate(y):
             y_onehot[i, class_to_idx[label]] = 1
         
+        # Générateur aléatoire (np.random global si pas de graine, comme avant)
+        rng = np.random if self.random_state is None else np.random.RandomState(self.random_state)
+        
         # Initialiser les poids
-        self.W = np.random.randn(n_features, n_classes) * 0.01
+        self.W = rng.randn(n_features, n_classes) * 0.01
         self.b = np.zeros((1, n_classes))
         
-        # Descente de gradient
+        # Réserver un split de validation pour l'arrêt anticipé
+        w = None if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+        
+        X_train, y_train, w_train = X, y_onehot, w
+        X_val, y_val, w_val = None, None, None
+        if self.early_stopping:
+            n_val = int(n_samples * self.validation_fraction)
+            if 0 < n_val < n_samples:
+                perm = rng.permutation(n_samples)
+                val_idx, train_idx = perm[:n_val], np.sort(perm[n_val:])
+                X_val, y_val = X[val_idx], y_onehot[val_idx]
+                X_train, y_train = X[train_idx], y_onehot[train_idx]
+                if w is not None:
+                    w_val, w_train = w[val_idx], w[train_idx]
+        
+        n_train = X_train.shape[0]
+        batch_size = n_train if self.batch_size is None else min(self.batch_size, n_train)
+        monitor = self.tol is not None or X_val is not None
+        tol = self.tol or 0.0
+        
+        best_loss = np.inf
+        best_params = None
+        no_improvement = 0
+        self.loss_history = []
+        self.n_iter_ = 0
+        
+        # Descente de gradient (mini-batch si batch_size < n_train)
         for iteration in range(self.n_iterations):
-            # Forward pass
-            z = np.dot(X, self.W) + self.b
-            probas = self._softmax(z)
+            if batch_size < n_train:
+                order = rng.permutation(n_train)
+                for start in range(0, n_train, batch_size):
+                    batch = order[start:start + batch_size]
+                    w_batch = None if w_train is None else w_train[batch]
+                    self._gradient_step(X_train[batch], y_train[batch], w_batch)
+            else:
+                self._gradient_step(X_train, y_train, w_train)
+            
+            self.n_iter_ = iteration + 1
+            if not monitor:
+                continue
+            
+            # Convergence: loss de validation si disponible, sinon d'entraînement
+            if X_val is not None:
+                loss = self._loss(X_val, y_val, w_val)
+            else:
+                loss = self._loss(X_train, y_train, w_train)
+            self.loss_history.append(loss)
             
-            # Calculer le gradient
-            error = probas - y_onehot
-            dW = (1 / n_samples) * np.dot(X.T, error) + self.lambda_reg * self.W
-            db = (1 / n_samples) * np.sum(error, axis=0, keepdims=True)
+            if loss < best_loss - tol:
+                no_improvement = 0
+            else:
+                no_improvement += 1
             
-            # Mise à jour
-            self.W -= self.learning_rate * dW
-            self.b -= self.learning_rate * db
+            if loss < best_loss:
+                best_loss = loss
+                if X_val is not None:
+                    best_params = (self.W.copy(), self.b.copy())
+            
+            if no_improvement >= self.n_iter_no_change:
+                break
+        
+        # Garder les meilleurs poids sur la validation
+        if best_params is not None:
+            self.W, self.b = best_params
         
         return self
     
-    def predict_proba(self, X):
+    def _gradient_step(self, X, y_onehot, sample_weight=None):
+        """Une mise à jour de gradient sur un batch (dense ou CSR)."""
+        n_samples = X.shape[0]
+        
+        # Forward pass
+        z = X @ self.W + self.b
+        probas = self._softmax(z)
+        
+        # Calculer le gradient (moyenne pondérée si sample_weight)
+        error = probas - y_onehot
+        if sample_weight is not None:
+            error = error * sample_weight[:, np.newaxis]
+            n_samples = sample_weight.sum()
+        dW = (1 / n_samples) * (X.T @ error) + self.lambda_reg * self.W
+        db = (1 / n_samples) * np.sum(error, axis=0, keepdims=True)
+        
+        # Mise à jour
+        self.W -= self.learning_rate * dW
+        self.b -= self.learning_rate * db
+    
+    def _loss(self, X, y_onehot, sample_weight=None):
+        """Entropie croisée moyenne (pondérée) + pénalité L2."""
+        probas = self._softmax(X @ self.W + self.b)
+        log_likelihood = np.log(np.sum(probas * y_onehot, axis=1) + 1e-15)
+        cross_entropy = -np.average(log_likelihood, weights=sample_weight)
+        return cross_entropy + 0.5 * self.lambda_reg * np.sum(self.W ** 2)
+    
+    def predict_proba(self, X, as_array=False):
         """
         Prédit les probabilités pour chaque classe. 
+        
+        Args:
+            X: Matrice de features (dense ou CSR)
+            as_array: Retourner un ndarray (n_samples, n_classes)
         """
-        z = np.dot(X, self.W) + self.b
+        z = X @ self.W + self.b
         probas_matrix = self._softmax(z)
         
+        if as_array:
+            return probas_matrix
+        
         probas = {cls: probas_matrix[: , idx]. tolist() 
                   for idx, cls in enumerate(self.classes)}
         return probas
@@ -328,7 +496,7 @@ class LogisticRegressionClassifier:
         probas = self. predict_proba(X)
         predictions = []
         
-        for i in range(len(X)):
+        for i in range(X.shape[0]):
             best_cls = max(self.classes, key=lambda cls: probas[cls][i])
             predictions.append(best_cls)
         
@@ -345,23 +513,37 @@ class SentimentModel:
     Gère le déséquilibre des classes et combine plusieurs approches.
     """
     
-    def __init__(self, model_type='naive_bayes', handle_imbalance=True):
+    def __init__(self, model_type='naive_bayes', handle_imbalance=True,
+                 batch_size=None, early_stopping=False, sparse=None):
         """
         Args: 
             model_type: 'naive_bayes' ou 'logistic_regression'
             handle_imbalance: Appliquer des techniques pour gérer le déséquilibre
+            sparse: Vectoriser en matrice CSR (None = CSR si scipy est
+                    installé, sinon tableau dense)
+            batch_size: logistic_regression - taille des mini-batchs
+                        (None = gradient sur tout le dataset, par défaut)
+            early_stopping: logistic_regression - arrêt anticipé sur un split
+                            de validation (désactivé par défaut)
         """
         self.model_type = model_type
         self.handle_imbalance = handle_imbalance
+        self.sparse = SCIPY_AVAILABLE if sparse is None else sparse
         self.vectorizer = DarijaVectorizer(max_features=500, ngram_range=(1, 2))
         
         if model_type == 'naive_bayes':
             self.classifier = NaiveBayesClassifier(alpha=1.0)
         elif model_type == 'logistic_regression':
+            # Par défaut: gradient complet sur 500 itérations (référence).
+            # Mini-batch et arrêt anticipé sont optionnels.
             self. classifier = LogisticRegressionClassifier(
                 learning_rate=0.1, 
                 n_iterations=500,
-                lambda_reg=0.01
+                lambda_reg=0.01,
+                batch_size=batch_size,
+                tol=1e-4 if batch_size else None,
+                early_stopping=early_stopping,
+                n_iter_no_change=10
             )
         else:
             raise ValueError(f"Type de modèle inconnu: {model_type}")
@@ -384,31 +566,18 @@ class SentimentModel:
         
         return weights
     
-    def _oversample(self, X, y):
+    def _oversample_weights(self, y):
         """
-        Suréchantillonne les classes minoritaires.
+        Suréchantillonne les classes minoritaires par poids plutôt que par copie:
+        chaque échantillon d'une classe compte max_count / count fois.
+        
+        Returns:
+            numpy array des poids par échantillon
         """
         counter = Counter(y)
         max_count = max(counter.values())
         
-        X_resampled = list(X)
-        y_resampled = list(y)
-        
-        for cls, count in counter.items():
-            if count < max_count:
-                # Indices des échantillons de cette classe
-                cls_indices = [i for i, label in enumerate(y) if label == cls]
-                
-                # Nombre d'échantillons à ajouter
-                n_to_add = max_count - count
-                
-                # Dupliquer aléatoirement
-                for _ in range(n_to_add):
-                    idx = np.random.choice(cls_indices)
-                    X_resampled.append(X[idx])
-                    y_resampled.append(y[idx])
-        
-        return X_resampled, y_resampled
+        return np.array([max_count / counter[label] for label in y])
     
     def train(self, texts, labels):
         """
@@ -422,25 +591,24 @@ class SentimentModel:
         
         # Vectoriser les textes
         print("   📊 Vectorisation des textes...")
-        X = self.vectorizer.fit_transform(texts)
+        X = self.vectorizer.fit_transform(texts, sparse=self.sparse)
         y = labels
+        sample_weight = None
         
         # Gérer le déséquilibre si demandé
         if self.handle_imbalance:
             print("   ⚖️ Gestion du déséquilibre des classes...")
             self.class_weights = self._calculate_class_weights(y)
             
-            # Suréchantillonnage
-            X_list = [X[i] for i in range(len(X))]
-            X_resampled, y_resampled = self._oversample(X_list, list(y))
-            X = np.array(X_resampled)
-            y = y_resampled
+            # Suréchantillonnage (poids par échantillon, aucune ligne dupliquée)
+            sample_weight = self._oversample_weights(y)
             
-            print(f"   📈 Dataset après suréchantillonnage:  {len(y)} échantillons")
+            print(f"   📈 Dataset après suréchantillonnage:  {int(round(sample_weight.sum()))} échantillons "
+                  f"(pondérés, {len(y)} lignes)")
         
         # Entraîner le classificateur
         print("   🔄 Entraînement du classificateur...")
-        self.classifier. fit(X, y)
+        self.classifier. fit(X, y, sample_weight=sample_weight)
         
         self.is_trained = True
         print("   ✅ Entraînement terminé!")
@@ -465,7 +633,7 @@ class SentimentModel:
             texts = [texts]
         
         # Vectoriser
-        X = self.vectorizer. transform(texts)
+        X = self.vectorizer.transform(texts, sparse=self.sparse)
         
         # Prédire
         predictions = self.classifier.predict(X)
@@ -491,20 +659,19 @@ class SentimentModel:
             texts = [texts]
         
         # Vectoriser
-        X = self.vectorizer.transform(texts)
+        X = self.vectorizer.transform(texts, sparse=self.sparse)
         
-        # Prédire avec probabilités
-        probas = self.classifier.predict_proba(X)
+        # Prédire avec probabilités (n_samples, n_classes)
+        probas = self.classifier.predict_proba(X, as_array=True)
+        classes = self.classifier.classes
+        best_indices = probas.argmax(axis=1)
         
         results = []
-        for i in range(len(texts)):
-            probs = {cls: probas[cls][i] for cls in probas}
-            best_cls = max(probs, key=probs.get)
-            
+        for row, best_idx in zip(probas.tolist(), best_indices):
             results.append({
-                'label': best_cls,
-                'confidence':  round(probs[best_cls], 3),
-                'probabilities': {k: round(v, 3) for k, v in probs. items()}
+                'label': classes[best_idx],
+                'confidence':  round(row[best_idx], 3),
+                'probabilities': {cls: round(p, 3) for cls, p in zip(classes, row)}
             })
         
         if single_input:
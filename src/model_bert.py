@@ -65,6 +65,111 @@ AVAILABLE_MODELS = {
 LABEL_TO_ID = {'negative': 0, 'neutral': 1, 'positive':  2}
 ID_TO_LABEL = {0: 'negative', 1: 'neutral', 2: 'positive'}
 
+# Inférence
+DEFAULT_BATCH_SIZE = 32
+MAX_LENGTH = 128
+
+
+# Quantification supportée au chargement
+QUANTIZE_MODES = (None, 'dynamic')
+
+
+# ============================================
+# TOKENIZER LOCAL
+# ============================================
+
+def load_checkpoint_tokenizer(checkpoint_path, base_model_name=AVAILABLE_MODELS['camelbert-mix']['name']):
+    """
+    Charge le tokenizer depuis le dossier du checkpoint.
+
+    Les checkpoints du Trainer ne contiennent pas le tokenizer: au premier
+    chargement il est récupéré depuis le hub puis sauvegardé à côté du
+    checkpoint, les démarrages suivants n'accèdent plus au réseau.
+    """
+    if os.path.exists(os.path.join(checkpoint_path, 'tokenizer_config.json')):
+        return AutoTokenizer.from_pretrained(checkpoint_path)
+
+    tokenizer = AutoTokenizer.from_pretrained(base_model_name)
+    try:
+        tokenizer.save_pretrained(checkpoint_path)
+    except OSError as e:
+        print(f"⚠️ Tokenizer non sauvegardé dans {checkpoint_path}: {e}")
+    return tokenizer
+
+
+# ============================================
+# QUANTIFICATION INT8 DYNAMIQUE
+# ============================================
+
+def quantize_dynamic_model(model):
+    """
+    Quantifie dynamiquement les couches Linear en int8 (poids int8,
+    activations quantifiées à la volée). CPU uniquement, sans réentraînement.
+    """
+    model.to('cpu')
+    model.eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+# ============================================
+# INFÉRENCE PAR BATCHS (PADDING DYNAMIQUE)
+# ============================================
+
+def batch_predict_proba(model, tokenizer, texts, device, batch_size=DEFAULT_BATCH_SIZE,
+                        max_length=MAX_LENGTH):
+    """
+    Calcule les probabilités de sentiment par batchs avec padding dynamique.
+    
+    Les textes sont tokenisés une seule fois (sans padding), triés par
+    longueur, puis chaque batch est paddé à la longueur de son plus long
+    texte au lieu de max_length. Les résultats sont remis dans l'ordre
+    d'origine.
+    
+    Args:
+        model: Modèle AutoModelForSequenceClassification
+        tokenizer: Tokenizer associé
+        texts: Liste de textes
+        device: Device torch
+        batch_size: Nombre de textes par passe forward
+        max_length: Longueur maximale (troncature)
+    
+    Returns:
+        numpy array (n_texts, n_labels)
+    """
+    texts = list(texts)
+    num_labels = model.config.num_labels
+    probs = np.zeros((len(texts), num_labels), dtype=np.float32)
+    if not texts:
+        return probs
+    
+    encodings = tokenizer(texts, truncation=True, max_length=max_length)
+    input_ids = encodings['input_ids']
+    attention_mask = encodings['attention_mask']
+    
+    # Trier par longueur: peu de tokens de padding dans chaque batch
+    order = sorted(range(len(texts)), key=lambda i: len(input_ids[i]))
+    
+    model.eval()
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            batch_idx = order[start:start + batch_size]
+            batch = tokenizer.pad(
+                {
+                    'input_ids': [input_ids[i] for i in batch_idx],
+                    'attention_mask': [attention_mask[i] for i in batch_idx],
+                },
+                return_tensors='pt'
+            )
+            
+            outputs = model(
+                input_ids=batch['input_ids'].to(device),
+                attention_mask=batch['attention_mask'].to(device)
+            )
+            batch_probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
+            probs[batch_idx] = batch_probs.float().cpu().numpy()
+    
+    return probs
+
 
 # ============================================
 # DATASET PYTORCH
@@ -148,6 +253,8 @@ class BertSentimentModel:
         print(f"   Device: {self. device}")
         
         self. model.to(self.device)
+        self.quantize = None
+        self.batch_size = DEFAULT_BATCH_SIZE
         self.is_trained = False
     
     def prepare_data(self, texts, labels, test_size=0.2):
@@ -231,78 +338,53 @@ class BertSentimentModel:
         
         return results
     
-    def predict(self, texts):
+    def predict_proba(self, texts, batch_size=None):
         """
-        Prédit le sentiment pour une liste de textes.
+        Probabilités par classe (ordre de ID_TO_LABEL), inférence par batchs.
+        
+        Args:
+            texts: Liste de textes ou un seul texte
+            batch_size: Taille des batchs (défaut: self.batch_size)
+        
+        Returns:
+            numpy array (n_texts, n_labels)
         """
         if isinstance(texts, str):
             texts = [texts]
         
-        self.model.eval()
-        predictions = []
-        
-        with torch.no_grad():
-            for text in texts:
-                # Tokenizer
-                encoding = self.tokenizer(
-                    text,
-                    truncation=True,
-                    padding='max_length',
-                    max_length=128,
-                    return_tensors='pt'
-                )
-                
-                # Envoyer au device
-                input_ids = encoding['input_ids'].to(self.device)
-                attention_mask = encoding['attention_mask'].to(self.device)
-                
-                # Prédire
-                outputs = self. model(input_ids=input_ids, attention_mask=attention_mask)
-                probs = torch.nn.functional. softmax(outputs.logits, dim=-1)
-                pred_id = torch.argmax(probs, dim=-1).item()
-                
-                predictions. append(ID_TO_LABEL[pred_id])
+        return batch_predict_proba(
+            self.model, self.tokenizer, texts, self.device,
+            batch_size=batch_size or self.batch_size
+        )
+    
+    def predict(self, texts, batch_size=None):
+        """
+        Prédit le sentiment pour une liste de textes.
+        """
+        probs = self.predict_proba(texts, batch_size=batch_size)
+        predictions = [ID_TO_LABEL[pred_id] for pred_id in probs.argmax(axis=1)]
         
         return predictions if len(predictions) > 1 else predictions[0]
     
-    def predict_with_confidence(self, texts):
+    def predict_with_confidence(self, texts, batch_size=None):
         """
         Prédit avec les scores de confiance.
         """
-        if isinstance(texts, str):
-            texts = [texts]
-        
-        self.model. eval()
+        probs = self.predict_proba(texts, batch_size=batch_size)
         results = []
         
-        with torch.no_grad():
-            for text in texts:
-                encoding = self.tokenizer(
-                    text,
-                    truncation=True,
-                    padding='max_length',
-                    max_length=128,
-                    return_tensors='pt'
-                )
-                
-                input_ids = encoding['input_ids']. to(self.device)
-                attention_mask = encoding['attention_mask'].to(self.device)
-                
-                outputs = self. model(input_ids=input_ids, attention_mask=attention_mask)
-                probs = torch.nn.functional.softmax(outputs.logits, dim=-1)[0]
-                
-                pred_id = torch.argmax(probs).item()
-                confidence = probs[pred_id].item()
-                
-                results.append({
-                    'label': ID_TO_LABEL[pred_id],
-                    'confidence': round(confidence, 3),
-                    'probabilities': {
-                        'negative': round(probs[0].item(), 3),
-                        'neutral': round(probs[1]. item(), 3),
-                        'positive': round(probs[2].item(), 3),
-                    }
-                })
+        for pred_id, row in zip(probs.argmax(axis=1).tolist(), probs.tolist()):
+            confidence = row[pred_id]
+            
+            results.append({
+                'label': ID_TO_LABEL[pred_id],
+                'confidence': round(confidence, 3),
+                'probabilities': {
+                    'negative': round(row[0], 3),
+                    'neutral': round(row[1], 3),
+                    'positive': round(row[2], 3),
+                }
+            })
         
         return results if len(results) > 1 else results[0]
     
@@ -318,17 +400,32 @@ class BertSentimentModel:
         print(f"✅ Modèle sauvegardé:  {output_dir}")
     
     @classmethod
-    def load(cls, model_dir):
+    def load(cls, model_dir, quantize=None):
         """
         Charge un modèle sauvegardé.
+        
+        Args:
+            model_dir: Dossier du modèle
+            quantize: None ou 'dynamic' (Linear en int8, exécution sur CPU)
         """
+        if quantize not in QUANTIZE_MODES:
+            raise ValueError(f"quantize doit être parmi {QUANTIZE_MODES}, reçu: {quantize!r}")
+        
         instance = cls.__new__(cls)
         instance.tokenizer = AutoTokenizer.from_pretrained(model_dir)
         instance.model = AutoModelForSequenceClassification.from_pretrained(model_dir)
-        instance.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        instance.model.to(instance.device)
+        
+        if quantize == 'dynamic':
+            instance.model = quantize_dynamic_model(instance.model)
+            instance.device = torch.device('cpu')
+        else:
+            instance.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            instance.model.to(instance.device)
+        
+        instance.quantize = quantize
+        instance.batch_size = DEFAULT_BATCH_SIZE
         instance.is_trained = True
-        print(f"✅ Modèle chargé: {model_dir}")
+        print(f"✅ Modèle chargé: {model_dir}" + (" (int8 dynamique)" if quantize else ""))
         return instance
 
 
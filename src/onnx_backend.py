@@ -0,0 +1,251 @@
+"""
+SocialPulse Monastir - Backend ONNX Runtime pour BERT
+=====================================================
+Exporte un checkpoint CAMeLBERT (models/bert_checkpoints/checkpoint-N)
+au format ONNX, avec quantification int8 dynamique optionnelle, et
+l'exécute avec ONNX Runtime sur CPU (sans torch à l'inférence).
+
+Fichiers produits (par défaut dans <checkpoint>/onnx/):
+- model.onnx        : modèle float32
+- model.int8.onnx   : modèle quantifié (option --quantize)
+- tokenizer         : fichiers du tokenizer, chargés localement
+
+Usage:
+    python src/onnx_backend.py [chemin_checkpoint] [--quantize]
+
+Dépendances: pip install onnx onnxruntime (+ torch pour l'export)
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+# Tokenizer du modèle de base (les checkpoints du Trainer ne le contiennent pas)
+BASE_TOKENIZER_NAME = 'CAMeL-Lab/bert-base-arabic-camelbert-mix'
+
+ONNX_DIRNAME = 'onnx'
+ONNX_FILENAME = 'model.onnx'
+ONNX_INT8_FILENAME = 'model.int8.onnx'
+
+ID_TO_LABEL = {0: 'negative', 1: 'neutral', 2: 'positive'}
+
+
+# ============================================
+# 1. CHEMINS ET TOKENIZER
+# ============================================
+
+def get_onnx_dir(checkpoint_path):
+    """Dossier ONNX associé à un checkpoint."""
+    return os.path.join(checkpoint_path, ONNX_DIRNAME)
+
+
+def load_tokenizer(model_dir):
+    """Charge le tokenizer local s'il existe, sinon celui du modèle de base."""
+    if os.path.exists(os.path.join(model_dir, 'tokenizer_config.json')):
+        return AutoTokenizer.from_pretrained(model_dir)
+    return AutoTokenizer.from_pretrained(BASE_TOKENIZER_NAME)
+
+
+# ============================================
+# 2. EXPORT
+# ============================================
+
+def export_onnx(checkpoint_path, output_dir=None, quantize=False, opset=14):
+    """
+    Exporte un checkpoint PyTorch au format ONNX.
+
+    Args:
+        checkpoint_path: Dossier du checkpoint (AutoModelForSequenceClassification)
+        output_dir: Dossier de sortie (défaut: <checkpoint>/onnx)
+        quantize: Produire aussi model.int8.onnx (quantification dynamique)
+        opset: Version d'opset ONNX
+
+    Returns:
+        dict: Chemins des fichiers produits
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    output_dir = output_dir or get_onnx_dir(checkpoint_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"📥 Chargement du checkpoint: {checkpoint_path}")
+    tokenizer = load_tokenizer(checkpoint_path)
+    model = AutoModelForSequenceClassification.from_pretrained(checkpoint_path)
+    model.eval()
+
+    class LogitsOnly(torch.nn.Module):
+        """Expose uniquement les logits (sortie ONNX unique)."""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+    dummy = tokenizer(["jaw behi barcha fi mestir"], return_tensors='pt')
+    onnx_path = os.path.join(output_dir, ONNX_FILENAME)
+
+    print(f"🔄 Export ONNX (opset {opset}): {onnx_path}")
+    with torch.inference_mode():
+        torch.onnx.export(
+            LogitsOnly(model),
+            (dummy['input_ids'], dummy['attention_mask']),
+            onnx_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'},
+            },
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+
+    # Tokenizer à côté du modèle: plus d'accès au hub au démarrage
+    tokenizer.save_pretrained(output_dir)
+    paths = {'onnx': onnx_path}
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        int8_path = os.path.join(output_dir, ONNX_INT8_FILENAME)
+        print(f"🔄 Quantification int8 dynamique: {int8_path}")
+        quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QInt8)
+        paths['onnx_int8'] = int8_path
+
+    for name, path in paths.items():
+        print(f"   • {name}: {os.path.getsize(path) / 1e6:.1f} Mo")
+
+    print("✅ Export terminé!")
+    return paths
+
+
+# ============================================
+# 3. INFÉRENCE
+# ============================================
+
+def load_onnx_model(checkpoint_path, quantized=False, num_threads=None):
+    """
+    Charge un modèle exporté pour ONNX Runtime (CPU).
+
+    Returns:
+        dict: {'session', 'tokenizer', 'backend', 'type'} (même forme que les
+              autres modèles BERT de l'API / de predict.py)
+    """
+    if not ONNX_AVAILABLE:
+        raise ImportError("Installez les dépendances: pip install onnxruntime transformers")
+
+    onnx_dir = get_onnx_dir(checkpoint_path)
+    filename = ONNX_INT8_FILENAME if quantized else ONNX_FILENAME
+    onnx_path = os.path.join(onnx_dir, filename)
+    if not os.path.exists(onnx_path):
+        raise FileNotFoundError(
+            f"{onnx_path} introuvable. Exportez d'abord: "
+            f"python src/onnx_backend.py {checkpoint_path}" + (" --quantize" if quantized else "")
+        )
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if num_threads:
+        options.intra_op_num_threads = num_threads
+
+    session = ort.InferenceSession(onnx_path, sess_options=options, providers=['CPUExecutionProvider'])
+
+    return {
+        'session': session,
+        'tokenizer': load_tokenizer(onnx_dir),
+        'backend': 'onnx-int8' if quantized else 'onnx',
+        'type': 'bert',
+    }
+
+
+def onnx_predict_proba(model_data, texts, batch_size=32, max_length=128):
+    """
+    Probabilités par classe avec ONNX Runtime, par batchs triés par
+    longueur avec padding dynamique (résultats dans l'ordre d'origine).
+
+    Returns:
+        numpy array (n_texts, n_labels)
+    """
+    session = model_data['session']
+    tokenizer = model_data['tokenizer']
+
+    texts = list(texts)
+    probs = None
+    if not texts:
+        return np.zeros((0, len(ID_TO_LABEL)), dtype=np.float32)
+
+    encodings = tokenizer(texts, truncation=True, max_length=max_length)
+    input_ids = encodings['input_ids']
+    attention_mask = encodings['attention_mask']
+    order = sorted(range(len(texts)), key=lambda i: len(input_ids[i]))
+
+    for start in range(0, len(order), batch_size):
+        batch_idx = order[start:start + batch_size]
+        batch = tokenizer.pad(
+            {
+                'input_ids': [input_ids[i] for i in batch_idx],
+                'attention_mask': [attention_mask[i] for i in batch_idx],
+            },
+            return_tensors='np'
+        )
+
+        logits = session.run(['logits'], {
+            'input_ids': batch['input_ids'].astype(np.int64),
+            'attention_mask': batch['attention_mask'].astype(np.int64),
+        })[0]
+
+        # Softmax
+        exp_logits = np.exp(logits - logits.max(axis=1, keepdims=True))
+        batch_probs = exp_logits / exp_logits.sum(axis=1, keepdims=True)
+
+        if probs is None:
+            probs = np.zeros((len(texts), batch_probs.shape[1]), dtype=np.float32)
+        probs[batch_idx] = batch_probs
+
+    return probs
+
+
+# ============================================
+# MAIN - EXPORT
+# ============================================
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(script_dir)
+    checkpoints_dir = os.path.join(project_root, 'models', 'bert_checkpoints')
+
+    parser = argparse.ArgumentParser(description="Export ONNX d'un checkpoint BERT")
+    parser.add_argument('checkpoint', nargs='?', help="Dossier du checkpoint (défaut: le plus récent)")
+    parser.add_argument('--quantize', action='store_true', help="Produire aussi la version int8")
+    parser.add_argument('--output-dir', help="Dossier de sortie (défaut: <checkpoint>/onnx)")
+    parser.add_argument('--opset', type=int, default=14)
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint
+    if checkpoint is None:
+        checkpoints = []
+        if os.path.exists(checkpoints_dir):
+            checkpoints = [d for d in os.listdir(checkpoints_dir) if d.startswith('checkpoint-')]
+        if not checkpoints:
+            print(f"❌ Aucun checkpoint trouvé dans: {checkpoints_dir}")
+            sys.exit(1)
+        checkpoints.sort(key=lambda x: int(x.split('-')[1]))
+        checkpoint = os.path.join(checkpoints_dir, checkpoints[-1])
+
+    print("=" * 60)
+    print("📦 EXPORT ONNX - SocialPulse Monastir")
+    print("=" * 60)
+
+    export_onnx(checkpoint, output_dir=args.output_dir, quantize=args.quantize, opset=args.opset)
@@ -12,13 +12,23 @@ import pickle
 LABEL_EMOJI = {'positive':  '✅', 'negative':  '❌', 'neutral':  '⚪'}
 ID_TO_LABEL = {0: 'negative', 1: 'neutral', 2: 'positive'}
 
-def load_bert_model(checkpoint_path):
-    """Charge le modèle BERT depuis un checkpoint."""
+def load_bert_model(checkpoint_path, backend='torch'):
+    """
+    Charge le modèle BERT depuis un checkpoint.
+    
+    backend: 'torch', 'onnx' ou 'onnx-int8' (modèle exporté par
+    src/onnx_backend.py dans <checkpoint>/onnx, sans torch à l'inférence)
+    """
+    if backend in ('onnx', 'onnx-int8'):
+        from onnx_backend import load_onnx_model
+        return load_onnx_model(checkpoint_path, quantized=(backend == 'onnx-int8'))
+    
     import torch
-    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    from transformers import AutoModelForSequenceClassification
+    from model_bert import load_checkpoint_tokenizer
     
-    # Charger le tokenizer depuis le modèle ORIGINAL (pas le checkpoint)
-    tokenizer = AutoTokenizer.from_pretrained('CAMeL-Lab/bert-base-arabic-camelbert-mix')
+    # Tokenizer du modèle ORIGINAL, copié à côté du checkpoint au premier chargement
+    tokenizer = load_checkpoint_tokenizer(checkpoint_path)
     
     # Charger le modèle depuis le CHECKPOINT
     model = AutoModelForSequenceClassification.from_pretrained(checkpoint_path)
@@ -27,7 +37,7 @@ def load_bert_model(checkpoint_path):
     model.to(device)
     model.eval()
     
-    return {'model': model, 'tokenizer': tokenizer, 'device': device, 'type': 'bert'}
+    return {'model': model, 'tokenizer': tokenizer, 'device': device, 'type': 'bert', 'backend': 'torch'}
 
 
 def load_sklearn_model(model_path):
@@ -40,6 +50,9 @@ def load_sklearn_model(model_path):
 
 def predict_bert(model_data, text):
     """Prédiction avec BERT."""
+    if model_data.get('backend', 'torch').startswith('onnx'):
+        return predict_bert_onnx(model_data, text)
+    
     import torch
     
     model = model_data['model']
@@ -74,6 +87,24 @@ def predict_bert(model_data, text):
     }
 
 
+def predict_bert_onnx(model_data, text):
+    """Prédiction avec BERT exporté en ONNX (même sortie que predict_bert)."""
+    from onnx_backend import onnx_predict_proba
+    
+    probs = onnx_predict_proba(model_data, [text], max_length=128)[0]
+    pred_id = int(probs.argmax())
+    
+    return {
+        'label': ID_TO_LABEL[pred_id],
+        'confidence': float(probs[pred_id]),
+        'probabilities': {
+            'negative': float(probs[0]),
+            'neutral': float(probs[1]),
+            'positive': float(probs[2]),
+        }
+    }
+
+
 def predict_sklearn(model_data, text):
     """Prédiction avec Naive Bayes / Logistic Regression."""
     model = model_data['model']
@@ -120,17 +151,19 @@ def main():
     print("\nChoisissez le modele:")
     print("  1. BERT (CAMeLBERT) - 73.3% accuracy")
     print("  2. Naive Bayes/Logistic Regression - 45.5% accuracy")
+    print("  3. BERT (CAMeLBERT) via ONNX Runtime - CPU")
     
-    choice = input("\nVotre choix (1 ou 2): ").strip()
+    choice = input("\nVotre choix (1, 2 ou 3): ").strip()
     
     # Charger le modèle
     print("\nChargement du modele...")
     
     try:
-        if choice == '1':
+        if choice in ('1', '3'):
             if os.path. exists(bert_checkpoint):
-                model_data = load_bert_model(bert_checkpoint)
-                print("Modele BERT charge!  (73.3% accuracy)")
+                backend = 'onnx' if choice == '3' else 'torch'
+                model_data = load_bert_model(bert_checkpoint, backend=backend)
+                print("Modele BERT charge!  (73.3% accuracy, backend: " + backend + ")")
             else:
                 print("Checkpoint BERT non trouve!")
                 print("Utilisation de Naive Bayes...")
@@ -0,0 +1,132 @@
+"""
+SocialPulse Monastir - Cache des prédictions
+============================================
+Cache LRU borné avec expiration (TTL) devant les modèles de l'API.
+Les posts sont très dupliqués (retweets, annonces copiées, hashtags
+d'événements): un texte déjà vu n'est pas recalculé.
+
+Clé: (modèle, version du modèle, texte normalisé). Changer de version
+rend les anciennes entrées inaccessibles; invalidate() les supprime.
+"""
+
+import re
+import time
+import threading
+from collections import OrderedDict
+
+# Sélecteurs de variante emoji et espace de largeur nulle: invisibles,
+# sans effet sur le sentiment (ZWJ/ZWNJ gardés: ils changent les emojis
+# composés et la jonction des lettres arabes)
+_INVISIBLE_CHARS = re.compile('[\ufe0e\ufe0f\u200b]')
+
+
+def normalize_cache_text(text):
+    """Normalise un texte pour la clé du cache (espaces, variantes d'emojis)."""
+    return ' '.join(_INVISIBLE_CHARS.sub('', text).split())
+
+
+class PredictionCache:
+    """
+    Cache LRU + TTL thread-safe.
+    """
+
+    def __init__(self, max_size=10000, ttl_seconds=3600):
+        """
+        Args:
+            max_size: Nombre maximal d'entrées (0 = cache désactivé)
+            ttl_seconds: Durée de vie d'une entrée (None = pas d'expiration)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0, 'invalidations': 0}
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def get(self, key):
+        """Retourne la valeur en cache ou None."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+    def put(self, key, value):
+        """Ajoute une valeur (évince la moins récemment utilisée si plein)."""
+        if not self.enabled:
+            return
+
+        expires_at = None if self.ttl_seconds is None else time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, model_name=None):
+        """Supprime les entrées d'un modèle (ou toutes si model_name est None)."""
+        with self._lock:
+            if model_name is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == model_name]:
+                    del self._entries[key]
+            self.stats['invalidations'] += 1
+
+    def get_stats(self):
+        """Compteurs du cache (hits, misses, taux de hit, taille)."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self._entries)
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['max_size'] = self.max_size
+        stats['ttl_seconds'] = self.ttl_seconds
+        return stats
+
+
+def cached_predict(cache, model_name, model_version, texts, predict_many):
+    """
+    Prédit une liste de textes en passant par le cache.
+
+    Les textes absents du cache (dédupliqués) sont calculés en un seul
+    appel à predict_many, sur leur forme normalisée.
+
+    Returns:
+        Liste de résultats dans l'ordre des textes
+    """
+    keys = [(model_name, model_version, normalize_cache_text(text)) for text in texts]
+    results = [cache.get(key) for key in keys]
+
+    missing = {}
+    for key, result in zip(keys, results):
+        if result is None and key not in missing:
+            missing[key] = None
+
+    if missing:
+        computed = predict_many([key[2] for key in missing])
+        for key, result in zip(missing, computed):
+            missing[key] = result
+            cache.put(key, result)
+        results = [missing[key] if result is None else result for key, result in zip(keys, results)]
+
+    return results
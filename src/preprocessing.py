@@ -1,8 +1,16 @@
+import bisect
 import emoji
 import re
 import json
+import hashlib
+import functools
 import random
 import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from ingestion.jsonl import iter_posts, write_posts, iter_chunks
 
 # ============================================
 # 1.  EMOJI SENTIMENT MAPPING (Tableau d'emojis)
@@ -190,16 +198,24 @@ def get_emoji_sentiment_with_context(emoji_char, text):
             'label': context_info['neutral_label']
         }
     
-def extract_emoji_sentiment(text):
+def extract_emoji_sentiment(text, analysis=None):
     """
     Extrait les emojis du texte et calcule un score de sentiment agrégé.
     Utilise l'analyse contextuelle pour les emojis ambigus. 
+    
+    Args:
+        text: Texte du post
+        analysis: TextAnalysis de ce texte (évite de reparcourir le texte)
     """
     found_emojis = []
     total_score = 0
     emoji_count = 0
     
-    for char in text:
+    # Seuls les caractères de l'alphabet emoji repérés par l'analyse
+    # peuvent être des emojis
+    chars = analysis.emoji_chars if analysis is not None else text
+    
+    for char in chars:
         if char in EMOJI_SENTIMENT_MAP or char in CONTEXT_DEPENDENT_EMOJIS:
             # Utiliser l'analyse contextuelle
             emoji_info = get_emoji_sentiment_with_context(char, text)
@@ -231,11 +247,87 @@ def extract_emoji_sentiment(text):
         'dominant_sentiment': 'positive' if avg_score > 0.2 else ('negative' if avg_score < -0.2 else 'neutral')
     }
 
-def remove_emojis(text):
+def remove_emojis(text, analysis=None):
     """Supprime tous les emojis du texte après extraction."""
+    if analysis is not None:
+        return analysis.text_without_emojis
     return emoji.replace_emoji(text, replace='')
 
 
+# ============================================
+# ANALYSE D'UN POST (un seul parcours)
+# ============================================
+
+# Tous les caractères qui peuvent faire partie d'un emoji (séquences ZWJ,
+# sélecteurs de variante, keycaps...). Les chiffres, '#' et '*' n'en
+# font partie qu'avec U+20E3 / U+FE0F, eux-mêmes dans l'alphabet.
+EMOJI_ALPHABET = frozenset(
+    {char for sequence in emoji.EMOJI_DATA for char in sequence if not char.isascii()}
+    | {key for key in list(EMOJI_SENTIMENT_MAP) + list(CONTEXT_DEPENDENT_EMOJIS) if len(key) == 1}
+)
+
+ASCII_LETTERS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+# Chiffres qui signalent du Darija écrit en latin (3aslema, 7aja, 9ahwa...)
+DARIJA_DIGITS = frozenset('35792')
+
+
+class TextAnalysis:
+    """
+    Analyse d'un texte en un seul parcours des caractères, réutilisée par
+    toutes les étapes du pipeline (emojis, langue, normalisation):
+    
+    - emoji_chars:   caractères de l'alphabet emoji, dans l'ordre
+    - arabic_count:  caractères arabes (U+0600-U+06FF)
+    - latin_count:   lettres latines ASCII
+    - has_darija_digits: présence d'un chiffre Darija (3, 7, 9, 5, 2)
+    
+    Le texte sans emojis n'est calculé (tokenizer de la librairie emoji)
+    que si le texte contient au moins un caractère de l'alphabet emoji.
+    """
+    
+    def __init__(self, text, cleaned=False):
+        self.text = text
+        self.cleaned = cleaned  # clean_special_characters déjà appliqué
+        self.emoji_chars = []
+        self.arabic_count = 0
+        self.latin_count = 0
+        self.has_darija_digits = False
+        self._text_without_emojis = None
+        
+        emoji_chars = self.emoji_chars
+        arabic_count = latin_count = 0
+        has_darija_digits = False
+        
+        for char in text:
+            if char in ASCII_LETTERS:
+                latin_count += 1
+            elif '\u0600' <= char <= '\u06ff':
+                arabic_count += 1
+            elif char in DARIJA_DIGITS:
+                has_darija_digits = True
+            elif char in EMOJI_ALPHABET:
+                emoji_chars.append(char)
+        
+        self.arabic_count = arabic_count
+        self.latin_count = latin_count
+        self.has_darija_digits = has_darija_digits
+    
+    @property
+    def text_without_emojis(self):
+        if self._text_without_emojis is None:
+            if self.emoji_chars:
+                self._text_without_emojis = emoji.replace_emoji(self.text, replace='')
+            else:
+                self._text_without_emojis = self.text
+        return self._text_without_emojis
+
+
+def analyze_text(text, cleaned=False):
+    """Analyse un texte en un parcours (voir TextAnalysis)."""
+    return TextAnalysis(text, cleaned=cleaned)
+
+
 
 # ============================================
 # 2.  CONVERSION DES CHIFFRES DARIJA -> LETTRES
@@ -277,6 +369,22 @@ def convert_darija_numbers_to_letters(text):
     return result
 
 
+# Chiffres Darija dans un mot (convert_darija_numbers_smart). Les lettres
+# produites ne sont jamais des chiffres: une seule passe str.translate
+# équivaut aux remplacements successifs.
+DARIJA_DIGITS_TO_LETTERS = {
+    '5': 'kh',   # خ
+    '9': 'k',    # ق
+    '7': 'h',    # ح
+    '3': 'a',    # ع
+    '2': 'a',    # ء
+    '8': 'gh',   # غ
+    '6': 't',    # ط
+}
+
+DARIJA_DIGITS_TABLE = str.maketrans(DARIJA_DIGITS_TO_LETTERS)
+
+
 def convert_darija_numbers_smart(word):
     """
     Convertit intelligemment les chiffres dans un mot Darija.
@@ -290,22 +398,7 @@ def convert_darija_numbers_smart(word):
         - 7ala -> hala
         - 5niss -> khniss
     """
-    result = word
-    
-    # Ordre de remplacement important (5 -> kh doit être avant les autres)
-    replacements = [
-        ('5', 'kh'),   # خ - doit être en premier car produit 2 caractères
-        ('9', 'k'),    # ق
-        ('7', 'h'),    # ح
-        ('3', 'a'),    # ع
-        ('2', 'a'),    # ء
-        ('8', 'gh'),   # غ
-        ('6', 't'),    # ط
-    ]
-    
-    for number, letter in replacements:
-        result = result.replace(number, letter)
-    return result
+    return word.translate(DARIJA_DIGITS_TABLE)
 
 
 # ============================================
@@ -1148,9 +1241,36 @@ KEEP_AS_IS = {'steg', 'us', 'mestir', 'facebook', 'instagram', 'twitter'}
 
 import re
 
-# Variable globale pour stocker les patterns protégés
-_protected_values = {}
-_protection_counter = 0
+
+class ProtectionContext:
+    """
+    État de protection propre à un appel (placeholder -> valeur originale).
+    
+    normalize_text crée un contexte par texte et le passe à
+    extract_protected_patterns puis restore_protected_patterns, ce qui permet
+    de normaliser plusieurs posts en parallèle (threads) sans mélanger leurs
+    placeholders.
+    """
+    
+    def __init__(self):
+        self.values = {}
+        self.counter = 0
+
+
+# Contexte par défaut (un par thread) pour les appels sans contexte explicite
+_default_protection = threading.local()
+
+
+def _get_protection_context(context=None, reset=False):
+    """Retourne le contexte fourni ou le contexte par défaut du thread courant."""
+    if context is not None:
+        if reset:
+            context.values = {}
+            context.counter = 0
+        return context
+    if reset or not hasattr(_default_protection, 'context'):
+        _default_protection.context = ProtectionContext()
+    return _default_protection.context
 
 # Mois en arabe et français pour la protection
 MONTHS_ARABIC = [
@@ -1173,125 +1293,192 @@ MONTHS_FRENCH = [
     'juillet', 'aout', 'août', 'septembre', 'octobre', 'novembre', 'decembre', 'décembre'
 ]
 
-def extract_protected_patterns(text):
+_MONTHS_AR = '|'.join(MONTHS_ARABIC)
+_MONTHS_FR = '|'.join(MONTHS_FRENCH)
+
+# Règles de protection, dans l'ordre historique d'application.
+# (nom du groupe, motif, groupes de mois, vérification, insensible à la casse)
+#   - 'window': ignorer si 'PROT' apparaît à ±10 caractères (texte déjà protégé)
+#   - 'match':  ignorer si le match contient déjà 'PROT'
+PROTECTION_RULES = [
+    # 1. Plages de dates avec mois en arabe (ex: 2 و3 ماي 2025)
+    ('ar_range', rf'\d{{1,2}}\s*[وو\-]\s*\d{{1,2}}\s+(?P<ar_range_m>{_MONTHS_AR})(?:\s+\d{{4}})?\b',
+     ('ar_range_m',), None, False),
+    # 2. Dates simples avec mois en arabe (ex: 30 أكتوبر)
+    ('ar_date', rf'\d{{1,2}}\s+(?P<ar_date_m>{_MONTHS_AR})(?:\s+\d{{4}})?\b',
+     ('ar_date_m',), 'window', False),
+    # 3. Plages de dates avec mois en français (ex: 12 et 13 juin)
+    ('fr_range', rf'\d{{1,2}}\s*[et\-وو]\s*\d{{1,2}}\s+(?P<fr_range_m>{_MONTHS_FR})(?:\s+\d{{4}})?\b',
+     ('fr_range_m',), None, True),
+    # 4. Dates simples avec mois en français (ex: 5 août 2023)
+    ('fr_date', rf'\d{{1,2}}\s+(?P<fr_date_m>{_MONTHS_FR})(?:\s+\d{{4}})?\b',
+     ('fr_date_m',), 'window', True),
+    # 5. Plages de dates entre deux mois (ex: 30 أكتوبر لـ1 نوفمبر)
+    ('ar_span', rf'\d{{1,2}}\s+(?P<ar_span_m1>{_MONTHS_AR})\s+[لِـل]+\s*\d{{1,2}}\s+(?P<ar_span_m2>{_MONTHS_AR})\b',
+     ('ar_span_m1', 'ar_span_m2'), 'window', False),
+    # 6. Patterns numériques classiques
+    ('time_colon', r'\d{1,2}:\d{2}\b', (), 'match', True),                        # 18:30, 9:00
+    ('time_h', r'\d{1,2}h\d{2}\b', (), 'match', True),                            # 14h30
+    ('date_full', r'\d{1,2}[/\-\. ]\d{1,2}[/\-\. ]\d{2,4}\b', (), 'match', True),  # 25/12/2024
+    ('date_short', r'\d{1,2}[/\-\.]\d{1,2}\b', (), 'match', True),                # 25/12
+    ('year', r'(?:19|20)\d{2}\b', (), 'match', True),                             # 1990, 2024
+    ('percentage', r'\d+%', (), 'match', True),                                    # 50%, 100%
+    ('price_decimal', r'\d+(?:\.\d+)?\s*(?:dt|tnd|دينار)\b', (), 'match', True),  # 50dt
+    ('price', r'\d+\s*(?:dt|tnd|دينار)\b', (), 'match', True),                    # 50 dt
+]
+
+# Motif combiné compilé une seule fois: à chaque début de nombre, chaque règle
+# est essayée dans un lookahead et capturée dans son groupe nommé.
+PROTECTION_PATTERN = re.compile(
+    r'\b(?=\d)' + ''.join(
+        rf'(?=(?P<{name}>(?i:{pattern}))?)' if ignore_case else rf'(?=(?P<{name}>{pattern})?)'
+        for name, pattern, _, _, ignore_case in PROTECTION_RULES
+    )
+)
+
+_MONTH_RANK_AR = {month: idx for idx, month in enumerate(MONTHS_ARABIC)}
+_MONTH_RANK_FR = {month: idx for idx, month in enumerate(MONTHS_FRENCH)}
+
+
+def _month_rank(group_name, value):
+    """Position du mois dans sa liste (ordre historique de protection)."""
+    if group_name.startswith('fr_'):
+        rank = _MONTH_RANK_FR.get(value.lower())
+        if rank is None:
+            rank = next(idx for idx, month in enumerate(MONTHS_FRENCH)
+                        if re.fullmatch(month, value, re.IGNORECASE))
+        return rank
+    return _MONTH_RANK_AR[value]
+
+
+def _overlaps_protected(spans, start, end):
+    """Vérifie si [start, end) chevauche une zone déjà protégée."""
+    idx = bisect.bisect_left(spans, (start,))
+    if idx > 0 and spans[idx - 1][1] > start:
+        return True
+    return idx < len(spans) and spans[idx][0] < end
+
+
+def _protection_window(text, spans, start, end, width=10):
+    """
+    Reconstitue texte_protégé[start-10:end+10] sans reconstruire le texte:
+    les zones déjà protégées sont lues depuis leur placeholder.
+    """
+    idx = bisect.bisect_left(spans, (start,))
+    
+    # Contexte gauche
+    left = []
+    need, pos, i = width, start, idx - 1
+    while need > 0:
+        segment_start = spans[i][1] if i >= 0 else 0
+        chunk = text[max(segment_start, pos - need):pos]
+        left.append(chunk)
+        need -= len(chunk)
+        if need <= 0 or i < 0:
+            break
+        chunk = spans[i][2][-need:]
+        left.append(chunk)
+        need -= len(chunk)
+        pos, i = spans[i][0], i - 1
+    
+    # Contexte droit
+    right = []
+    need, pos, i = width, end, idx
+    while need > 0:
+        segment_end = spans[i][0] if i < len(spans) else len(text)
+        chunk = text[pos:min(segment_end, pos + need)]
+        right.append(chunk)
+        need -= len(chunk)
+        if need <= 0 or i >= len(spans):
+            break
+        chunk = spans[i][2][:need]
+        right.append(chunk)
+        need -= len(chunk)
+        pos, i = spans[i][1], i + 1
+    
+    return ''.join(reversed(left)) + text[start:end] + ''.join(right)
+
+
+def extract_protected_patterns(text, context=None):
     """
     Extrait et protège les patterns spéciaux (temps, dates, nombres).
+    
+    Un seul balayage de PROTECTION_PATTERN collecte tous les candidats, puis
+    ils sont acceptés dans l'ordre historique des règles (règle, mois, position
+    décroissante) pour produire exactement les mêmes placeholders qu'avant.
+    
+    Args:
+        text: Texte à protéger
+        context: ProtectionContext à remplir (par défaut: contexte du thread)
     """
-    global _protected_values, _protection_counter
-    _protected_values = {}
-    _protection_counter = 0
-    
-    result_text = text
-    
-   # 1. Protéger les PLAGES de dates avec mois en arabe (ex: 2 و3 ماي 2025, 30 أكتوبر لـ1 نوفمبر)
-    for month in MONTHS_ARABIC:
-        # Pattern:  nombre + و/- + nombre + mois + année optionnelle
-        # Ex: 2 و3 ماي 2025 ou 2-3 ماي 2025
-        pattern = rf'\b(\d{{1,2}})\s*[وو\-]\s*(\d{{1,2}})\s+{month}(\s+\d{{4}})?\b'
-        matches = list(re.finditer(pattern, result_text))
-        for match in reversed(matches):
-            original_value = match.group()
-            placeholder = f"PROT{_protection_counter}PROT"
-            _protected_values[placeholder] = original_value
-            _protected_values[placeholder.lower()] = original_value
-            result_text = result_text[: match.start()] + placeholder + result_text[match.end():]
-            _protection_counter += 1
-    
-    # 2. Protéger les dates simples avec mois en arabe (ex: 30 أكتوبر, 1 نوفمبر)
-    for month in MONTHS_ARABIC:
-        # Pattern: nombre + espace + mois + année optionnelle
-        pattern = rf'\b(\d{{1,2}})\s+{month}(\s+\d{{4}})?\b'
-        matches = list(re.finditer(pattern, result_text))
-        for match in reversed(matches):
-            # Vérifier que ce n'est pas déjà protégé
-            if 'PROT' in result_text[max(0, match.start()-10):match.end()+10]:
-                continue
-            original_value = match.group()
-            placeholder = f"PROT{_protection_counter}PROT"
-            _protected_values[placeholder] = original_value
-            _protected_values[placeholder.lower()] = original_value
-            result_text = result_text[:match.start()] + placeholder + result_text[match.end():]
-            _protection_counter += 1
-    
-      # 3. Protéger les plages de dates avec mois en français
-    for month in MONTHS_FRENCH:
-        pattern = rf'\b(\d{{1,2}})\s*[et\-وو]\s*(\d{{1,2}})\s+{month}(\s+\d{{4}})?\b'
-        matches = list(re.finditer(pattern, result_text, re.IGNORECASE))
-        for match in reversed(matches):
-            original_value = match.group()
-            placeholder = f"PROT{_protection_counter}PROT"
-            _protected_values[placeholder] = original_value
-            _protected_values[placeholder.lower()] = original_value
-            result_text = result_text[: match.start()] + placeholder + result_text[match.end():]
-            _protection_counter += 1
-    
-    # 4. Protéger les dates simples avec mois en français
-    for month in MONTHS_FRENCH:
-        pattern = rf'\b(\d{{1,2}})\s+{month}(\s+\d{{4}})?\b'
-        matches = list(re.finditer(pattern, result_text, re.IGNORECASE))
-        for match in reversed(matches):
-            if 'PROT' in result_text[max(0, match.start()-10):match.end()+10]:
+    context = _get_protection_context(context, reset=True)
+    protected_values = context.values
+    
+    # 1. Balayage unique: candidats groupés par (règle, mois)
+    candidates = {}
+    for match in PROTECTION_PATTERN.finditer(text):
+        for rule_idx, (name, _, month_groups, _, _) in enumerate(PROTECTION_RULES):
+            start, end = match.span(name)
+            if start < 0:
                 continue
-            original_value = match.group()
-            placeholder = f"PROT{_protection_counter}PROT"
-            _protected_values[placeholder] = original_value
-            _protected_values[placeholder.lower()] = original_value
-            result_text = result_text[:match.start()] + placeholder + result_text[match.end():]
-            _protection_counter += 1
-    
-    # 5. Protéger les plages de dates entre deux mois (ex: 30 أكتوبر لـ1 نوفمبر)
-    for month1 in MONTHS_ARABIC: 
-        for month2 in MONTHS_ARABIC:
-            pattern = rf'\b(\d{{1,2}})\s+{month1}\s+[لِـل]+\s*(\d{{1,2}})\s+{month2}\b'
-            matches = list(re. finditer(pattern, result_text))
-            for match in reversed(matches):
-                if 'PROT' in result_text[max(0, match.start()-10):match.end()+10]:
-                    continue
-                original_value = match. group()
-                placeholder = f"PROT{_protection_counter}PROT"
-                _protected_values[placeholder] = original_value
-                _protected_values[placeholder.lower()] = original_value
-                result_text = result_text[:match.start()] + placeholder + result_text[match.end():]
-                _protection_counter += 1
-    
-    # 3. Patterns numériques classiques
-    patterns = [
-        (r'\b\d{1,2}:\d{2}\b', 'time'),              # 18:30, 9:00
-        (r'\b\d{1,2}h\d{2}\b', 'time'),              # 14h30
-        (r'\b\d{1,2}[/\-\. ]\d{1,2}[/\-\. ]\d{2,4}\b', 'date'),  # 25/12/2024
-        (r'\b\d{1,2}[/\-\.]\d{1,2}\b', 'date'),      # 25/12
-        (r'\b(19|20)\d{2}\b', 'year'),               # 1990, 2024
-        (r'\b\d+%', 'percentage'),                   # 50%, 100%
-        (r'\b\d+(\.\d+)?\s*(dt|tnd|دينار)\b', 'price'),  # 50dt
-        (r'\b\d+\s*(dt|tnd|دينار)\b', 'price'),     # 50 dt
-    ]
+            ranks = tuple(_month_rank(group, match.group(group)) for group in month_groups)
+            candidates.setdefault((rule_idx,) + ranks, []).append((start, end))
+    
+    if not candidates:
+        return text
     
-    for pattern, pattern_type in patterns:
-        matches = list(re.finditer(pattern, result_text, re. IGNORECASE))
-        for match in reversed(matches):
-            # Vérifier que ce n'est pas déjà un placeholder
-            if 'PROT' in match.group():
+    # 2. Résolution dans l'ordre historique
+    spans = []  # (start, end, placeholder) triés par position
+    for key in sorted(candidates):
+        check = PROTECTION_RULES[key[0]][3]
+        
+        # Équivalent de re.finditer sur le texte déjà protégé
+        found = []
+        last_end = -1
+        for start, end in candidates[key]:
+            if start < last_end or _overlaps_protected(spans, start, end):
                 continue
-            original_value = match.group()
-            placeholder = f"PROT{_protection_counter}PROT"
-            _protected_values[placeholder] = original_value
-            _protected_values[placeholder.lower()] = original_value
-            result_text = result_text[:match.start()] + placeholder + result_text[match.end():]
-            _protection_counter += 1
+            found.append((start, end))
+            last_end = end
+        
+        for start, end in reversed(found):
+            original_value = text[start:end]
+            if check == 'window' and 'PROT' in _protection_window(text, spans, start, end):
+                continue
+            if check == 'match' and 'PROT' in original_value:
+                continue
+            placeholder = f"PROT{context.counter}PROT"
+            protected_values[placeholder] = original_value
+            protected_values[placeholder.lower()] = original_value
+            bisect.insort(spans, (start, end, placeholder))
+            context.counter += 1
     
-    return result_text
+    # 3. Reconstruire le texte en une seule fois
+    result = []
+    pos = 0
+    for start, end, placeholder in spans:
+        result.append(text[pos:start])
+        result.append(placeholder)
+        pos = end
+    result.append(text[pos:])
+    
+    return ''.join(result)
 
 
-def restore_protected_patterns(text):
+def restore_protected_patterns(text, context=None):
     """
     Restaure les patterns protégés après la conversion.
+    
+    Args:
+        text: Texte contenant des placeholders
+        context: ProtectionContext rempli par extract_protected_patterns
     """
-    global _protected_values
+    context = _get_protection_context(context)
     
     result = text
     
     # Restaurer tous les placeholders (en minuscule car le texte est converti en minuscule)
-    for placeholder, original in _protected_values.items():
+    for placeholder, original in context.values.items():
         result = result.replace(placeholder, original)
         result = result.replace(placeholder.lower(), original)
     
@@ -1372,6 +1559,112 @@ PREFIX_TO_DARIJA = {
 }
 
 
+# ============================================
+# LEXIQUES COMPILÉS (recherche par token)
+# ============================================
+# Construits une fois à l'import par compile_token_lexicons(): le coût par
+# token ne dépend plus de la taille des lexiques (un parcours de trie pour
+# les préfixes, une consultation de dict pour la forme Darija finale).
+
+NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+ARABIC_CHAR_PATTERN = re.compile(r'[\u0600-\u06FF]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def build_prefix_trie(prefixes):
+    """
+    Trie caractère par caractère des préfixes. Chaque fin de préfixe porte
+    (rang dans la liste, préfixe): le rang garde la priorité de la liste.
+    """
+    trie = {}
+    for rank, prefix in enumerate(prefixes):
+        node = trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node.setdefault(None, (rank, prefix))
+    return trie
+
+
+def resolve_darija_token(clean_word):
+    """
+    Forme Darija d'un mot nettoyé, selon l'ordre des étapes de
+    normalize_to_darija (KEEP_AS_IS, DARIJA_NORMALIZATION sur le mot
+    converti, puis FRENCH_TO_DARIJA, ARABIC_WORDS_TO_DARIJA_LATIN).
+    """
+    converted_word = convert_darija_numbers_smart(clean_word)
+    if converted_word in KEEP_AS_IS:
+        return converted_word
+    if converted_word in DARIJA_NORMALIZATION:
+        return DARIJA_NORMALIZATION[converted_word]
+    if clean_word in FRENCH_TO_DARIJA:
+        return FRENCH_TO_DARIJA[clean_word]
+    if clean_word in ARABIC_WORDS_TO_DARIJA_LATIN:
+        return ARABIC_WORDS_TO_DARIJA_LATIN[clean_word]
+    return converted_word
+
+
+def compile_token_lexicons():
+    """
+    Compile les lexiques de normalisation (à rappeler après les avoir modifiés).
+    
+    Returns:
+        dict:
+            - version:     empreinte des lexiques (clé du cache des tokens)
+            - prefix_trie: trie des ARABIC_PREFIXES
+            - tokens:      mot -> forme Darija finale (priorités déjà résolues)
+                           pour chaque mot des lexiques
+            - converted:   mot converti -> forme, pour les autres mots
+                           (KEEP_AS_IS puis DARIJA_NORMALIZATION)
+            - arabic_table: table str.translate lettre arabe -> latin
+    """
+    global TOKEN_LEXICONS
+    
+    words = set(KEEP_AS_IS) | set(DARIJA_NORMALIZATION) | set(FRENCH_TO_DARIJA) | set(ARABIC_WORDS_TO_DARIJA_LATIN)
+    converted = dict(DARIJA_NORMALIZATION)
+    converted.update((word, word) for word in KEEP_AS_IS)
+    
+    # Version: change dès qu'une entrée d'un lexique change (clé du cache des tokens)
+    payload = json.dumps(
+        [ARABIC_PREFIXES, PREFIX_TO_DARIJA, ARABIC_TO_LATIN, ARABIC_WORDS_TO_DARIJA_LATIN,
+         FRENCH_TO_DARIJA, DARIJA_NORMALIZATION, sorted(KEEP_AS_IS), DARIJA_DIGITS_TO_LETTERS],
+        ensure_ascii=False, sort_keys=True,
+    )
+    
+    TOKEN_LEXICONS = {
+        'version': hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12],
+        'prefix_trie': build_prefix_trie(ARABIC_PREFIXES),
+        'tokens': {word: resolve_darija_token(word) for word in words},
+        'converted': converted,
+        'arabic_table': str.maketrans(ARABIC_TO_LATIN),
+    }
+    return TOKEN_LEXICONS
+
+
+TOKEN_LEXICONS = None
+compile_token_lexicons()
+
+
+def match_arabic_prefix(word):
+    """
+    Premier préfixe de ARABIC_PREFIXES (ordre de la liste) qui commence le
+    mot et laisse au moins une lettre, en un parcours du trie.
+    
+    Returns:
+        str ou None
+    """
+    node = TOKEN_LEXICONS['prefix_trie']
+    best = None
+    # Le préfixe doit être strictement plus court que le mot
+    for char in word[:-1]:
+        node = node.get(char)
+        if node is None:
+            break
+        terminal = node.get(None)
+        if terminal is not None and (best is None or terminal[0] < best[0]):
+            best = terminal
+    return best[1] if best else None
+
+
 def separate_arabic_prefix(word):
     """
     Sépare le préfixe arabe du mot de base.
@@ -1387,23 +1680,83 @@ def separate_arabic_prefix(word):
         وحلو -> ('w_', 'حلو')
         الجو -> ('', 'جو')
     """
-    for prefix in ARABIC_PREFIXES:
-        if word.startswith(prefix) and len(word) > len(prefix):
-            base_word = word[len(prefix):]
-            darija_prefix = PREFIX_TO_DARIJA.get(prefix, '')
-            
-            # Cas spécial: si le préfixe est 'ال' et le mot de base commence par une lettre solaire
-            # on garde le mot tel quel pour le chercher dans le dictionnaire
-            if prefix == 'ال': 
-                # Vérifier si le mot avec 'ال' est dans le dictionnaire
-                if word in ARABIC_WORDS_TO_DARIJA_LATIN: 
-                    return (None, word)
-                # Sinon retourner le mot sans 'ال'
-                return ('', base_word)
-            
-            return (darija_prefix, base_word)
-    
-    return (None, word)
+    prefix = match_arabic_prefix(word)
+    if prefix is None:
+        return (None, word)
+    
+    base_word = word[len(prefix):]
+    
+    # Cas spécial: si le préfixe est 'ال' et le mot de base commence par une lettre solaire
+    # on garde le mot tel quel pour le chercher dans le dictionnaire
+    if prefix == 'ال':
+        # Vérifier si le mot avec 'ال' est dans le dictionnaire
+        if word in ARABIC_WORDS_TO_DARIJA_LATIN:
+            return (None, word)
+        # Sinon retourner le mot sans 'ال'
+        return ('', base_word)
+    
+    return (PREFIX_TO_DARIJA.get(prefix, ''), base_word)
+
+
+def join_prefixed_word(prefix_darija, transliterated):
+    """Préfixe Darija + mot: underscores en espaces, espaces normalisés."""
+    return WHITESPACE_PATTERN.sub(' ', (prefix_darija + transliterated).replace('_', ' ').strip())
+
+
+def transliterate_arabic_token(word):
+    """
+    Translittère un mot (ponctuation collée comprise) vers le latin.
+    
+    Returns:
+        str: Mot translittéré, ou None si le mot disparaît (vide)
+    """
+    arabic_words = ARABIC_WORDS_TO_DARIJA_LATIN
+    
+    # Extraire la ponctuation
+    punctuation_before = ''
+    punctuation_after = ''
+    clean_word = word
+    
+    # Extraire ponctuation avant
+    while clean_word and not (clean_word[0]. isalnum() or '\u0600' <= clean_word[0] <= '\u06FF'):
+        punctuation_before += clean_word[0]
+        clean_word = clean_word[1:]
+    
+    # Extraire ponctuation après
+    while clean_word and not (clean_word[-1].isalnum() or '\u0600' <= clean_word[-1] <= '\u06FF'):
+        punctuation_after = clean_word[-1] + punctuation_after
+        clean_word = clean_word[:-1]
+    
+    if not clean_word:
+        if punctuation_before or punctuation_after:
+            return punctuation_before + punctuation_after
+        return None
+    
+    # Mot non-arabe, garder tel quel
+    if not ARABIC_CHAR_PATTERN.search(clean_word):
+        return word
+    
+    # 1. Chercher d'abord le mot complet dans le dictionnaire
+    if clean_word in arabic_words:
+        return punctuation_before + arabic_words[clean_word] + punctuation_after
+    
+    # 2.  Essayer de séparer le préfixe (trie)
+    prefix_darija, base_word = separate_arabic_prefix(clean_word)
+    
+    if prefix_darija is not None:
+        # Chercher le mot de base dans le dictionnaire
+        if base_word in arabic_words:
+            transliterated = join_prefixed_word(prefix_darija, arabic_words[base_word])
+            return punctuation_before + transliterated + punctuation_after
+        
+        # Essayer sans le 'ال' si présent
+        if base_word.startswith('ال') and base_word[2:] in arabic_words:
+            transliterated = join_prefixed_word(prefix_darija, arabic_words[base_word[2:]])
+            return punctuation_before + transliterated + punctuation_after
+    
+    # 3. Translittération lettre par lettre en dernier recours (une table)
+    transliterated = clean_word.translate(TOKEN_LEXICONS['arabic_table'])
+    return punctuation_before + transliterated + punctuation_after
 
 
 def transliterate_arabic_to_latin(text):
@@ -1411,82 +1764,27 @@ def transliterate_arabic_to_latin(text):
     Convertit le texte arabe en caractères latins (Darija).
     Gère les préfixes arabes attachés aux mots.
     """
-    words = text.split()
+    transliterate = _token_functions['arabic']
+    version = TOKEN_LEXICONS['version']
     result_words = []
     
-    for word in words:
-        # Extraire la ponctuation
-        punctuation_before = ''
-        punctuation_after = ''
-        clean_word = word
-        
-        # Extraire ponctuation avant
-        while clean_word and not (clean_word[0]. isalnum() or '\u0600' <= clean_word[0] <= '\u06FF'):
-            punctuation_before += clean_word[0]
-            clean_word = clean_word[1:]
-        
-        # Extraire ponctuation après
-        while clean_word and not (clean_word[-1].isalnum() or '\u0600' <= clean_word[-1] <= '\u06FF'):
-            punctuation_after = clean_word[-1] + punctuation_after
-            clean_word = clean_word[:-1]
-        
-        if not clean_word:
-            if punctuation_before or punctuation_after:
-                result_words.append(punctuation_before + punctuation_after)
-            continue
-        
-        # Vérifier si c'est un mot arabe
-        if re.search(r'[\u0600-\u06FF]', clean_word):
-            
-            # 1. Chercher d'abord le mot complet dans le dictionnaire
-            if clean_word in ARABIC_WORDS_TO_DARIJA_LATIN:
-                transliterated = ARABIC_WORDS_TO_DARIJA_LATIN[clean_word]
-                result_words.append(punctuation_before + transliterated + punctuation_after)
-                continue
-            
-            # 2.  Essayer de séparer le préfixe
-            prefix_darija, base_word = separate_arabic_prefix(clean_word)
-            
-            if prefix_darija is not None:
-                # Chercher le mot de base dans le dictionnaire
-                if base_word in ARABIC_WORDS_TO_DARIJA_LATIN:
-                    transliterated = prefix_darija + ARABIC_WORDS_TO_DARIJA_LATIN[base_word]
-                    # Nettoyer les underscores en trop
-                    transliterated = transliterated.replace('_', ' ').strip()
-                    transliterated = re.sub(r'\s+', ' ', transliterated)
-                    result_words. append(punctuation_before + transliterated + punctuation_after)
-                    continue
-                
-                # Essayer sans le 'ال' si présent
-                if base_word. startswith('ال') or base_word.startswith('ال'):
-                    base_without_al = base_word[2: ] if base_word.startswith('ال') else base_word[2:]
-                    if base_without_al in ARABIC_WORDS_TO_DARIJA_LATIN:
-                        transliterated = prefix_darija + ARABIC_WORDS_TO_DARIJA_LATIN[base_without_al]
-                        transliterated = transliterated.replace('_', ' ').strip()
-                        transliterated = re.sub(r'\s+', ' ', transliterated)
-                        result_words.append(punctuation_before + transliterated + punctuation_after)
-                        continue
-            
-            # 3. Translittération lettre par lettre en dernier recours
-            transliterated = ''
-            for char in clean_word:
-                if char in ARABIC_TO_LATIN:
-                    transliterated += ARABIC_TO_LATIN[char]
-                else:
-                    transliterated += char
-            
-            result_words.append(punctuation_before + transliterated + punctuation_after)
-        
-        else:
-            # Mot non-arabe, garder tel quel
-            result_words.append(word)
+    for word in text.split():
+        transliterated = transliterate(word, version)
+        if transliterated is not None:
+            result_words.append(transliterated)
     
     return ' '. join(result_words)
 
-def is_arabic_text(text):
+def is_arabic_text(text, analysis=None):
     """
     Vérifie si le texte contient principalement des caractères arabes. 
+    
+    analysis: TextAnalysis du texte source; sans caractère arabe dans la
+    source, les transformations du pipeline n'en ajoutent pas.
     """
+    if analysis is not None and analysis.arabic_count == 0:
+        return False
+    
     arabic_chars = len(re.findall(r'[\u0600-\u06FF]', text))
     total_chars = len(re.findall(r'\w', text))
     
@@ -1495,124 +1793,196 @@ def is_arabic_text(text):
     
     return arabic_chars / total_chars > 0.3  # Plus de 30% de caractères arabes
 
+def normalize_darija_token(word):
+    """
+    Forme Darija d'un mot en minuscules (ponctuation collée comprise).
+    
+    Chaque mot est résolu en une consultation de TOKEN_LEXICONS['tokens']
+    (mots des lexiques); les autres mots sont convertis (chiffres Darija)
+    puis cherchés dans TOKEN_LEXICONS['converted'].
+    
+    Returns:
+        str: Mot normalisé, ou None si le mot disparaît (ponctuation seule)
+    """
+    clean_word = word if word.isalnum() else NON_WORD_PATTERN.sub('', word)
+    punctuation = word[len(clean_word):] if len(word) > len(clean_word) else ''
+    
+    if not clean_word:
+        return None
+    
+    form = TOKEN_LEXICONS['tokens'].get(clean_word)
+    if form is None:
+        # Mot hors lexiques: seules les étapes sur le mot converti
+        # (KEEP_AS_IS, DARIJA_NORMALIZATION) peuvent s'appliquer
+        converted_word = clean_word.translate(DARIJA_DIGITS_TABLE)
+        form = TOKEN_LEXICONS['converted'].get(converted_word, converted_word)
+    
+    return form + punctuation
+
+
 def normalize_to_darija(text):
     """
     Normalise le texte vers le Darija tunisien.
     """
-    text_lower = text.lower()
-    words = text_lower.split()
+    normalize = _token_functions['darija']
+    version = TOKEN_LEXICONS['version']
     normalized_words = []
     
-    for word in words:
-        clean_word = re.sub(r'[^\w\s]', '', word)
-        punctuation = word[len(clean_word):] if len(word) > len(clean_word) else ''
-        
-        if not clean_word:
-            continue
-        
-        # ÉTAPE 1: Convertir les chiffres Darija vers lettres
-        converted_word = convert_darija_numbers_smart(clean_word)
-        
-        if converted_word in KEEP_AS_IS:
-            normalized_words.append(converted_word + punctuation)
-            continue
-        
-        # ÉTAPE 2: Vérifier Darija normalization
-        if converted_word in DARIJA_NORMALIZATION:
-            normalized_words.append(DARIJA_NORMALIZATION[converted_word] + punctuation)
-            continue
-        
-        # ÉTAPE 3: Vérifier Français -> Darija
-        if clean_word in FRENCH_TO_DARIJA:
-            normalized_words.append(FRENCH_TO_DARIJA[clean_word] + punctuation)
-            continue
-            
-        # ÉTAPE 4: Vérifier Arabe -> Darija (MODIFIÉ)
-        if clean_word in ARABIC_WORDS_TO_DARIJA_LATIN:
-            normalized_words.append(ARABIC_WORDS_TO_DARIJA_LATIN[clean_word] + punctuation)
-            continue
-        
-        # ÉTAPE 5: Garder le mot converti
-        normalized_words.append(converted_word + punctuation)
+    for word in text.lower().split():
+        normalized = normalize(word, version)
+        if normalized is not None:
+            normalized_words.append(normalized)
     
     return ' '.join(normalized_words)
 
-def normalize_arabic_chars(text):
-    """Normalise les caractères arabes."""
-    # Supprimer diacritiques arabes
-    arabic_diacritics = re.compile(r'[\u064B-\u065F\u0670]')
-    text = re.sub(arabic_diacritics, '', text)
-    
-    # Normaliser caractères arabes
-    replacements = {
-        'أ': 'ا', 'إ': 'ا', 'آ': 'ا',
-        'ى': 'ي', 'ة': 'ه',
-        'ؤ': 'ء', 'ئ': 'ء'
-    }
-    for ar, repl in replacements.items():
-        text = text.replace(ar, repl)
+
+# ============================================
+# CACHE DES TOKENS
+# ============================================
+# Les mots suivent une loi de Zipf: quelques milliers de tokens
+# (المنستير, barcha, 9ahwa...) reviennent dans presque tous les posts.
+# Leur normalisation est mémorisée (LRU bornée, partagée entre posts et
+# threads). La clé contient la version des lexiques: recompiler les
+# lexiques rend les anciennes entrées inaccessibles.
+#
+#   SOCIALPULSE_TOKEN_CACHE_SIZE=0   désactive le cache (débogage)
+
+TOKEN_CACHE_SIZE = int(os.environ.get('SOCIALPULSE_TOKEN_CACHE_SIZE', 50000))
+
+# Fonctions appelées par token: (mot, version des lexiques) -> résultat
+_token_functions = {}
+
+
+def configure_token_cache(max_size=TOKEN_CACHE_SIZE):
+    """
+    (Re)crée le cache des tokens (vide).
     
-    return text
+    Args:
+        max_size: Entrées max par étape (translittération, Darija);
+                  0 = cache désactivé, chaque token est recalculé
+    """
+    for name, func in (('arabic', transliterate_arabic_token), ('darija', normalize_darija_token)):
+        if max_size > 0:
+            _token_functions[name] = functools.lru_cache(maxsize=max_size)(
+                lambda word, version, func=func: func(word)
+            )
+        else:
+            _token_functions[name] = lambda word, version, func=func: func(word)
+
+
+def get_token_cache_stats():
+    """Compteurs du cache des tokens (hits, misses, taux de hit, taille)."""
+    stats = {'hits': 0, 'misses': 0, 'size': 0, 'max_size': 0}
+    for func in _token_functions.values():
+        if hasattr(func, 'cache_info'):
+            info = func.cache_info()
+            stats['hits'] += info.hits
+            stats['misses'] += info.misses
+            stats['size'] += info.currsize
+            stats['max_size'] += info.maxsize
+    
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+    stats['enabled'] = stats['max_size'] > 0
+    return stats
+
+
+configure_token_cache()
+
+# ============================================
+# TABLES DE REMPLACEMENT (caractères)
+# ============================================
+# Compilées une fois à l'import: chaque nettoyage se fait ensuite en un
+# seul passage (classe de caractères regex + dict) au lieu d'un replace
+# par caractère. Le texte n'est recopié que s'il contient un caractère
+# à remplacer.
+
+# Liste exhaustive de toutes les apostrophes possibles
+APOSTROPHE_VARIANTS = [
+    '\u0027',  # ' APOSTROPHE
+    '\u2019',  # ' RIGHT SINGLE QUOTATION MARK
+    '\u2018',  # ' LEFT SINGLE QUOTATION MARK
+    '\u02BC',  # ʼ MODIFIER LETTER APOSTROPHE
+    '\u02B9',  # ʹ MODIFIER LETTER PRIME
+    '\u0060',  # ` GRAVE ACCENT
+    '\u00B4',  # ´ ACUTE ACCENT
+    '\u2032',  # ′ PRIME
+    '\u2035',  # ‵ REVERSED PRIME
+    '\uFF07',  # ＇ FULLWIDTH APOSTROPHE
+    '\u02BB',  # ʻ MODIFIER LETTER TURNED COMMA
+    '\u02CA',  # ˊ MODIFIER LETTER ACUTE ACCENT
+    '\u02CB',  # ˋ MODIFIER LETTER GRAVE ACCENT
+]
+
+SPECIAL_CHARACTERS_MAP = {
+    # Apostrophes -> apostrophe standard
+    **{apos: "'" for apos in APOSTROPHE_VARIANTS},
+    
+    # Guillemets
+    '«': '',
+    '»': '',
+    '"': '',
+    '„': '',
+    
+    # Tirets
+    '—': '-',
+    '–': '-',
+    '−': '-',
+    
+    # Espaces spéciaux
+    '\u00a0': ' ',  # Non-breaking space
+    '\u200b': '',   # Zero-width space
+    '\u200c': '',   # Zero-width non-joiner
+    '\u200d': '',   # Zero-width joiner
+    '\ufeff': '',   # BOM
+    
+    # Autres
+    '…': '...',
+}
+
+ARABIC_CHARS_MAP = {
+    # Diacritiques arabes (tanwin, harakat, shadda, sukun..., alif suscrit): supprimés
+    **{chr(code): '' for code in range(0x064B, 0x0660)},
+    '\u0670': '',
+    
+    # Formes de alif, ya, ta marbuta, hamza
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا',
+    'ى': 'ي', 'ة': 'ه',
+    'ؤ': 'ء', 'ئ': 'ء',
+}
+
+def compile_char_replacer(mapping):
+    """
+    Compile un dict caractère -> remplacement en une fonction text -> text
+    qui applique tous les remplacements en un passage.
+    """
+    mapping = {char: repl for char, repl in mapping.items() if char != repl}
+    pattern = re.compile('[' + ''.join(re.escape(char) for char in mapping) + ']')
+    lookup = mapping.__getitem__
+    
+    def replace(text):
+        return pattern.sub(lambda m: lookup(m.group()), text)
+    
+    return replace
+
+
+_replace_special_characters = compile_char_replacer(SPECIAL_CHARACTERS_MAP)
+_replace_arabic_chars = compile_char_replacer(ARABIC_CHARS_MAP)
+
+
+def normalize_arabic_chars(text):
+    """Normalise les caractères arabes (diacritiques supprimés, alif/ya/hamza unifiés)."""
+    return _replace_arabic_chars(text)
 
 def clean_special_characters(text):
     """
     Nettoie les caractères spéciaux (guillemets, apostrophes, tirets, etc.)
-    Couvre TOUTES les variantes possibles d'apostrophes. 
+    Couvre TOUTES les variantes possibles d'apostrophes (APOSTROPHE_VARIANTS).
     """
     if not text:
         return text
     
-    # Liste exhaustive de toutes les apostrophes possibles
-    apostrophes = [
-        '\u0027',  # ' APOSTROPHE
-        '\u2019',  # ' RIGHT SINGLE QUOTATION MARK
-        '\u2018',  # ' LEFT SINGLE QUOTATION MARK
-        '\u02BC',  # ʼ MODIFIER LETTER APOSTROPHE
-        '\u02B9',  # ʹ MODIFIER LETTER PRIME
-        '\u0060',  # ` GRAVE ACCENT
-        '\u00B4',  # ´ ACUTE ACCENT
-        '\u2032',  # ′ PRIME
-        '\u2035',  # ‵ REVERSED PRIME
-        '\uFF07',  # ＇ FULLWIDTH APOSTROPHE
-        '\u02BB',  # ʻ MODIFIER LETTER TURNED COMMA
-        '\u02CA',  # ˊ MODIFIER LETTER ACUTE ACCENT
-        '\u02CB',  # ˋ MODIFIER LETTER GRAVE ACCENT
-    ]
-    
-    # Remplacer toutes les apostrophes par l'apostrophe standard
-    for apos in apostrophes:
-        text = text.replace(apos, "'")
-    
-    # Autres remplacements
-    replacements = {
-        # Guillemets
-        '«':  '',
-        '»': '',
-        '"': '',
-        '"':  '',
-        '„': '',
-        '"': '',
-        
-        # Tirets
-        '—': '-',
-        '–': '-',
-        '−': '-',
-        
-        # Espaces spéciaux
-        '\u00a0': ' ',  # Non-breaking space
-        '\u200b': '',   # Zero-width space
-        '\u200c': '',   # Zero-width non-joiner
-        '\u200d': '',   # Zero-width joiner
-        '\ufeff': '',   # BOM
-        
-        # Autres
-        '…': '...',
-    }
-    
-    for old, new in replacements.items():
-        text = text.replace(old, new)
-    
-    return text
+    return _replace_special_characters(text)
 
 
 def clean_punctuation(text):
@@ -1636,100 +2006,131 @@ def clean_punctuation(text):
 # ============================================
 # GESTION DES CONTRACTIONS FRANÇAISES
 # ============================================
+# Expressions complètes avec contractions → traduction directe
+FRENCH_FULL_EXPRESSIONS = {
+    # Électricité / Services
+    "d'électricité": "dhaw",
+    "d'electricité": "dhaw",
+    "d'electricite": "dhaw",
+    "d'internet": "internet",
+    "d'eau": "ma",
+    
+    # Lieux avec article
+    "l'eau": "el ma",
+    "l'école": "el madrsa",
+    "l'hôpital": "el sbitar",
+    "l'aéroport": "el matar",
+    "l'hôtel": "el hotel",
+    "l'université": "el fac",
+    "l'église": "el knisa",
+    "l'entrée": "el dkhoul",
+    "l'événement": "el event",
+    
+    # Expressions courantes
+    "aujourd'hui": "lyoum",
+    "d'accord": "mwefek",
+    "quelqu'un": "wahed",
+    "quelqu'une": "wahda",
+    "c'est-à-dire": "yaani",
+    "n'est-ce pas": "mouch keka",
+    "s'il vous plaît": "aychek",
+    "s'il te plaît": "aychek",
+    
+    # C'est / C'était
+    "c'est": "howa",
+    "c'était": "ken",
+}
+
+# Contractions restantes → séparer en deux mots
+FRENCH_SIMPLE_CONTRACTIONS = {
+    "d'": "de ",
+    "l'": "el ",
+    "j'": "ena ",
+    "m'": "m ",
+    "t'": "t ",
+    "s'": "s ",
+    "n'": "n ",
+    "qu'": "qu ",
+}
+
+FRENCH_CONTRACTIONS = {**FRENCH_SIMPLE_CONTRACTIONS, **FRENCH_FULL_EXPRESSIONS}
+
+# Une seule alternance, la plus longue d'abord: à une position donnée,
+# "quelqu'une" l'emporte sur "quelqu'un", et toute expression complète
+# sur la contraction simple qui la commence ("c'est" avant "c'")
+FRENCH_CONTRACTION_PATTERN = re.compile(
+    '|'.join(re.escape(contraction) for contraction in sorted(FRENCH_CONTRACTIONS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+
+
+def _expand_contraction(match):
+    """Remplacement d'une contraction trouvée (insensible à la casse)."""
+    found = match.group()
+    expansion = FRENCH_CONTRACTIONS.get(found.lower())
+    if expansion is None:
+        # Variantes de casse que lower() ne ramène pas à la clé (ex: 'ſ')
+        for contraction, expansion in FRENCH_CONTRACTIONS.items():
+            if re.fullmatch(re.escape(contraction), found, re.IGNORECASE):
+                break
+    return expansion
+
+
 def expand_french_contractions(text):
     """
     Traite les contractions françaises (mots avec apostrophe).
     
-    Étape 1: Remplace les expressions complètes (d'électricité → dhaw)
-    Étape 2: Sépare les contractions restantes (l'eau → l eau)
+    Expressions complètes (d'électricité → dhaw) et contractions restantes
+    (l'eau → l eau) sont remplacées en un seul passage
+    (FRENCH_CONTRACTION_PATTERN).
     """
-    result = text
-    
-    # 1. Expressions complètes avec contractions → traduction directe
-    full_expressions = {
-        # Électricité / Services
-        "d'électricité": "dhaw",
-        "d'electricité": "dhaw",
-        "d'electricite": "dhaw",
-        "d'internet": "internet",
-        "d'eau": "ma",
-        
-        # Lieux avec article
-        "l'eau": "el ma",
-        "l'école": "el madrsa",
-        "l'hôpital": "el sbitar",
-        "l'aéroport": "el matar",
-        "l'hôtel": "el hotel",
-        "l'université": "el fac",
-        "l'église": "el knisa",
-        "l'entrée": "el dkhoul",
-        "l'événement": "el event",
-        
-        # Expressions courantes
-        "aujourd'hui": "lyoum",
-        "d'accord": "mwefek",
-        "quelqu'un": "wahed",
-        "quelqu'une": "wahda",
-        "c'est-à-dire": "yaani",
-        "n'est-ce pas": "mouch keka",
-        "s'il vous plaît": "aychek",
-        "s'il te plaît": "aychek",
-        
-        # C'est / C'était
-        "c'est": "howa",
-        "c'était": "ken",
-    }
-    
-    for expression, replacement in full_expressions. items():
-        pattern = re.compile(re.escape(expression), re.IGNORECASE)
-        result = pattern. sub(replacement, result)
-    
-    # 2. Contractions restantes → séparer en deux mots
-    simple_contractions = [
-        ("d'", "de "),
-        ("l'", "el "),
-        ("j'", "ena "),
-        ("m'", "m "),
-        ("t'", "t "),
-        ("s'", "s "),
-        ("n'", "n "),
-        ("qu'", "qu "),
-    ]
-    
-    for contraction, expansion in simple_contractions:
-        result = re. sub(re.escape(contraction), expansion, result, flags=re.IGNORECASE)
+    # Toutes les contractions contiennent une apostrophe
+    if "'" not in text:
+        return text
     
-    return result
+    return FRENCH_CONTRACTION_PATTERN.sub(_expand_contraction, text)
 
-def normalize_text(text):
-    """Pipeline de normalisation complète vers Darija Latin."""
+def normalize_text(text, analysis=None):
+    """
+    Pipeline de normalisation complète vers Darija Latin.
+    
+    Args:
+        text: Texte à normaliser
+        analysis: TextAnalysis de ce texte (process_post), sinon calculée ici
+    """
     if not text:
         return text
     
+    if analysis is None:
+        analysis = analyze_text(text)
+    
     # 1. Supprimer les emojis
-    text = remove_emojis(text)
+    text = remove_emojis(text, analysis)
     
     # 2. Nettoyer les caractères spéciaux (guillemets, apostrophes)
-    text = clean_special_characters(text)
+    if not analysis.cleaned:
+        text = clean_special_characters(text)
     
-    # 3. Protéger les nombres, heures, dates
-    text = extract_protected_patterns(text)
+    # 3. Protéger les nombres, heures, dates (état propre à cet appel)
+    protection = ProtectionContext()
+    text = extract_protected_patterns(text, protection)
     
     # 4. Traiter les contractions françaises
     text = expand_french_contractions(text)
     
     # 5. Translittérer l'arabe vers le latin
-    if is_arabic_text(text):
+    if is_arabic_text(text, analysis):
         text = transliterate_arabic_to_latin(text)
     
-    # 6. Normaliser les caractères arabes
-    text = normalize_arabic_chars(text)
+    # 6. Normaliser les caractères arabes (rien à faire sans arabe)
+    if analysis.arabic_count:
+        text = normalize_arabic_chars(text)
     
     # 7. Convertir vers Darija normalisé
     text = normalize_to_darija(text)
     
     # 8. Restaurer les patterns protégés
-    text = restore_protected_patterns(text)
+    text = restore_protected_patterns(text, protection)
     
     # 9. Convertir les dates arabes en latin (si la fonction existe)
     if 'convert_arabic_dates_to_latin' in dir():
@@ -1743,11 +2144,16 @@ def normalize_text(text):
     
     return text
 
-def detect_language(text):
+def detect_language(text, analysis=None):
     """Détecte la langue originale du texte."""
-    arabic_chars = len(re.findall(r'[\u0600-\u06FF]', text))
-    latin_chars = len(re.findall(r'[a-zA-Z]', text))
-    has_darija_numbers = any(c in text for c in ['3', '7', '9', '5', '2'])
+    if analysis is not None:
+        arabic_chars = analysis.arabic_count
+        latin_chars = analysis.latin_count
+        has_darija_numbers = analysis.has_darija_digits
+    else:
+        arabic_chars = len(re.findall(r'[\u0600-\u06FF]', text))
+        latin_chars = len(re.findall(r'[a-zA-Z]', text))
+        has_darija_numbers = any(c in text for c in ['3', '7', '9', '5', '2'])
     
     if arabic_chars > latin_chars:
         return 'ar'
@@ -1770,72 +2176,81 @@ SYNONYMS_DARIJA = {
 }
 
 
-def augment_with_synonyms(text):
+def augment_with_synonyms(text, rng=random):
     """Remplace aléatoirement des mots par leurs synonymes en Darija."""
     words = text.split()
     augmented_words = []
     
     for word in words:
-        if word in SYNONYMS_DARIJA and random.random() > 0.5:
-            augmented_words. append(random.choice(SYNONYMS_DARIJA[word]))
+        if word in SYNONYMS_DARIJA and rng.random() > 0.5:
+            augmented_words. append(rng.choice(SYNONYMS_DARIJA[word]))
         else:
             augmented_words. append(word)
     
     return ' '.join(augmented_words)
 
 
-def augment_by_deletion(text, p=0.1):
+def augment_by_deletion(text, p=0.1, rng=random):
     """Supprime aléatoirement des mots."""
     words = text.split()
     if len(words) <= 3:
         return text
-    return ' '.join([w for w in words if random.random() > p])
+    return ' '.join([w for w in words if rng.random() > p])
 
 
-def augment_by_swap(text):
+def augment_by_swap(text, rng=random):
     """Échange aléatoirement deux mots adjacents."""
     words = text. split()
     if len(words) < 2:
         return text
-    idx = random.randint(0, len(words) - 2)
+    idx = rng.randint(0, len(words) - 2)
     words[idx], words[idx + 1] = words[idx + 1], words[idx]
     return ' '.join(words)
 
 
-def generate_augmented_samples(text, num_augmentations=3):
-    """Génère plusieurs variations d'un texte."""
+def generate_augmented_samples(text, num_augmentations=3, rng=random):
+    """
+    Génère plusieurs variations d'un texte.
+    
+    rng: générateur aléatoire (module random par défaut, ou random.Random)
+    """
     augmentations = [text]
     
     for _ in range(num_augmentations):
-        aug_type = random.choice(['synonym', 'deletion', 'swap'])
+        aug_type = rng.choice(['synonym', 'deletion', 'swap'])
         if aug_type == 'synonym':
-            augmentations.append(augment_with_synonyms(text))
+            augmentations.append(augment_with_synonyms(text, rng))
         elif aug_type == 'deletion':
-            augmentations.append(augment_by_deletion(text))
+            augmentations.append(augment_by_deletion(text, rng=rng))
         else:
-            augmentations.append(augment_by_swap(text))
+            augmentations.append(augment_by_swap(text, rng))
     
-    return list(set(augmentations))
+    # Dédoublonnage dans l'ordre (l'ordre d'un set dépend de PYTHONHASHSEED):
+    # le texte original reste en position 0
+    return list(dict.fromkeys(augmentations))
 
 
 # ============================================
 # 4. PIPELINE COMPLET
 # ============================================
-def process_post(post, augment=False, num_augmentations=2):
+def process_post(post, augment=False, num_augmentations=2, rng=random):
     """Pipeline complet de traitement d'un post."""
     text = post.get('text', '')
     
     # NOUVEAU:  Nettoyer les caractères spéciaux dès le début
     text = clean_special_characters(text)
     
+    # Un seul parcours du texte, réutilisé par toutes les étapes
+    analysis = analyze_text(text, cleaned=True)
+    
     # Étape 1: Extraire les emojis ET leur sentiment
-    emoji_data = extract_emoji_sentiment(text)
+    emoji_data = extract_emoji_sentiment(text, analysis)
     
     # Étape 2: Détecter la langue originale
-    original_lang = detect_language(text)
+    original_lang = detect_language(text, analysis)
     
     # Étape 3: Normaliser vers Darija
-    clean_text = normalize_text(text)
+    clean_text = normalize_text(text, analysis)
     
     # Créer le post enrichi
     processed_post = post.copy()
@@ -1851,7 +2266,8 @@ def process_post(post, augment=False, num_augmentations=2):
     
     # Étape 4: Data Augmentation
     if augment:
-        augmented_texts = generate_augmented_samples(clean_text, num_augmentations)
+        augmented_texts = generate_augmented_samples(clean_text, num_augmentations, rng)
+        # augmented_texts[0] est le texte original (déjà dans results)
         for aug_text in augmented_texts[1:]: 
             aug_post = processed_post.copy()
             aug_post['clean_text'] = aug_text
@@ -1863,15 +2279,160 @@ def process_post(post, augment=False, num_augmentations=2):
 # ============================================
 # 5.  TRAITEMENT DU FICHIER FINAL_EVALUATION_SET
 # ============================================
-def process_evaluation_data(input_path, output_path, augment=False, num_augmentations=2):
+def new_processing_stats():
+    """Statistiques vides du preprocessing."""
+    return {
+        'total_input': 0,
+        'total_output': 0,
+        'by_original_lang': {'ar': 0, 'fr': 0, 'da': 0},
+        'by_emoji_sentiment': {'positive': 0, 'negative': 0, 'neutral': 0},
+        'posts_with_emojis': 0,
+        'total_emojis_found': 0,
+        'augmented_samples': 0,
+        'token_cache': {'hits': 0, 'misses': 0},
+    }
+
+
+def update_processing_stats(stats, result):
+    """Met à jour les statistiques avec un post traité."""
+    lang = result.get('original_lang', 'da')
+    stats['by_original_lang'][lang] = stats['by_original_lang']. get(lang, 0) + 1
+    
+    emoji_sent = result['emoji_sentiment']['dominant_sentiment']
+    stats['by_emoji_sentiment'][emoji_sent] += 1
+    
+    if result['emoji_sentiment']['emoji_count'] > 0:
+        stats['posts_with_emojis'] += 1
+        stats['total_emojis_found'] += result['emoji_sentiment']['emoji_count']
+    
+    if result. get('is_augmented'):
+        stats['augmented_samples'] += 1
+
+
+def merge_processing_stats(stats, chunk_stats):
+    """Additionne les statistiques d'un lot dans les statistiques globales."""
+    for key, value in chunk_stats.items():
+        if isinstance(value, dict):
+            target = stats.setdefault(key, {})
+            for sub_key, count in value.items():
+                target[sub_key] = target.get(sub_key, 0) + count
+        else:
+            stats[key] = stats.get(key, 0) + value
+    return stats
+
+
+def process_chunk(posts, augment=False, num_augmentations=2, seed=None):
+    """
+    Traite un lot de posts (exécutable dans un processus séparé).
+    
+    Args:
+        posts: Liste de posts
+        augment: Activer l'augmentation de données
+        num_augmentations: Nombre de variations à générer
+        seed: Graine aléatoire du lot (augmentation reproductible)
+    
+    Returns:
+        tuple: (posts traités, statistiques du lot)
+    """
+    # Chaque lot a son propre générateur: le résultat ne dépend pas du
+    # processus qui l'exécute ni de l'ordre de fin des lots, et l'état
+    # global du module random n'est pas modifié
+    rng = random.Random(seed)
+    
+    stats = new_processing_stats()
+    stats['total_input'] = len(posts)
+    results = []
+    cache_before = get_token_cache_stats()
+    
+    for post in posts:
+        for result in process_post(post, augment=augment, num_augmentations=num_augmentations, rng=rng):
+            results.append(result)
+            update_processing_stats(stats, result)
+    
+    stats['total_output'] = len(results)
+    
+    # Hits/misses du lot (additionnés entre processus par merge_processing_stats)
+    cache_after = get_token_cache_stats()
+    stats['token_cache'] = {key: cache_after[key] - cache_before[key] for key in ('hits', 'misses')}
+    return results, stats
+
+
+def process_posts(posts, augment=False, num_augmentations=2, workers=1, chunk_size=500,
+                  seed=None, stats=None):
+    """
+    Traite un flux de posts et produit les posts enrichis au fil de l'eau.
+    
+    Seuls quelques lots sont en mémoire à la fois (au plus 2 par processus),
+    quelle que soit la taille du flux d'entrée.
+    
+    Args:
+        posts: Itérable de posts (générateur accepté)
+        augment: Activer l'augmentation de données
+        num_augmentations: Nombre de variations à générer
+        workers: Nombre de processus (1 = traitement dans le processus courant)
+        chunk_size: Nombre de posts par lot
+        seed: Graine de base de l'augmentation (lot i -> seed + i)
+        stats: Statistiques à mettre à jour (voir new_processing_stats)
+    
+    Yields:
+        dict: Posts traités, dans l'ordre d'entrée
+    """
+    if stats is None:
+        stats = new_processing_stats()
+    
+    chunks = iter_chunks(posts, max(1, chunk_size))
+    
+    def chunk_seed(index):
+        return None if seed is None else seed + index
+    
+    if workers <= 1:
+        for index, chunk in enumerate(chunks):
+            results, chunk_stats = process_chunk(chunk, augment, num_augmentations, chunk_seed(index))
+            merge_processing_stats(stats, chunk_stats)
+            yield from results
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        
+        for index, chunk in enumerate(chunks):
+            pending.append(executor.submit(
+                process_chunk, chunk, augment, num_augmentations, chunk_seed(index)
+            ))
+            # Limiter les lots en vol pour garder une mémoire bornée
+            if len(pending) < workers * 2:
+                continue
+            results, chunk_stats = pending.popleft().result()
+            merge_processing_stats(stats, chunk_stats)
+            yield from results
+        
+        # Récupérer les derniers lots dans l'ordre de soumission
+        while pending:
+            results, chunk_stats = pending.popleft().result()
+            merge_processing_stats(stats, chunk_stats)
+            yield from results
+
+
+def process_evaluation_data(input_path, output_path, augment=False, num_augmentations=2,
+                            workers=1, chunk_size=500, seed=None, keep_results=False):
     """
     Traite le fichier final_evaluation_set.json et sauvegarde les résultats. 
     
+    Entrée et sortie sont traitées en flux: tableau JSON ou JSONL
+    (sortie JSONL si output_path se termine par .jsonl).
+    
     Args:
-        input_path: Chemin vers le fichier d'entrée JSON
-        output_path: Chemin vers le fichier de sortie JSON
+        input_path: Chemin vers le fichier d'entrée (JSON ou JSONL)
+        output_path: Chemin vers le fichier de sortie (JSON ou JSONL)
         augment: Activer l'augmentation de données
         num_augmentations: Nombre de variations à générer
+        workers: Nombre de processus (1 = traitement dans le processus courant)
+        chunk_size: Nombre de posts par lot envoyé à un processus
+        seed: Graine de base de l'augmentation (lot i -> seed + i)
+        keep_results: Garder les posts traités en mémoire pour les retourner
+                      (défaut False: mémoire constante, retourne None à la place)
+    
+    output_path peut être input_path (remplacé seulement à la fin).
     """
     
     print("=" * 70)
@@ -1883,66 +2444,39 @@ def process_evaluation_data(input_path, output_path, augment=False, num_augmenta
         print(f"❌ Erreur: Fichier non trouvé: {input_path}")
         return None
     
-    # Charger les données
-    print(f"\n📂 Chargement des données depuis: {input_path}")
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    print(f"✅ {len(data)} posts chargés")
+    print(f"\n📂 Lecture en flux depuis: {input_path}")
+    print(f"💾 Écriture en flux vers: {output_path}")
     
     # Statistiques
-    stats = {
-        'total_input': len(data),
-        'total_output': 0,
-        'by_original_lang': {'ar': 0, 'fr': 0, 'da': 0},
-        'by_emoji_sentiment': {'positive': 0, 'negative': 0, 'neutral': 0},
-        'posts_with_emojis': 0,
-        'total_emojis_found': 0,
-        'augmented_samples': 0
-    }
+    stats = new_processing_stats()
+    all_results = [] if keep_results else None
+    examples = []
     
-    # Traiter chaque post
-    print(f"\n🔄 Traitement en cours...")
-    all_results = []
-    
-    for i, post in enumerate(data):
-        # Traitement
-        results = process_post(post, augment=augment, num_augmentations=num_augmentations)
-        
+    def track(results):
+        reported = 0
         for result in results:
-            all_results.append(result)
-            
-            # Mise à jour des statistiques
-            lang = result.get('original_lang', 'da')
-            stats['by_original_lang'][lang] = stats['by_original_lang']. get(lang, 0) + 1
-            
-            emoji_sent = result['emoji_sentiment']['dominant_sentiment']
-            stats['by_emoji_sentiment'][emoji_sent] += 1
-            
-            if result['emoji_sentiment']['emoji_count'] > 0:
-                stats['posts_with_emojis'] += 1
-                stats['total_emojis_found'] += result['emoji_sentiment']['emoji_count']
-            
-            if result. get('is_augmented'):
-                stats['augmented_samples'] += 1
-        
-        # Afficher la progression
-        if (i + 1) % 10 == 0 or i == 0:
-            print(f"   Traité: {i + 1}/{len(data)} posts")
-    
-    stats['total_output'] = len(all_results)
-    
-    # Créer le dossier de sortie si nécessaire
-    output_dir = os.path.dirname(output_path)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+            # Les statistiques sont fusionnées à chaque lot terminé
+            if stats['total_input'] != reported:
+                reported = stats['total_input']
+                print(f"   Traité: {reported} posts")
+            if keep_results:
+                all_results.append(result)
+            if len(examples) < 5:
+                examples.append(result)
+            yield result
+    
+    # Traiter le flux par lots
+    print(f"\n🔄 Traitement en cours...")
+    if workers > 1:
+        print(f"   ⚙️ Lots de {chunk_size} posts sur {workers} processus")
     
-    # Sauvegarder les résultats
-    print(f"\n💾 Sauvegarde des résultats vers: {output_path}")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json. dump(all_results, f, ensure_ascii=False, indent=2)
+    results = process_posts(
+        iter_posts(input_path), augment=augment, num_augmentations=num_augmentations,
+        workers=workers, chunk_size=chunk_size, seed=seed, stats=stats
+    )
+    written = write_posts(output_path, track(results))
     
-    print(f"✅ {len(all_results)} posts sauvegardés")
+    print(f"✅ {written} posts sauvegardés")
     
     # Afficher les statistiques
     print("\n" + "=" * 70)
@@ -1971,12 +2505,20 @@ def process_evaluation_data(input_path, output_path, augment=False, num_augmenta
     print(f"   • ❌ Négatif: {stats['by_emoji_sentiment']['negative']}")
     print(f"   • ⚪ Neutre: {stats['by_emoji_sentiment']['neutral']}")
     
+    token_cache = stats['token_cache']
+    lookups = token_cache['hits'] + token_cache['misses']
+    if lookups:
+        print(f"\n⚡ Cache des tokens:")
+        print(f"   • Hits: {token_cache['hits']}/{lookups} ({token_cache['hits'] / lookups * 100:.1f}%)")
+    elif not get_token_cache_stats()['enabled']:
+        print(f"\n⚡ Cache des tokens: désactivé (SOCIALPULSE_TOKEN_CACHE_SIZE=0)")
+    
     # Afficher quelques exemples
     print("\n" + "=" * 70)
     print("📝 EXEMPLES DE RÉSULTATS")
     print("=" * 70)
     
-    for i, result in enumerate(all_results[:5]):
+    for i, result in enumerate(examples):
         print(f"\n{'─'*70}")
         print(f"Post #{i+1}")
         print(f"{'─'*70}")
@@ -0,0 +1,79 @@
+"""
+SocialPulse Monastir - Point d'entrée WSGI (production)
+=======================================================
+Fabrique d'application pour gunicorn avec préchargement:
+
+    gunicorn -c gunicorn.conf.py
+
+Les modèles sont chargés et échauffés UNE fois dans le processus maître,
+avant le fork: les workers partagent les poids en copy-on-write au lieu
+d'en garder chacun une copie. Chaque worker limite torch / ONNX Runtime
+à sa part des cœurs (SOCIALPULSE_NUM_THREADS) pour éviter la
+sursouscription (workers x threads > cœurs).
+
+Le serveur de développement (python src/api.py) reste inchangé.
+"""
+
+import os
+import gc
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+import api
+
+
+def configure_torch_threads():
+    """Applique api.NUM_THREADS à torch (backend torch uniquement)."""
+    if api.NUM_THREADS <= 0 or api.BERT_BACKEND.startswith('onnx'):
+        return None
+
+    try:
+        import torch
+    except ImportError:
+        return None
+
+    torch.set_num_threads(api.NUM_THREADS)
+    return api.NUM_THREADS
+
+
+def create_app(preload=True, warmup=True):
+    """
+    Crée l'application Flask pour gunicorn.
+
+    Args:
+        preload: Charger les modèles maintenant (dans le maître si preload_app)
+        warmup: Échauffer les modèles avant de servir
+
+    Returns:
+        Flask app (api.app)
+    """
+    configure_torch_threads()
+
+    if preload:
+        api.load_models(warmup=warmup)
+
+        # Les objets Python déjà créés (modèles, vocabulaire) sortent du
+        # suivi du GC: les workers ne touchent plus leurs pages mémoire
+        gc.freeze()
+    else:
+        api.start_model_loading(warmup=warmup)
+
+    return api.app
+
+
+def post_fork_worker():
+    """
+    À appeler dans chaque worker après le fork (hook post_fork de gunicorn).
+
+    - threads torch propres au worker
+    - ONNX Runtime n'est pas fork-safe (pools de threads): la session
+      est recréée dans le worker
+    """
+    configure_torch_threads()
+
+    if api.BERT_MODEL is not None and api.BERT_MODEL['backend'].startswith('onnx'):
+        api.load_bert_model(backend=api.BERT_MODEL['backend'])
+        api.warmup_models()
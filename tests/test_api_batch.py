@@ -0,0 +1,67 @@
+"""
+SocialPulse Monastir - Tests de /predict/batch
+==============================================
+Validation des éléments de "texts" (400 au lieu d'une erreur 500), résumé
+cohérent avec les résultats et même choix de modèle que /predict.
+
+Usage:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import pytest
+
+import api
+
+
+def fake_predictions(texts):
+    """Prédictions factices (le modèle n'est pas chargé dans les tests)."""
+    return [{'label': 'positive', 'confidence': 0.9,
+             'probabilities': {'positive': 0.9, 'negative': 0.05, 'neutral': 0.05}} for _ in texts]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(api, 'BERT_MODEL', None)
+    monkeypatch.setattr(api, 'SKLEARN_MODEL', None)
+    ready = api.threading.Event()
+    ready.set()
+    monkeypatch.setattr(api, 'MODELS_READY', ready)
+    monkeypatch.setattr(api, 'predict_bert_cached', fake_predictions)
+    monkeypatch.setattr(api, 'predict_sklearn_cached', fake_predictions)
+    return api.app.test_client()
+
+
+@pytest.mark.parametrize('texts', [[1], ['behi', None], ['behi', {'text': 'x'}]])
+def test_batch_rejects_non_string_items(client, texts):
+    response = client.post('/predict/batch', json={'texts': texts})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_batch_summary_counts_returned_results(client, monkeypatch):
+    monkeypatch.setattr(api, 'SKLEARN_MODEL', object())
+    response = client.post('/predict/batch', json={'texts': ['behi', '  ', '', 'khayeb'], 'model': 'sklearn'})
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['summary']['total'] == len(data['results']) == 2
+
+
+def test_batch_falls_back_like_predict(client, monkeypatch):
+    monkeypatch.setattr(api, 'BERT_MODEL', object())
+    response = client.post('/predict/batch', json={'texts': ['behi'], 'model': 'sklearn'})
+    data = response.get_json()
+    assert data['model_used'] == 'bert'
+    assert len(data['results']) == 1
+
+
+def test_batch_without_model_returns_error(client):
+    response = client.post('/predict/batch', json={'texts': ['behi']})
+    assert response.status_code == 500
+    assert response.get_json()['success'] is False
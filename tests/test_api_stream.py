@@ -0,0 +1,43 @@
+"""
+SocialPulse Monastir - Tests de /predict/stream
+===============================================
+Sans modèle chargé, l'erreur doit être rendue en JSON avant le début du
+flux NDJSON (et non un flux tronqué après un statut 200).
+
+Usage:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import pytest
+
+import api
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(api, 'BERT_MODEL', None)
+    monkeypatch.setattr(api, 'SKLEARN_MODEL', None)
+    monkeypatch.setattr(api, 'MODELS_READY', api.threading.Event())
+    return api.app.test_client()
+
+
+def test_stream_without_model_returns_json_error(client):
+    api.MODELS_READY.set()
+    for model in ('bert', 'sklearn'):
+        response = client.post(f'/predict/stream?model={model}', data=b'{"id": 1, "text": "behi"}\n')
+        assert response.status_code == 500
+        assert response.mimetype == 'application/json'
+        assert response.get_json()['success'] is False
+
+
+def test_stream_while_loading_returns_503(client):
+    response = client.post('/predict/stream', data=b'{"id": 1, "text": "behi"}\n')
+    assert response.status_code == 503
+    assert response.get_json()['success'] is False
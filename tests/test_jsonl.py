@@ -0,0 +1,49 @@
+"""
+SocialPulse Monastir - Tests de la lecture/écriture en flux
+===========================================================
+write_posts ne remplace le fichier de sortie qu'à la fin: il peut être le
+fichier lu en flux, et une erreur en cours d'écriture le laisse intact.
+
+Usage:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import pytest
+
+from ingestion.jsonl import iter_posts, write_posts
+
+POSTS = [{'id': i, 'text': f'post {i} behi'} for i in range(50)]
+
+
+@pytest.mark.parametrize('filename', ['posts.json', 'posts.jsonl'])
+def test_write_posts_in_place(tmp_path, filename):
+    path = str(tmp_path / filename)
+    write_posts(path, POSTS)
+
+    written = write_posts(path, (dict(post, seen=True) for post in iter_posts(path)))
+
+    assert written == len(POSTS)
+    assert list(iter_posts(path)) == [dict(post, seen=True) for post in POSTS]
+    assert os.listdir(tmp_path) == [filename]
+
+
+def test_write_posts_failure_keeps_previous_file(tmp_path):
+    path = str(tmp_path / 'posts.json')
+    write_posts(path, POSTS)
+
+    def failing():
+        yield POSTS[0]
+        raise RuntimeError("lecture interrompue")
+
+    with pytest.raises(RuntimeError):
+        write_posts(path, failing())
+
+    assert list(iter_posts(path)) == POSTS
+    assert os.listdir(tmp_path) == ['posts.json']
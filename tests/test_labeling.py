@@ -0,0 +1,200 @@
+"""
+SocialPulse Monastir - Tests du labeling
+========================================
+label_batch doit produire exactement les mêmes posts labellisés (mêmes
+valeurs et mêmes types, donc le même JSON) et les mêmes statistiques que
+label_post.
+
+Usage:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import json
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import pytest
+
+from labeling import (
+    label_post, label_batch, new_labeling_stats, update_labeling_stats,
+    calculate_text_sentiment_score,
+)
+
+PROCESSED_DIR = os.path.join(PROJECT_ROOT, 'data', 'processed')
+DATA_FILES = ['result_after_validation.json', 'result_augmented.json', 'normalized_data.json']
+
+
+def emojis(*scores):
+    """emoji_sentiment minimal (comme extract_emoji_sentiment)."""
+    total = sum(scores)
+    avg = total / len(scores) if scores else 0
+    return {
+        'emojis': [{'emoji': '🙂', 'sentiment': 'neutral', 'score': score, 'label_darija': 'x'} for score in scores],
+        'emoji_count': len(scores),
+        'total_score': round(total, 2),
+        'avg_score': round(avg, 2),
+        'dominant_sentiment': 'neutral',
+    }
+
+
+# Cas limites: texte vide ou absent, négation, intensificateur, désaccord
+# texte/emoji, doublons (même texte, emojis différents)
+SYNTHETIC_POSTS = [
+    {'id': 1, 'clean_text': ''},
+    {'id': 2},
+    {'id': 3, 'clean_text': None, 'emoji_sentiment': emojis(0.8)},
+    {'id': 4, 'clean_text': 'behi barcha', 'emoji_sentiment': emojis(-0.9, -0.5)},
+    {'id': 5, 'clean_text': 'mouch behi el jaw', 'emoji_sentiment': {}},
+    {'id': 6, 'clean_text': 'behi barcha', 'emoji_sentiment': emojis(0.7)},
+    {'id': 7, 'clean_text': 'el festival kbir w zwin', 'emoji_sentiment': emojis(0.5, 0.5, 0.5)},
+    {'id': 8, 'clean_text': 'khayeb w behi', 'emoji_sentiment': None},
+    {'id': 9, 'clean_text': 'lyoum fel mestir'},
+]
+
+
+def load_posts():
+    posts = []
+    for filename in DATA_FILES:
+        path = os.path.join(PROCESSED_DIR, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            posts.extend(p for p in json.load(f) if isinstance(p, dict) and 'clean_text' in p)
+    return posts
+
+
+def as_json(post):
+    return json.dumps(post, ensure_ascii=False, sort_keys=True)
+
+
+@pytest.fixture(scope='module')
+def posts():
+    return load_posts() + SYNTHETIC_POSTS
+
+
+def test_label_batch_matches_label_post(posts):
+    expected = [as_json(label_post(post)) for post in posts]
+    got = [as_json(post) for post in label_batch(posts)]
+    assert got == expected
+
+
+def test_label_batch_stats_match_label_post(posts):
+    expected = new_labeling_stats()
+    for post in posts:
+        update_labeling_stats(expected, label_post(post)['sentiment_analysis'])
+
+    got = new_labeling_stats()
+    list(label_batch(posts, got))
+    assert got == expected
+    assert got['total'] == len(posts)
+
+
+def test_label_batch_accepts_generators():
+    posts = SYNTHETIC_POSTS
+    assert [as_json(p) for p in label_batch(iter(posts))] == [as_json(p) for p in label_batch(posts)]
+
+
+def test_label_post_copies_word_lists():
+    post = {'clean_text': 'behi barcha'}
+    first, second = list(label_batch([post, post]))
+    first['sentiment_analysis']['text_analysis']['positive_words'].append('x')
+    assert 'x' not in second['sentiment_analysis']['text_analysis']['positive_words']
+
+
+def test_empty_text_analysis():
+    analysis = calculate_text_sentiment_score('')
+    assert analysis['score'] == 0 and analysis['intensifier'] == 1.0
+    assert analysis['positive_words'] == [] and analysis['negative_words'] == []
+
+
+@pytest.fixture
+def lexicons(monkeypatch):
+    """Lexiques modifiables par un test (caches remis à zéro avant et après)."""
+    import labeling
+    labeling.reset_lexicon_matcher()
+    yield monkeypatch
+    monkeypatch.undo()
+    labeling.reset_lexicon_matcher()
+
+
+def write_labeled(tmp_path, raw_posts):
+    """Preprocess + labeling d'un petit dataset (avec son état des lexiques)."""
+    from labeling import label_dataset
+    from preprocessing import process_post
+    from ingestion.jsonl import write_posts
+
+    input_path = tmp_path / 'processed.json'
+    labeled_path = tmp_path / 'labeled.json'
+    write_posts(str(input_path), [process_post(post)[0] for post in raw_posts])
+    label_dataset(str(input_path), str(labeled_path))
+    return str(labeled_path)
+
+
+def test_relabel_recomputes_emojis_like_process_post(tmp_path, lexicons):
+    import labeling
+    import preprocessing
+    from preprocessing import process_post
+
+    # Espace de largeur nulle dans le mot de contexte: seul le texte
+    # nettoyé (comme dans process_post) reconnaît 'festival'
+    raw_posts = [{'id': 1, 'text': 'fes\u200btival 🔊'}, {'id': 2, 'text': 'behi barcha'}]
+    labeled_path = write_labeled(tmp_path, raw_posts)
+
+    speaker = dict(preprocessing.CONTEXT_DEPENDENT_EMOJIS['🔊'], positive_score=0.95)
+    lexicons.setitem(preprocessing.CONTEXT_DEPENDENT_EMOJIS, '🔊', speaker)
+    labeling.reset_lexicon_matcher()
+    posts, stats = labeling.relabel_dataset(labeled_path)
+
+    assert stats['relabeled'] == 1
+    assert posts[0]['emoji_sentiment'] == process_post(raw_posts[0])[0]['emoji_sentiment']
+    assert posts[0]['emoji_sentiment']['total_score'] == 0.95
+
+
+def test_relabel_skips_candidates_with_unchanged_fingerprint(tmp_path, lexicons):
+    import labeling
+
+    # Les deux posts contiennent 'jaw' et 'zwin', seul le 2e contient l'expression
+    raw_posts = [{'id': 1, 'text': 'jaw kbir w zwin'}, {'id': 2, 'text': 'el jaw zwin'}]
+    labeled_path = write_labeled(tmp_path, raw_posts)
+
+    lexicons.setattr(labeling, 'POSITIVE_WORDS', labeling.POSITIVE_WORDS | {'jaw zwin'})
+    labeling.reset_lexicon_matcher()
+    posts, stats = labeling.relabel_dataset(labeled_path)
+
+    assert stats['relabeled'] == 1
+    assert posts[1]['sentiment_analysis']['text_analysis']['positive_words'] == ['jaw zwin']
+    assert all(post['sentiment_analysis']['lexicon_version'] == labeling.get_lexicon_version() for post in posts)
+
+
+def test_relabel_after_scoring_change_is_full(tmp_path, lexicons):
+    import labeling
+
+    raw_posts = [{'id': 1, 'text': 'behi barcha 😍'}, {'id': 2, 'text': 'lyoum fel mestir'}]
+    labeled_path = write_labeled(tmp_path, raw_posts)
+
+    lexicons.setattr(labeling, 'LABEL_THRESHOLDS', {'positive': 1.5, 'negative': -1.5})
+    labeling.reset_lexicon_matcher()
+    posts, stats = labeling.relabel_dataset(labeled_path)
+
+    assert stats['relabeled'] == len(raw_posts)
+    assert [as_json(post) for post in posts] == [as_json(labeling.label_post(post)) for post in posts]
+    assert posts[0]['sentiment_analysis']['label'] == 'neutral'
+
+
+def test_label_dataset_streams_in_place(tmp_path):
+    from labeling import label_dataset
+    from ingestion.jsonl import iter_posts, write_posts
+
+    posts = [post for post in SYNTHETIC_POSTS if post.get('clean_text') is not None]
+    path = str(tmp_path / 'posts.jsonl')
+    write_posts(path, posts)
+
+    labeled, stats = label_dataset(path, path)
+
+    assert labeled is None
+    assert stats['total'] == len(posts)
+    assert [as_json(p) for p in iter_posts(path)] == [as_json(label_post(p)) for p in posts]
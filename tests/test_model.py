@@ -0,0 +1,61 @@
+"""
+SocialPulse Monastir - Tests du modèle maison
+=============================================
+SentimentModel vectorise en CSR quand scipy est installé: prédictions et
+probabilités doivent être celles du chemin dense.
+
+Usage:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import json
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import numpy as np
+import pytest
+
+import model
+from model import SentimentModel
+from labeling import label_post
+
+DATA_FILE = os.path.join(PROJECT_ROOT, 'data', 'processed', 'result_augmented.json')
+
+pytestmark = pytest.mark.skipif(not model.SCIPY_AVAILABLE, reason="scipy non installé")
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        posts = [post for post in json.load(f) if post.get('clean_text')]
+    texts = [post['clean_text'] for post in posts]
+    labels = [label_post(post)['sentiment_analysis']['label'] for post in posts]
+    return texts, labels
+
+
+def train(model_type, sparse, texts, labels):
+    np.random.seed(0)  # initialisation des poids de la régression logistique
+    return SentimentModel(model_type=model_type, sparse=sparse).train(texts, labels)
+
+
+def test_sparse_is_default_with_scipy():
+    assert SentimentModel().sparse is True
+
+
+@pytest.mark.parametrize('model_type', ['naive_bayes', 'logistic_regression'])
+def test_sparse_and_dense_predictions_match(model_type, dataset):
+    texts, labels = dataset
+    dense = train(model_type, False, texts, labels)
+    sparse = train(model_type, True, texts, labels)
+
+    assert dense.classifier.classes == sparse.classifier.classes
+    assert sparse.predict(texts) == dense.predict(texts)
+
+    for got, expected in zip(sparse.predict_with_confidence(texts), dense.predict_with_confidence(texts)):
+        assert got['label'] == expected['label']
+        for cls, probability in expected['probabilities'].items():
+            assert got['probabilities'][cls] == pytest.approx(probability, abs=1e-3)
@@ -0,0 +1,85 @@
+"""
+SocialPulse Monastir - Test concurrent de normalize_text
+========================================================
+Normalise les mêmes posts en série puis via un ThreadPoolExecutor
+(plusieurs passes, ordre mélangé) et vérifie que chaque sortie
+concurrente est identique à la sortie série (ProtectionContext propre à
+chaque appel: aucun placeholder partagé entre threads).
+
+Usage:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import pytest
+
+from preprocessing import normalize_text
+
+DATA_FILES = [
+    os.path.join(PROJECT_ROOT, 'data', 'processed', 'final_evaluation_set.json'),
+    os.path.join(PROJECT_ROOT, 'data', 'raw', 'news_headlines.json'),
+    os.path.join(PROJECT_ROOT, 'data', 'raw', 'darija_events.json'),
+]
+
+# Textes riches en dates/heures/prix (beaucoup de placeholders par post)
+EXTRA_TEXTS = [
+    "2 و3 ماي 2025 festival f mestir 18:30",
+    "le 12 et 13 juin 2024 à 18:30, prix 50 dt",
+    "14h30 25/12/2024 25/12 1990 50% 3.5 dt 20 دينار",
+    "30 أكتوبر لـ1 نوفمبر 2024",
+    "5 AOUT 2023 et 6 août, 9:00 - 21:00",
+]
+
+N_THREADS = 16
+N_PASSES = 10
+
+
+def load_texts():
+    """Charge les textes des fichiers de données."""
+    texts = list(EXTRA_TEXTS)
+    for path in DATA_FILES:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        texts.extend(post['text'] for post in data if post.get('text'))
+    return texts
+
+
+@pytest.fixture
+def frequent_thread_switches():
+    """Basculer souvent entre threads pour provoquer les entrelacements."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_concurrent_normalize_matches_serial(frequent_thread_switches):
+    texts = load_texts()
+    expected = {text: normalize_text(text) for text in texts}
+
+    rng = random.Random(42)
+    jobs = []
+    for _ in range(N_PASSES):
+        batch = list(texts)
+        rng.shuffle(batch)
+        jobs.extend(batch)
+
+    with ThreadPoolExecutor(max_workers=N_THREADS) as executor:
+        outputs = list(executor.map(normalize_text, jobs))
+
+    mismatches = [
+        (text, output) for text, output in zip(jobs, outputs)
+        if output != expected[text]
+    ]
+    assert not mismatches, f"{len(mismatches)}/{len(jobs)} sorties différentes de la version série"
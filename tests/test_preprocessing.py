@@ -0,0 +1,78 @@
+"""
+SocialPulse Monastir - Tests du preprocessing
+=============================================
+process_chunk utilise un générateur aléatoire propre au lot: l'augmentation
+est reproductible avec une graine (y compris d'un processus à l'autre, quel
+que soit PYTHONHASHSEED) et l'état global du module random n'est jamais
+modifié.
+
+Usage:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import json
+import random
+import subprocess
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import pytest
+
+from preprocessing import process_chunk, generate_augmented_samples
+
+POSTS = [
+    {'id': 1, 'text': 'behi barcha el jaw zwin lyoum fel mestir'},
+    {'id': 2, 'text': 'mouch behi khayeb barcha w 5ayeb'},
+    {'id': 3, 'text': 'festival kbir w zwin behi'},
+]
+
+
+# Sortie ordonnée de process_chunk, calculée dans un interpréteur neuf
+CHUNK_SCRIPT = """
+import sys, json
+sys.path.insert(0, sys.argv[1])
+from preprocessing import process_chunk
+posts = json.loads(sys.argv[2])
+results, _ = process_chunk(posts, augment=True, num_augmentations=3, seed=7)
+print(json.dumps([(r['id'], r['clean_text'], r.get('is_augmented', False)) for r in results]))
+"""
+
+
+def process_chunk_in_subprocess(hash_seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    output = subprocess.run(
+        [sys.executable, '-c', CHUNK_SCRIPT, os.path.join(PROJECT_ROOT, 'src'), json.dumps(POSTS * 5)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize('augment', [False, True])
+@pytest.mark.parametrize('seed', [None, 42])
+def test_process_chunk_leaves_global_random_state(augment, seed):
+    random.seed(123)
+    expected = [random.random() for _ in range(3)]
+
+    random.seed(123)
+    process_chunk(POSTS, augment=augment, seed=seed)
+    assert [random.random() for _ in range(3)] == expected
+
+
+def test_process_chunk_seed_is_reproducible_across_hash_seeds():
+    outputs = [process_chunk_in_subprocess(hash_seed) for hash_seed in (1, 2, 3)]
+    assert outputs[0] == outputs[1] == outputs[2]
+    assert any(augmented for _, _, augmented in outputs[0])
+
+
+def test_augmented_samples_keep_original_first():
+    rng = random.Random(0)
+    for post in POSTS:
+        text = post['text']
+        for _ in range(20):
+            samples = generate_augmented_samples(text, 3, rng)
+            assert samples[0] == text
+            assert len(samples) == len(set(samples))